@@ -0,0 +1,220 @@
+"""
+End-to-end load benchmark against local fake OpenAI and GitHub servers (no API costs).
+
+Starts the stand-ins from `benchmarks.fake_servers`, points the application at them and runs
+N concurrent sessions of each scenario:
+
+- main:   `src.main.main` (the CLI flow: use cases, flowcharts, MCP search)
+- search: `SearchManager.search` for one use case
+- gradio: `process_requirements_gradio` (the web UI handler, consumed until its last update)
+
+and reports the per-session latency percentiles (p50/p95/p99) and the sessions per second, plus
+the requests the fake servers received, the injected 429s and the LLM retry/hedge counters.
+
+Run from the repository root:
+    python -m benchmarks.bench_load --sessions 16 --iterations 4
+    python -m benchmarks.bench_load --scenario search --openai-latency 0.8 --openai-429-rate 0.05
+
+The environment is set before the application modules are imported; the local `.env` is loaded
+with override=True by src.config, so it must not set OPENAI_BASE_URL or GITHUB_API_URL.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import logging
+import math
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from unittest.mock import patch
+
+from benchmarks.fake_servers import (
+    FakeServer,
+    FakeServerStats,
+    LatencyProfile,
+    create_fake_github_app,
+    create_fake_openai_app,
+)
+
+SCENARIOS = ("main", "search", "gradio")
+REQUIREMENTS = (
+    "Build a mobile app where users register, upload photos of plants, get them identified and receive "
+    "notifications with care instructions."
+)
+SEARCH_QUERY = "Use Case Title: Photo upload\nUse Case Description: Users upload photos that are stored and indexed."
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+async def run_sessions(session: Callable[[], Awaitable[Any]], sessions: int, iterations: int) -> Dict[str, float]:
+    """Runs `sessions` concurrent loops of `iterations` calls each and summarizes their latencies."""
+    latencies: List[float] = []
+    errors = 0
+
+    async def loop():
+        nonlocal errors
+        for _ in range(iterations):
+            started = time.perf_counter()
+            try:
+                await session()
+            except Exception as e:
+                errors += 1
+                logging.getLogger(__name__).warning(f"Session failed: {type(e).__name__}: {e}")
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop() for _ in range(sessions)))
+    wall = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "sessions": len(latencies),
+        "errors": errors,
+        "wall_seconds": wall,
+        "sessions_per_second": len(latencies) / wall if wall else 0.0,
+        "p50_seconds": percentile(ordered, 0.50),
+        "p95_seconds": percentile(ordered, 0.95),
+        "p99_seconds": percentile(ordered, 0.99),
+    }
+
+
+def _configure_environment(openai_url: str, github_url: str, args: argparse.Namespace):
+    os.environ["OPENAI_BASE_URL"] = f"{openai_url}/v1"
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ["GITHUB_API_URL"] = github_url
+    os.environ["GITHUB_TOKEN"] = "benchmark"
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["FUSED_GENERATION_ENABLED"] = "true" if args.fused else "false"
+    if args.llm_concurrency is not None:
+        os.environ["LLM_MAX_CONCURRENCY"] = str(args.llm_concurrency)
+
+
+async def _main_session():
+    from src.main import main
+
+    await main()
+
+
+async def _gradio_session():
+    from src.gradio_app import process_requirements_gradio
+
+    async for _ in process_requirements_gradio(REQUIREMENTS):
+        pass
+
+
+async def run_benchmark(args: argparse.Namespace, openai_stats: FakeServerStats, github_stats: FakeServerStats):
+    # Imported only now, after _configure_environment()
+    from src.http_pool import close_http_client
+    from src.llm_client import get_llm_stats
+    from src.rate_limiter import get_rate_limiter
+    from src.search_engine.search_manager import SearchManager
+
+    results = {}
+    search_manager = SearchManager()
+    try:
+        await search_manager.start()
+        sessions = {
+            "main": _main_session,
+            "search": lambda: search_manager.search(SEARCH_QUERY),
+            "gradio": _gradio_session,
+        }
+        for scenario in args.scenario:
+            openai_stats.requests.clear()
+            github_stats.requests.clear()
+            openai_stats.rate_limited = github_stats.rate_limited = 0
+            if scenario == "gradio":
+                importlib.import_module("src.gradio_app")  # Imported outside the measured sessions
+
+            # The CLI prints its results; stdout is redirected once for the whole scenario, since nested
+            # redirect_stdout() calls of concurrent sessions would restore it out of order.
+            with patch("src.main.get_user_requirements", return_value=REQUIREMENTS), contextlib.redirect_stdout(
+                io.StringIO() if scenario == "main" else sys.stdout
+            ):
+                summary = await run_sessions(sessions[scenario], args.sessions, args.iterations)
+            summary["openai"] = openai_stats.snapshot()
+            summary["github"] = github_stats.snapshot()
+            results[scenario] = summary
+    finally:
+        await search_manager.close()
+        await close_http_client()
+    return {"results": results, "llm": get_llm_stats(), "rate_limiter": get_rate_limiter().stats()}
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"{'scenario':<8} {'ok':>5} {'errors':>6} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'sess/s':>8} {'429s':>5}")
+    for scenario, summary in report["results"].items():
+        print(
+            f"{scenario:<8} {summary['sessions']:>5} {summary['errors']:>6} {summary['p50_seconds']:>8.3f} "
+            f"{summary['p95_seconds']:>8.3f} {summary['p99_seconds']:>8.3f} {summary['sessions_per_second']:>8.2f} "
+            f"{summary['openai']['rate_limited'] + summary['github']['rate_limited']:>5}"
+        )
+    for stage, stats in sorted(report["llm"].items()):
+        print(
+            f"LLM {stage}: {stats['requests']} requests, {stats['retries']} retries, "
+            f"{stats['hedges_fired']} hedges ({stats['hedges_won']} won), {stats['failures']} failures"
+        )
+    print(f"Rate limiter: {report['rate_limiter']}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses the benchmark options."""
+    arg_parser = argparse.ArgumentParser(description="MCP-Agent load benchmark against fake OpenAI/GitHub servers.")
+    arg_parser.add_argument(
+        "--scenario", choices=SCENARIOS, action="append", help="Scenario to run (repeatable, default: all)."
+    )
+    arg_parser.add_argument("--sessions", type=int, default=8, help="Concurrent sessions (default: 8).")
+    arg_parser.add_argument("--iterations", type=int, default=3, help="Calls per session (default: 3).")
+    arg_parser.add_argument("--openai-latency", type=float, default=0.3, help="Median OpenAI latency in seconds.")
+    arg_parser.add_argument("--openai-sigma", type=float, default=0.5, help="Log-normal shape of the OpenAI latency.")
+    arg_parser.add_argument("--openai-429-rate", type=float, default=0.0, help="Share of OpenAI requests given a 429.")
+    arg_parser.add_argument("--github-latency", type=float, default=0.1, help="Median GitHub latency in seconds.")
+    arg_parser.add_argument("--github-sigma", type=float, default=0.5, help="Log-normal shape of the GitHub latency.")
+    arg_parser.add_argument("--github-429-rate", type=float, default=0.0, help="Share of GitHub requests given a 429.")
+    arg_parser.add_argument("--retry-after", type=float, default=0.2, help="Retry delay sent with injected 429s.")
+    arg_parser.add_argument("--llm-concurrency", type=int, help="Sets LLM_MAX_CONCURRENCY for the run.")
+    arg_parser.add_argument(
+        "--fused", action=argparse.BooleanOptionalAction, default=False, help="Use fused use case generation."
+    )
+    arg_parser.add_argument("--seed", type=int, default=0, help="Seed of the latency and 429 sampling.")
+    arg_parser.add_argument("--json", dest="json_path", help="Also write the full report to this JSON file.")
+    arg_parser.add_argument("--verbose", action="store_true", help="Keep the application's INFO logs.")
+    args = arg_parser.parse_args(argv)
+    args.scenario = args.scenario or list(SCENARIOS)
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    openai_stats, github_stats = FakeServerStats(), FakeServerStats()
+    openai_profile = LatencyProfile(args.openai_latency, args.openai_sigma, args.openai_429_rate, args.retry_after)
+    github_profile = LatencyProfile(args.github_latency, args.github_sigma, args.github_429_rate, args.retry_after)
+    with FakeServer(create_fake_openai_app(openai_profile, openai_stats, args.seed)) as openai_server, FakeServer(
+        create_fake_github_app(github_profile, github_stats, args.seed)
+    ) as github_server:
+        _configure_environment(openai_server.url, github_server.url, args)
+        from src.config import configure_logging
+
+        configure_logging()
+        if not args.verbose:
+            logging.getLogger().setLevel(logging.WARNING)
+        report = asyncio.run(run_benchmark(args, openai_stats, github_stats))
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark for markdown section extraction on the bundled curated READMEs.
+
+Compares the previous GitHubSource implementation (which called `tokens.index(token)` for every
+heading, making it quadratic in the number of tokens) with the single-pass engine in
+`src.search_engine.markdown_sections`, both cold (parse included) and memoized.
+
+Run from the repository root:
+    python -m benchmarks.bench_section_extraction
+
+The single-pass and memoized timings are also part of the regression-gated suite in
+`benchmarks.micro`.
+"""
+
+import timeit
+
+from markdown_it import MarkdownIt
+
+from src.search_engine.markdown_sections import MarkdownDocument, clear_caches, extract_section_with_keyword
+from src.search_engine.sources.github_source import GITHUB_CACHE_PATHS
+
+SECTION_KEYWORDS = {
+    "modelcontextprotocol/servers": "servers",
+    "punkpeye/awesome-mcp-servers": "Server Implementations",
+    "appcypher/awesome-mcp-servers": "Server Implementations",
+}
+
+
+def legacy_extract_section_with_keyword(md_text, keyword):
+    """The original implementation, kept here as the benchmark reference."""
+    md = MarkdownIt()
+    tokens = md.parse(md_text)
+    result = []
+    in_section = False
+    current_level = None
+    for token in tokens:
+        if token.type == "heading_open":
+            heading_level = int(token.tag[1])
+            heading_text = tokens[tokens.index(token) + 1].content.lower()
+
+            if keyword.lower() in heading_text:
+                in_section = True
+                current_level = heading_level
+                continue
+
+            if in_section and heading_level <= current_level:
+                break
+        if in_section:
+            result.append(token.content if hasattr(token, "content") else "")
+    return "\n".join(result).strip()
+
+
+def _best_of(func, number: int, repeat: int = 5) -> float:
+    """Returns the best per-call time in milliseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main():
+    readmes = {}
+    for repo, file_path in GITHUB_CACHE_PATHS.items():
+        with open(file_path, "r", encoding="utf-8") as f:
+            readmes[repo] = f.read()
+
+    print(f"{'README':<34} {'KB':>6} {'legacy ms':>10} {'single-pass ms':>15} {'memoized ms':>12} {'speedup':>9}")
+    for repo, md_text in readmes.items():
+        keyword = SECTION_KEYWORDS[repo]
+        assert legacy_extract_section_with_keyword(md_text, keyword) == MarkdownDocument(md_text).extract_section(
+            keyword
+        ), f"Section mismatch for {repo}"
+
+        legacy_ms = _best_of(lambda: legacy_extract_section_with_keyword(md_text, keyword), number=1)
+        single_pass_ms = _best_of(lambda: MarkdownDocument(md_text).extract_section(keyword), number=1)
+
+        clear_caches()
+        extract_section_with_keyword(md_text, keyword)
+        memoized_ms = _best_of(lambda: extract_section_with_keyword(md_text, keyword), number=100)
+
+        print(
+            f"{repo:<34} {len(md_text) / 1024:>6.0f} {legacy_ms:>10.2f} {single_pass_ms:>15.2f} "
+            f"{memoized_ms:>12.4f} {legacy_ms / memoized_ms:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
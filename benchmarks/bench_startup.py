@@ -0,0 +1,125 @@
+"""
+Import-time report for the application entry points.
+
+Imports each module in a fresh interpreter with `python -X importtime` and reports the total
+import time, the top-level packages that cost the most (cumulative, so a package includes
+everything it imports) and which of the heavy optional dependencies were loaded at all.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --module src.main --top 5 --repeat 5
+
+The fastest of `--repeat` runs is reported, since the first one also warms the OS file cache.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional
+
+DEFAULT_MODULES = ("src.main", "src.batch", "src.gradio_app")
+# Dependencies that should only be loaded by the code paths that need them
+HEAVY_MODULES = ("gradio", "openai", "numpy", "markdown_it", "lxml", "tiktoken", "fastapi", "uvicorn")
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """Parses the `-X importtime` lines ("import time: self | cumulative | imported package")."""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def measure_import(module: str) -> List[ImportRecord]:
+    """Imports `module` in a fresh interpreter and returns its import records."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    env.setdefault("OPENAI_API_KEY", "benchmark")  # The generators may create clients at import time
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    if completed.returncode != 0:
+        tail = completed.stderr.strip().splitlines()[-1:] or ["no output"]
+        raise RuntimeError(f"Importing {module} failed: {tail[0]}")
+    return parse_importtime(completed.stderr)
+
+
+def summarize(module: str, records: List[ImportRecord], top: int) -> Dict[str, Any]:
+    """Returns the total import time, the costliest top-level packages and the heavy modules loaded."""
+    own_package = module.split(".")[0]
+    # A package's top-level entry is cumulative: it includes everything it imports (gradio includes fastapi).
+    packages = {
+        record.module: record.cumulative_us
+        for record in records
+        if "." not in record.module and record.module != own_package
+    }
+    loaded = {record.module for record in records}
+    target = next((r for r in records if r.module == module), None)
+    return {
+        "module": module,
+        "total_ms": (target.cumulative_us if target else 0) / 1000,
+        "top_packages_ms": {
+            package: us / 1000 for package, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+
+def run(modules: List[str], repeat: int, top: int) -> List[Dict[str, Any]]:
+    reports = []
+    for module in modules:
+        runs = [summarize(module, measure_import(module), top) for _ in range(repeat)]
+        reports.append(min(runs, key=lambda report: report["total_ms"]))
+    return reports
+
+
+def print_report(reports: List[Dict[str, Any]]):
+    for report in reports:
+        print(f"{report['module']}: {report['total_ms']:.1f} ms")
+        for package, ms in report["top_packages_ms"].items():
+            print(f"    {package:<30} {ms:>10.1f} ms")
+        print(f"    heavy modules loaded: {', '.join(report['heavy_modules_loaded']) or 'none'}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses the report options."""
+    arg_parser = argparse.ArgumentParser(description="MCP-Agent import-time report.")
+    arg_parser.add_argument(
+        "--module", action="append", help=f"Module to import (repeatable, default: {', '.join(DEFAULT_MODULES)})."
+    )
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Fresh imports per module (default: 3).")
+    arg_parser.add_argument("--top", type=int, default=8, help="Top-level packages to list (default: 8).")
+    arg_parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file.")
+    args = arg_parser.parse_args(argv)
+    args.module = args.module or list(DEFAULT_MODULES)
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    args = parse_args(argv)
+    reports = run(args.module, max(1, args.repeat), args.top)
+    print_report(reports)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Local stand-ins for the OpenAI Responses API and the GitHub API, for load benchmarks.
+
+Both servers answer every request after a latency drawn from a `LatencyProfile` (log-normal
+around a median) and reject a configurable share of requests with a 429 and a retry delay, so the
+retry, rate limiting and hedging paths are exercised as well. Responses are canned but valid:
+
+- `POST /v1/responses` returns a JSON document matching the requested `text.format` schema
+  (use cases, fused use cases, flowchart or MCP candidates), as a plain response or, for
+  `stream: true`, as server-sent events in the order the OpenAI SDK accumulates them.
+- `POST /graphql` and `GET /repos/{owner}/{repo}` return star counts; `GET .../readme` always
+  answers 304 Not Modified, so a benchmark never rewrites the bundled README cache.
+
+Point the application at them with `OPENAI_BASE_URL` and `GITHUB_API_URL` (see
+`benchmarks.bench_load`).
+"""
+
+import asyncio
+import json
+import math
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Deltas a streamed response is split into
+STREAM_CHUNKS = 20
+# Share of the latency spent before the first streamed delta (time to first token)
+STREAM_FIRST_TOKEN_SHARE = 0.3
+
+
+class LatencyProfile(NamedTuple):
+    """Latency distribution and 429 injection of a fake server."""
+
+    median_seconds: float = 0.2
+    # Shape of the log-normal distribution: 0 is constant, 0.5 gives p99 ~3.2x the median
+    sigma: float = 0.5
+    rate_limit_probability: float = 0.0
+    retry_after_seconds: float = 0.2
+
+    def sample(self, rng: random.Random) -> float:
+        return self.median_seconds * math.exp(self.sigma * rng.gauss(0.0, 1.0))
+
+
+USE_CASES = [
+    {"id": 1, "title": "User registration", "description": "Users sign up with their email address and a password."},
+    {"id": 2, "title": "Photo upload", "description": "Users upload photos that are stored and indexed."},
+    {"id": 3, "title": "Notifications", "description": "Users receive push notifications about new activity."},
+]
+FLOWCHART = (
+    "flowchart TD\n    A[Start] --> B{Valid input?}\n    B -->|Yes| C[Process request]\n    B -->|No| D[Show error]"
+)
+MCP_CANDIDATES = [
+    {
+        "name": f"Example MCP {i}",
+        "description": "An MCP server used by the load benchmark.",
+        "url": f"https://github.com/bench-org/mcp-server-{i}",
+        "corresponding_functions": ["create", "read"],
+        "reasoning": "Matches the use case.",
+    }
+    for i in range(1, 4)
+]
+CANNED_OUTPUTS: Dict[str, Dict[str, Any]] = {
+    "UseCaseResponse": {"use_cases": USE_CASES, "reply": "Here are the use cases."},
+    "FusedUseCaseResponse": {
+        "use_cases": [{**uc, "flowchart_mermaid_code": FLOWCHART} for uc in USE_CASES],
+        "reply": "Here are the use cases.",
+    },
+    "FlowchartResponse": {"flowchart_mermaid_code": FLOWCHART, "reply": "Here is the flowchart."},
+    "MCPCandidates": {"MCP_candidates": MCP_CANDIDATES},
+}
+
+
+class FakeServerStats:
+    """Request counters of a fake server."""
+
+    def __init__(self):
+        self.requests: Counter = Counter()
+        self.rate_limited = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"requests": dict(self.requests), "rate_limited": self.rate_limited}
+
+
+def _rate_limited(profile: LatencyProfile, rng: random.Random, stats: FakeServerStats) -> Optional[Response]:
+    if rng.random() >= profile.rate_limit_probability:
+        return None
+    stats.rate_limited += 1
+    retry_after_ms = int(profile.retry_after_seconds * 1000)
+    return JSONResponse(
+        {"error": {"message": "Rate limit reached (injected)", "type": "requests", "code": "rate_limit_exceeded"}},
+        status_code=429,
+        headers={"retry-after-ms": str(retry_after_ms), "retry-after": str(math.ceil(profile.retry_after_seconds))},
+    )
+
+
+def _response_object(response_id: str, model: str, text: str, status: str = "completed") -> Dict[str, Any]:
+    content = [{"type": "output_text", "text": text, "annotations": []}] if status == "completed" else []
+    return {
+        "id": response_id,
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": status,
+        "output": [
+            {"type": "message", "id": f"msg_{response_id}", "role": "assistant", "status": status, "content": content}
+        ],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "error": None,
+        "incomplete_details": None,
+        "instructions": None,
+        "metadata": {},
+        "temperature": 1.0,
+        "top_p": 1.0,
+        "usage": {
+            "input_tokens": 1000,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": len(text) // 4,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": 1000 + len(text) // 4,
+        },
+    }
+
+
+async def _stream_events(response_id: str, model: str, text: str, latency: float) -> AsyncIterator[str]:
+    message_id = f"msg_{response_id}"
+    chunk_size = max(1, math.ceil(len(text) / STREAM_CHUNKS))
+    chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+    events: List[Dict[str, Any]] = [
+        {"type": "response.created", "response": _response_object(response_id, model, "", "in_progress")},
+        {
+            "type": "response.output_item.added",
+            "output_index": 0,
+            "item": {"type": "message", "id": message_id, "role": "assistant", "status": "in_progress", "content": []},
+        },
+        {
+            "type": "response.content_part.added",
+            "item_id": message_id,
+            "output_index": 0,
+            "content_index": 0,
+            "part": {"type": "output_text", "text": "", "annotations": []},
+        },
+    ]
+    for sequence_number, event in enumerate(events):
+        yield f"event: {event['type']}\ndata: {json.dumps({**event, 'sequence_number': sequence_number})}\n\n"
+
+    sequence_number = len(events)
+    await asyncio.sleep(latency * STREAM_FIRST_TOKEN_SHARE)
+    for chunk in chunks:
+        event = {
+            "type": "response.output_text.delta",
+            "item_id": message_id,
+            "output_index": 0,
+            "content_index": 0,
+            "delta": chunk,
+            "logprobs": [],
+            "sequence_number": sequence_number,
+        }
+        sequence_number += 1
+        yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        await asyncio.sleep(latency * (1 - STREAM_FIRST_TOKEN_SHARE) / len(chunks))
+
+    completed = _response_object(response_id, model, text)
+    for event in (
+        {"type": "response.output_item.done", "output_index": 0, "item": completed["output"][0]},
+        {"type": "response.completed", "response": completed},
+    ):
+        yield f"event: {event['type']}\ndata: {json.dumps({**event, 'sequence_number': sequence_number})}\n\n"
+        sequence_number += 1
+
+
+def create_fake_openai_app(profile: LatencyProfile, stats: FakeServerStats, seed: Optional[int] = None) -> FastAPI:
+    """Returns the fake OpenAI Responses API."""
+    app = FastAPI()
+    rng = random.Random(seed)
+    ids = iter(range(1, 1 << 62))
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        body = await request.json()
+        format_name = body.get("text", {}).get("format", {}).get("name", "")
+        stats.requests[format_name or "unknown"] += 1
+        rejected = _rate_limited(profile, rng, stats)
+        latency = profile.sample(rng)
+        if rejected is not None:
+            await asyncio.sleep(min(latency, 0.05))
+            return rejected
+        if format_name not in CANNED_OUTPUTS:
+            return JSONResponse({"error": {"message": f"Unknown text format {format_name!r}"}}, status_code=400)
+
+        response_id = f"resp_{next(ids)}"
+        text = json.dumps(CANNED_OUTPUTS[format_name])
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream_events(response_id, body.get("model", ""), text, latency), media_type="text/event-stream"
+            )
+        await asyncio.sleep(latency)
+        return _response_object(response_id, body.get("model", ""), text)
+
+    return app
+
+
+def create_fake_github_app(profile: LatencyProfile, stats: FakeServerStats, seed: Optional[int] = None) -> FastAPI:
+    """Returns the fake GitHub API (star lookups and README re-validation)."""
+    app = FastAPI()
+    rng = random.Random(seed)
+
+    def stars(repo_id: str) -> int:
+        return sum(map(ord, repo_id)) * 7 % 5000
+
+    @app.post("/graphql")
+    async def graphql(request: Request):
+        body = await request.json()
+        stats.requests["graphql"] += 1
+        rejected = _rate_limited(profile, rng, stats)
+        await asyncio.sleep(profile.sample(rng))
+        if rejected is not None:
+            return rejected
+        variables = body.get("variables", {})
+        data = {}
+        for key in variables:
+            if key.startswith("o"):
+                index = key[1:]
+                data[f"r{index}"] = {"stargazerCount": stars(f"{variables[key]}/{variables[f'n{index}']}")}
+        return {"data": data}
+
+    @app.get("/repos/{owner}/{repo}")
+    async def repository(owner: str, repo: str):
+        stats.requests["repos"] += 1
+        rejected = _rate_limited(profile, rng, stats)
+        await asyncio.sleep(profile.sample(rng))
+        return rejected or {"full_name": f"{owner}/{repo}", "stargazers_count": stars(f"{owner}/{repo}")}
+
+    @app.get("/repos/{owner}/{repo}/readme")
+    async def readme(owner: str, repo: str):
+        stats.requests["readme"] += 1
+        await asyncio.sleep(profile.sample(rng))
+        return Response(status_code=304)
+
+    return app
+
+
+class FakeServer:
+    """
+    Runs an ASGI app with uvicorn on a free local port in a background thread.
+
+    Usage:
+        with FakeServer(app) as server:
+            client_base_url = server.url
+    """
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1"):
+        self.app = app
+        self.host = host
+        self.port: Optional[int] = None
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, 0))
+        self.port = sock.getsockname()[1]
+        config = uvicorn.Config(self.app, log_level="warning", lifespan="off", backlog=4096)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]}, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake server did not start")
+            time.sleep(0.01)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = None
+
+    def __enter__(self) -> "FakeServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
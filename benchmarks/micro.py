@@ -0,0 +1,294 @@
+"""
+Micro-benchmark suite for the CPU-side hot paths of a search, with a stored baseline.
+
+Benchmarks (per-call time, best of several repeats):
+
+- section_extract.cold/memoized[<repo>]: markdown section extraction on the bundled curated
+  READMEs (`extract_section_with_keyword`), parsing included and memoized
+- catalog_build: parsing the bundled READMEs into the MCP catalog
+- system_prompt.full/shortlist: rendering the GitHub system prompt from the whole catalog, and
+  shortlisting plus rendering it for one use case
+- mcp_candidates_validate[<n>]: pydantic validation of an LLM answer with n MCP candidates
+- gradio_markdown[<n>]: assembling a use case tab's markdown with n found MCPs
+
+The candidate benchmarks use a synthetic list of 10 candidates scaled 1x/10x/100x.
+
+Run from the repository root:
+    python -m benchmarks.micro                      # compare with benchmarks/baseline.json
+    python -m benchmarks.micro --update-baseline    # record a new baseline
+    python -m benchmarks.micro -k system_prompt --threshold 0.1
+
+The suite exits with status 1 if a benchmark is slower than its baseline by more than the threshold
+(25% by default). Baselines are only comparable on the machine that recorded them.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# The modules below create (unused) OpenAI clients at import time.
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from benchmarks.bench_section_extraction import SECTION_KEYWORDS  # noqa: E402
+from src.search_engine.catalog import CatalogIndex, read_readmes  # noqa: E402
+from src.search_engine.markdown_sections import (  # noqa: E402
+    MarkdownDocument,
+    clear_caches,
+    extract_section_with_keyword,
+)
+from src.search_engine.sources.github_source import GITHUB_CACHE_PATHS, GitHubSource, MCPCandidates  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+CANDIDATE_SCALES = (1, 10, 100)
+BASE_CANDIDATES = 10
+USE_CASE_QUERY = (
+    "Use Case Title: Photo upload\nUse Case Description: Users upload photos of plants that are stored, "
+    "identified and indexed.\nMermaid Flowchart:\nflowchart TD\n    A[Upload] --> B[Identify] --> C[Store]"
+)
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # Prepares the inputs (untimed) and returns the function to time
+    setup: Callable[[], Callable[[], Any]]
+
+
+def synthetic_candidates(count: int) -> List[Dict[str, Any]]:
+    """Returns `count` MCP candidates shaped like a real LLM answer."""
+    return [
+        {
+            "name": f"mcp-server-{i}",
+            "description": f"Model Context Protocol server {i} for storing, indexing and searching uploaded photos. "
+            "Supports tagging, full text search and webhooks.",
+            "url": f"https://github.com/example-org-{i % 37}/mcp-server-{i}",
+            "corresponding_functions": ["upload_photo", "search_photos", "tag_photo"],
+            "reasoning": "Provides the storage and search functions the use case needs.",
+            "stars": 100 + i,
+        }
+        for i in range(count)
+    ]
+
+
+def _section_benchmarks() -> Iterator[Benchmark]:
+    for repo, path in GITHUB_CACHE_PATHS.items():
+        keyword = SECTION_KEYWORDS[repo]
+
+        def cold(path=path, keyword=keyword, repo=repo):
+            md_text = read_readmes({repo: path})[repo]
+            return lambda: MarkdownDocument(md_text).extract_section(keyword)
+
+        def memoized(path=path, keyword=keyword, repo=repo):
+            md_text = read_readmes({repo: path})[repo]
+            clear_caches()
+            extract_section_with_keyword(md_text, keyword)
+            return lambda: extract_section_with_keyword(md_text, keyword)
+
+        yield Benchmark(f"section_extract.cold[{repo}]", cold)
+        yield Benchmark(f"section_extract.memoized[{repo}]", memoized)
+
+
+def _catalog_build():
+    readme_texts = read_readmes(GITHUB_CACHE_PATHS)
+    return lambda: CatalogIndex.build(readme_texts)
+
+
+_github_source: Optional[GitHubSource] = None
+
+
+def _get_github_source() -> GitHubSource:
+    global _github_source
+    if _github_source is None:
+        _github_source = GitHubSource(retrieval_mode="bm25")
+    return _github_source
+
+
+def _system_prompt_full():
+    source = _get_github_source()
+    return lambda: source._assemble_system_prompt(source.catalog)
+
+
+def _system_prompt_shortlist():
+    source = _get_github_source()
+    return lambda: source._assemble_system_prompt(
+        source.catalog, source._shortlist_candidates(source.catalog, USE_CASE_QUERY)
+    )
+
+
+def _candidates_validate(count: int):
+    payload = json.dumps({"MCP_candidates": synthetic_candidates(count)})
+    return lambda: MCPCandidates.model_validate_json(payload)
+
+
+def _gradio_markdown(count: int):
+    from src.gradio_app import _format_found_mcps, _format_use_case_header
+    from src.use_case_generator import UseCase
+
+    uc = UseCase(id=1, title="Photo upload", description="Users upload photos that are stored and indexed.")
+    found_mcps = synthetic_candidates(count)
+    return lambda: "".join(_format_use_case_header(uc) + _format_found_mcps(found_mcps))
+
+
+def all_benchmarks() -> List[Benchmark]:
+    benchmarks = list(_section_benchmarks())
+    benchmarks.append(Benchmark("catalog_build", _catalog_build))
+    benchmarks.append(Benchmark("system_prompt.full", _system_prompt_full))
+    benchmarks.append(Benchmark("system_prompt.shortlist", _system_prompt_shortlist))
+    for scale in CANDIDATE_SCALES:
+        count = BASE_CANDIDATES * scale
+        benchmarks.append(
+            Benchmark(f"mcp_candidates_validate[{count}]", lambda count=count: _candidates_validate(count))
+        )
+    for scale in CANDIDATE_SCALES:
+        count = BASE_CANDIDATES * scale
+        benchmarks.append(Benchmark(f"gradio_markdown[{count}]", lambda count=count: _gradio_markdown(count)))
+    return benchmarks
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, min_seconds: float = 0.2) -> float:
+    """Returns the best per-call time in milliseconds, with the call count calibrated to `min_seconds`."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_seconds / elapsed)) if elapsed < min_seconds else number
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+
+def _calibration_workload():
+    """Fixed pure-Python work, timed to normalize for machine speed (CPU frequency, noisy neighbours)."""
+    total = 0
+    for i in range(20000):
+        total += len(str(i * 7919)) % 3
+    return total
+
+
+def run_benchmarks(benchmarks: List[Benchmark], repeat: int = 5) -> Dict[str, float]:
+    results = {}
+    for benchmark in benchmarks:
+        results[benchmark.name] = measure(benchmark.setup(), repeat=repeat)
+        print(f"{benchmark.name:<60} {results[benchmark.name]:>12.4f} ms", flush=True)
+    return results
+
+
+def calibrate(repeat: int = 5) -> float:
+    return measure(_calibration_workload, repeat=repeat)
+
+
+def machine_info() -> Dict[str, str]:
+    return {"python": platform.python_version(), "machine": platform.machine(), "processor": platform.processor()}
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: str, results: Dict[str, float], calibration_ms: float):
+    baseline = load_baseline(path) or {}
+    # Benchmarks that were not run (filtered with -k) keep their previous baseline, rescaled to this run's speed.
+    scale = calibration_ms / baseline["calibration_ms"] if baseline.get("calibration_ms") else 1.0
+    merged = {name: ms * scale for name, ms in baseline.get("results", {}).items()}
+    merged.update(results)
+    payload = {
+        "machine": machine_info(),
+        "calibration_ms": round(calibration_ms, 6),
+        "results": {name: round(ms, 6) for name, ms in sorted(merged.items())},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float, speed_ratio: float = 1.0
+) -> List[Tuple[str, float, float, float]]:
+    """
+    Returns the regressions as (name, baseline ms, current ms, ratio), for every benchmark slower
+    than its baseline by more than `threshold` (e.g. 0.25 for 25%).
+
+    Args:
+        speed_ratio: Calibration time of this run divided by the baseline's; the baseline times are
+            scaled by it, so a uniformly slower machine does not count as a regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous and current > previous * speed_ratio * (1 + threshold):
+            regressions.append((name, previous, current, current / (previous * speed_ratio)))
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses the suite options."""
+    arg_parser = argparse.ArgumentParser(description="MCP-Agent micro-benchmarks with a regression gate.")
+    arg_parser.add_argument("-k", dest="filter", help="Only run benchmarks whose name contains this text.")
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file (default: %(default)s).")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+    arg_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed slowdown before failing, as a fraction (default: {DEFAULT_THRESHOLD}).",
+    )
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per benchmark (default: 5).")
+    arg_parser.add_argument(
+        "--confirm",
+        type=int,
+        default=2,
+        help="Re-measurements of a regressed benchmark before it fails the suite (default: 2).",
+    )
+    return arg_parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    benchmarks = [b for b in all_benchmarks() if not args.filter or args.filter in b.name]
+    calibration_ms = calibrate(repeat=args.repeat)
+    results = run_benchmarks(benchmarks, repeat=args.repeat)
+    # Calibrated before and after the run; the faster one is the least disturbed measurement.
+    calibration_ms = min(calibration_ms, calibrate(repeat=args.repeat))
+    print(f"{'calibration':<60} {calibration_ms:>12.4f} ms", flush=True)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, calibration_ms)
+        print(f"Baseline written to {args.baseline}.")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; record one with --update-baseline.")
+        return 0
+    if baseline.get("machine") != machine_info():
+        print(f"Warning: the baseline was recorded on another machine/Python ({baseline.get('machine')}).")
+    missing = sorted(set(results) - set(baseline["results"]))
+    if missing:
+        print(f"No baseline yet for: {', '.join(missing)}")
+
+    speed_ratio = calibration_ms / baseline["calibration_ms"] if baseline.get("calibration_ms") else 1.0
+    regressions = compare(results, baseline["results"], args.threshold, speed_ratio)
+    by_name = {benchmark.name: benchmark for benchmark in benchmarks}
+    for _ in range(args.confirm):
+        if not regressions:
+            break
+        # Timing noise rarely repeats: keep the best of the re-measurements.
+        print(f"Re-measuring {len(regressions)} possible regression(s)...")
+        rerun = run_benchmarks([by_name[name] for name, *_ in regressions], repeat=args.repeat)
+        results.update({name: min(results[name], ms) for name, ms in rerun.items()})
+        regressions = compare(results, baseline["results"], args.threshold, speed_ratio)
+
+    for name, previous, current, ratio in regressions:
+        print(f"REGRESSION {name}: {previous:.4f} ms -> {current:.4f} ms ({ratio:.2f}x the speed-adjusted baseline)")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} of the baseline (speed ratio {speed_ratio:.2f}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+MCP-Agent Batch CLI
+
+Analyzes many requirement documents in one run, e.g. overnight:
+
+    python -m src.batch --input briefs.jsonl --output results.ndjson
+    python -m src.batch --input briefs/ --output results.ndjson --llm-concurrency 16
+
+Documents are processed concurrently while a global cap bounds the LLM requests in flight. Each
+result is appended to the NDJSON output as soon as its document finishes, and the document's ID is
+then recorded in a checkpoint file, so an interrupted run can simply be restarted: documents that
+were already completed are skipped, failed ones are retried. A document only counts as completed if
+every flowchart was generated and every search source answered; otherwise it is reported as
+"partial" (or "error" if no search of the document succeeded) and retried as well.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.config import FUSED_GENERATION_ENABLED, LLM_MAX_CONCURRENCY, USE_CASE_CONCURRENCY, configure_logging
+from src.flowchart_generator import MODEL_NAME as FLOWCHART_MODEL_NAME
+from src.flowchart_generator import FlowchartGenerator, FlowchartResponse
+from src.http_pool import close_http_client
+from src.input_parser import InputParser
+from src.llm_client import set_llm_concurrency
+from src.main import process_use_case
+from src.search_engine.search_manager import SearchManager, SearchResponse
+from src.telemetry import span
+from src.token_counter import load_token_counters
+from src.use_case_generator import MODEL_NAME as USE_CASE_MODEL_NAME
+from src.use_case_generator import UseCaseGenerator, generate_use_cases_and_flowcharts
+
+configure_logging()
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_EXTENSIONS = (".md", ".txt")
+DEFAULT_DOCUMENT_CONCURRENCY = 8
+# Batch runs always cap LLM requests; LLM_MAX_CONCURRENCY from the environment takes precedence.
+DEFAULT_LLM_CONCURRENCY = LLM_MAX_CONCURRENCY if LLM_MAX_CONCURRENCY > 0 else 8
+
+
+def read_documents(input_path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (document ID, requirements text) pairs.
+
+    Args:
+        input_path: A JSONL file with one `{"id": ..., "text": ...}` object per line (the ID defaults to
+            the line number, `requirements` is accepted instead of `text`), or a directory whose .md/.txt
+            files are documents (the ID is the path relative to the directory).
+    """
+    if os.path.isdir(input_path):
+        for root, dirs, files in os.walk(input_path):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.endswith(DOCUMENT_EXTENSIONS):
+                    file_path = os.path.join(root, file_name)
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        yield os.path.relpath(file_path, input_path), f.read()
+        return
+
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                logger.error(f"Skipping invalid JSON on line {line_number} of {input_path}: {e}")
+                continue
+            text = record.get("text", record.get("requirements"))
+            if not isinstance(text, str):
+                logger.error(f"Skipping line {line_number} of {input_path}: no 'text' field.")
+                continue
+            yield str(record.get("id", line_number)), text
+
+
+def load_checkpoint(checkpoint_path: str) -> Set[str]:
+    """Returns the IDs of the documents completed by previous runs."""
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+class BatchProcessor:
+    """
+    Runs the MCP-Agent pipeline for many documents, sharing generators and the SearchManager.
+    """
+
+    def __init__(
+        self,
+        use_case_generator: UseCaseGenerator,
+        flowchart_generator: FlowchartGenerator,
+        search_manager: SearchManager,
+        use_case_concurrency: int = USE_CASE_CONCURRENCY,
+        fused: bool = FUSED_GENERATION_ENABLED,
+    ):
+        self.input_parser = InputParser()
+        self.use_case_generator = use_case_generator
+        self.flowchart_generator = flowchart_generator
+        self.search_manager = search_manager
+        self.use_case_concurrency = max(1, use_case_concurrency)
+        self.fused = fused
+
+    async def process_document(self, doc_id: str, text: str) -> Dict[str, Any]:
+        """
+        Processes one document into a JSON-serializable result record with `status`:
+
+        - "ok": every flowchart was generated and every search source answered
+        - "partial": some flowcharts or source searches failed; the other results are kept
+        - "error": the document failed, or the search failed for every use case
+        """
+        started = time.monotonic()
+        record: Dict[str, Any] = {"id": doc_id}
+        try:
+            with span("parse"):
+                cleaned_requirements = self.input_parser.parse(text)
+            if not cleaned_requirements:
+                raise ValueError("Empty requirements document")
+            use_cases_response, flowcharts = await generate_use_cases_and_flowcharts(
+                self.use_case_generator, cleaned_requirements, fused=self.fused
+            )
+            use_cases = use_cases_response.use_cases if use_cases_response else []
+            if not use_cases:
+                raise RuntimeError(f"No use cases generated: {use_cases_response.reply if use_cases_response else ''}")
+
+            semaphore = asyncio.Semaphore(self.use_case_concurrency)
+            outcomes = await asyncio.gather(
+                *(
+                    process_use_case(
+                        uc, self.flowchart_generator, self.search_manager, semaphore, flowcharts.get(uc.id)
+                    )
+                    for uc in use_cases
+                )
+            )
+            record["reply"] = use_cases_response.reply
+            record["use_cases"] = [
+                {
+                    **uc.model_dump(),
+                    "flowchart": flowchart_response.model_dump() if flowchart_response else None,
+                    "mcps": search_response.results,
+                    "sources": [
+                        source.model_dump(include={"source_name", "status", "error"})
+                        for source in search_response.sources
+                    ],
+                }
+                for uc, (flowchart_response, search_response) in zip(use_cases, outcomes)
+            ]
+            record["status"] = _document_status(outcomes)
+            if record["status"] == "error":
+                record["error"] = "The MCP search failed for every use case"
+        except Exception as e:
+            logger.exception(f"Failed to process document {doc_id}: {e}")
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        return record
+
+
+def _document_status(outcomes: List[Tuple[Optional[FlowchartResponse], SearchResponse]]) -> str:
+    """Returns "ok", "partial" or "error" from the per-use-case flowcharts and source statuses."""
+    searches_failed = [
+        not any(source.status == "ok" for source in search_response.sources) for _, search_response in outcomes
+    ]
+    if all(searches_failed):
+        return "error"
+    if any(searches_failed) or any(
+        flowchart_response is None or any(source.status != "ok" for source in search_response.sources)
+        for flowchart_response, search_response in outcomes
+    ):
+        return "partial"
+    return "ok"
+
+
+async def run_batch(
+    documents: Iterator[Tuple[str, str]],
+    processor: BatchProcessor,
+    output_path: str,
+    checkpoint_path: str,
+    document_concurrency: int = DEFAULT_DOCUMENT_CONCURRENCY,
+) -> Dict[str, int]:
+    """
+    Processes documents with a pool of workers, appending each result to the NDJSON output and
+    checkpointing completed documents as soon as they finish.
+
+    Returns:
+        Counts of "ok", "partial", "error" and "skipped" documents; only "ok" ones are checkpointed.
+    """
+    completed = load_checkpoint(checkpoint_path)
+    counts = {"ok": 0, "partial": 0, "error": 0, "skipped": 0}
+    for directory in {os.path.dirname(output_path), os.path.dirname(checkpoint_path)}:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def pending_documents() -> Iterator[Tuple[str, str]]:
+        for doc_id, text in documents:
+            if doc_id in completed:
+                counts["skipped"] += 1
+                continue
+            completed.add(doc_id)  # Also guards against duplicate IDs within the input
+            yield doc_id, text
+
+    pending = pending_documents()
+    with open(output_path, "a", encoding="utf-8") as output, open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+
+        async def worker():
+            # Workers pull documents lazily, so huge inputs are never held in memory at once.
+            for doc_id, text in pending:
+                with span("document", document_id=doc_id) as document_span:
+                    record = await processor.process_document(doc_id, text)
+                    document_span.set_attribute("status", record["status"])
+                # The result is written before the checkpoint: a crash in between re-processes the
+                # document (a duplicate line) but never loses it.
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                if record["status"] == "ok":
+                    checkpoint.write(doc_id + "\n")
+                    checkpoint.flush()
+                counts[record["status"]] += 1
+                logger.info(
+                    f"Document {doc_id}: {record['status']} in {record['elapsed_seconds']:.1f}s "
+                    f"({counts['ok']} ok, {counts['partial']} partial, {counts['error']} failed so far)."
+                )
+
+        await asyncio.gather(*(worker() for _ in range(max(1, document_concurrency))))
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses the batch CLI options."""
+    arg_parser = argparse.ArgumentParser(description="MCP-Agent batch mode: analyze many requirement documents.")
+    arg_parser.add_argument("--input", required=True, help="JSONL file or directory of .md/.txt documents.")
+    arg_parser.add_argument("--output", required=True, help="NDJSON file the results are appended to.")
+    arg_parser.add_argument(
+        "--checkpoint", help="File recording completed document IDs (default: <output>.checkpoint)."
+    )
+    arg_parser.add_argument(
+        "--document-concurrency",
+        type=int,
+        default=DEFAULT_DOCUMENT_CONCURRENCY,
+        help=f"Documents processed at the same time (default: {DEFAULT_DOCUMENT_CONCURRENCY}).",
+    )
+    arg_parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=DEFAULT_LLM_CONCURRENCY,
+        help=f"Maximum LLM requests in flight across all documents (default: {DEFAULT_LLM_CONCURRENCY}).",
+    )
+    arg_parser.add_argument(
+        "--use-case-concurrency",
+        type=int,
+        default=USE_CASE_CONCURRENCY,
+        help=f"Use cases of one document processed at the same time (default: {USE_CASE_CONCURRENCY}).",
+    )
+    arg_parser.add_argument(
+        "--fused",
+        action=argparse.BooleanOptionalAction,
+        default=FUSED_GENERATION_ENABLED,
+        help="Generate use cases and their flowcharts in a single LLM call.",
+    )
+    return arg_parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None) -> Dict[str, int]:
+    args = parse_args(argv)
+    set_llm_concurrency(args.llm_concurrency)
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    logger.info(f"MCP-Agent batch run: {args.input} -> {args.output} (checkpoint: {checkpoint_path})")
+
+    processor = BatchProcessor(
+        UseCaseGenerator(),
+        FlowchartGenerator(),
+        SearchManager(),
+        use_case_concurrency=args.use_case_concurrency,
+        fused=args.fused,
+    )
+    try:
+        await load_token_counters([USE_CASE_MODEL_NAME, FLOWCHART_MODEL_NAME])
+        async with processor.search_manager:
+            counts = await run_batch(
+                read_documents(args.input),
+                processor,
+                args.output,
+                checkpoint_path,
+                document_concurrency=args.document_concurrency,
+            )
+    finally:
+        await close_http_client()
+    logger.info(
+        f"Batch run complete: {counts['ok']} ok, {counts['partial']} partial, {counts['error']} failed, "
+        f"{counts['skipped']} skipped."
+    )
+    return counts
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -43,6 +43,8 @@ LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "default-model")  # Example, if mod
 
 # --- GitHub Configuration ---
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Base URL of the GitHub REST/GraphQL API (e.g. a local stand-in for benchmarks)
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
 
 # --- Search Engine Configuration ---
 # List of prioritized sources for MCP/API search
@@ -75,6 +77,53 @@ except ValueError:
     )
     SEARCH_RESULT_LIMIT_PER_SOURCE = 5
 
+# Maximum number of merged (deduplicated and fused) results returned by SearchManager
+try:
+    SEARCH_TOTAL_RESULT_LIMIT = int(os.getenv("SEARCH_TOTAL_RESULT_LIMIT", "10"))
+except ValueError:
+    logger.warning(
+        f"Invalid value for SEARCH_TOTAL_RESULT_LIMIT: '{os.getenv('SEARCH_TOTAL_RESULT_LIMIT')}'. "
+        f"Defaulting to 10."
+    )
+    SEARCH_TOTAL_RESULT_LIMIT = 10
+
+# Time budget of a single source and of a whole search, in seconds; slower sources are reported as timed out
+try:
+    SEARCH_SOURCE_TIMEOUT_SECONDS = float(os.getenv("SEARCH_SOURCE_TIMEOUT_SECONDS", "90"))
+except ValueError:
+    logger.warning(
+        f"Invalid value for SEARCH_SOURCE_TIMEOUT_SECONDS: '{os.getenv('SEARCH_SOURCE_TIMEOUT_SECONDS')}'. "
+        f"Defaulting to 90."
+    )
+    SEARCH_SOURCE_TIMEOUT_SECONDS = 90.0
+try:
+    SEARCH_DEADLINE_SECONDS = float(os.getenv("SEARCH_DEADLINE_SECONDS", "120"))
+except ValueError:
+    logger.warning(
+        f"Invalid value for SEARCH_DEADLINE_SECONDS: '{os.getenv('SEARCH_DEADLINE_SECONDS')}'. " f"Defaulting to 120."
+    )
+    SEARCH_DEADLINE_SECONDS = 120.0
+
+# How long the scraped mcp.pipedream.com listing is served before it is refreshed in the background
+try:
+    PIPEDREAM_REFRESH_SECONDS = float(os.getenv("PIPEDREAM_REFRESH_SECONDS", str(24 * 3600)))
+except ValueError:
+    logger.warning(
+        f"Invalid value for PIPEDREAM_REFRESH_SECONDS: '{os.getenv('PIPEDREAM_REFRESH_SECONDS')}'. "
+        f"Defaulting to 24 hours."
+    )
+    PIPEDREAM_REFRESH_SECONDS = 24 * 3600
+
+# How long the crawled MCPMarket listing is served before it is re-crawled (conditionally) in the background
+try:
+    MCPMARKET_REFRESH_SECONDS = float(os.getenv("MCPMARKET_REFRESH_SECONDS", str(24 * 3600)))
+except ValueError:
+    logger.warning(
+        f"Invalid value for MCPMARKET_REFRESH_SECONDS: '{os.getenv('MCPMARKET_REFRESH_SECONDS')}'. "
+        f"Defaulting to 24 hours."
+    )
+    MCPMARKET_REFRESH_SECONDS = 24 * 3600
+
 # Enabled search sources, comma-separated in .env, e.g., "github,pipedream"
 _search_sources_env = os.getenv("SEARCH_SOURCES_ENABLED", "github")  # Default to github
 SEARCH_SOURCES_ENABLED: list[str] = [
@@ -82,6 +131,124 @@ SEARCH_SOURCES_ENABLED: list[str] = [
 ]
 
 
+# Candidate retrieval for GitHubSource: "bm25" (lexical) or "dense" (hashed n-gram vectors, CPU-only)
+# shortlists the MCP catalog locally and sends only the top GITHUB_SHORTLIST_K entries to the LLM;
+# "full" sends all curated lists (full-context mode).
+GITHUB_RETRIEVAL_MODES = ("full", "bm25", "dense")
+GITHUB_RETRIEVAL_MODE = os.getenv("GITHUB_RETRIEVAL_MODE", "bm25").strip().lower()
+if GITHUB_RETRIEVAL_MODE not in GITHUB_RETRIEVAL_MODES:
+    logger.warning(
+        f"Invalid value for GITHUB_RETRIEVAL_MODE: '{os.getenv('GITHUB_RETRIEVAL_MODE')}' "
+        f"(expected one of {', '.join(GITHUB_RETRIEVAL_MODES)}). Defaulting to bm25."
+    )
+    GITHUB_RETRIEVAL_MODE = "bm25"
+try:
+    GITHUB_SHORTLIST_K = int(os.getenv("GITHUB_SHORTLIST_K", "60"))
+except ValueError:
+    logger.warning(f"Invalid value for GITHUB_SHORTLIST_K: '{os.getenv('GITHUB_SHORTLIST_K')}'. Defaulting to 60.")
+    GITHUB_SHORTLIST_K = 60
+
+# Maximum size of GitHubSource's system prompt (instructions + curated lists) in tokens; <= 0 disables the limit
+try:
+    GITHUB_PROMPT_TOKEN_BUDGET = int(os.getenv("GITHUB_PROMPT_TOKEN_BUDGET", "60000"))
+except ValueError:
+    logger.warning(
+        f"Invalid value for GITHUB_PROMPT_TOKEN_BUDGET: '{os.getenv('GITHUB_PROMPT_TOKEN_BUDGET')}'. "
+        f"Defaulting to 60000."
+    )
+    GITHUB_PROMPT_TOKEN_BUDGET = 60000
+
+# Interval of the background README refresh (conditional GitHub requests, needs GITHUB_TOKEN)
+try:
+    GITHUB_README_REFRESH_SECONDS = float(os.getenv("GITHUB_README_REFRESH_SECONDS", str(6 * 3600)))
+except ValueError:
+    logger.warning(
+        f"Invalid value for GITHUB_README_REFRESH_SECONDS: '{os.getenv('GITHUB_README_REFRESH_SECONDS')}'. "
+        f"Defaulting to 6 hours."
+    )
+    GITHUB_README_REFRESH_SECONDS = 6 * 3600
+
+# --- Pipeline Configuration ---
+# Maximum number of use cases whose flowchart generation and search run at the same time
+try:
+    USE_CASE_CONCURRENCY = int(os.getenv("USE_CASE_CONCURRENCY", "4"))
+except ValueError:
+    logger.warning(
+        f"Invalid value for USE_CASE_CONCURRENCY: '{os.getenv('USE_CASE_CONCURRENCY')}'. " f"Defaulting to 4."
+    )
+    USE_CASE_CONCURRENCY = 4
+
+# Fused mode: one LLM call returns all use cases together with their Mermaid flowcharts instead of
+# 1 + N calls; use cases whose flowchart is missing or invalid fall back to a per-use-case call
+FUSED_GENERATION_ENABLED = os.getenv("FUSED_GENERATION_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+
+# Stream use cases and flowcharts into the Gradio tabs as their tokens arrive
+GRADIO_STREAMING_ENABLED = os.getenv("GRADIO_STREAMING_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+
+# Process-wide cap on LLM requests in flight (0 = unlimited); the batch CLI overrides it with --llm-concurrency
+try:
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "0"))
+except ValueError:
+    logger.warning(
+        f"Invalid value for LLM_MAX_CONCURRENCY: '{os.getenv('LLM_MAX_CONCURRENCY')}'. " f"Defaulting to 0 (unlimited)."
+    )
+    LLM_MAX_CONCURRENCY = 0
+
+# --- LLM Response Cache ---
+# Persistent cache of structured LLM responses keyed by (model, prompts, schema); disabled by default
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+try:
+    LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+except ValueError:
+    logger.warning("Invalid LLM_CACHE_TTL_SECONDS or LLM_CACHE_MAX_ENTRIES. Defaulting to 1 week and 10000.")
+    LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES = 10000
+
+
+# --- LLM Rate Limiting ---
+# Shared limits for all OpenAI calls (0 = unlimited). LLM_MAX_CONCURRENCY is the ceiling of the adaptive
+# concurrency limit, which halves on 429 responses and grows back by one slot per window of successes.
+try:
+    LLM_RATE_LIMIT_RPM = int(os.getenv("LLM_RATE_LIMIT_RPM", "0"))
+    LLM_RATE_LIMIT_TPM = int(os.getenv("LLM_RATE_LIMIT_TPM", "0"))
+except ValueError:
+    logger.warning("Invalid LLM_RATE_LIMIT_RPM or LLM_RATE_LIMIT_TPM. Defaulting to 0 (unlimited).")
+    LLM_RATE_LIMIT_RPM = 0
+    LLM_RATE_LIMIT_TPM = 0
+
+# How often a request is retried after a 429 or a transient API error before giving up
+try:
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+except ValueError:
+    logger.warning(f"Invalid value for LLM_MAX_RETRIES: '{os.getenv('LLM_MAX_RETRIES')}'. Defaulting to 4.")
+    LLM_MAX_RETRIES = 4
+
+# Read timeout of one LLM request. Large structured calls can take minutes, so this is far above the shared
+# HTTP pool's 30s default used by the GitHub and scraping requests
+try:
+    LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "600"))
+except ValueError:
+    logger.warning(
+        f"Invalid value for LLM_REQUEST_TIMEOUT_SECONDS: '{os.getenv('LLM_REQUEST_TIMEOUT_SECONDS')}'. "
+        f"Defaulting to 600."
+    )
+    LLM_REQUEST_TIMEOUT_SECONDS = 600.0
+
+
+# Optional request hedging: for the listed stages (use_cases, flowchart, github_search), a duplicate request is
+# sent once a call has been in flight longer than the observed LLM_HEDGE_QUANTILE latency of its stage
+# (but at least LLM_HEDGE_MIN_DELAY_SECONDS); the first answer wins and the other request is cancelled
+LLM_HEDGE_STAGES = [stage.strip() for stage in os.getenv("LLM_HEDGE_STAGES", "").split(",") if stage.strip()]
+try:
+    LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+    LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "2"))
+except ValueError:
+    logger.warning("Invalid LLM_HEDGE_QUANTILE or LLM_HEDGE_MIN_DELAY_SECONDS. Defaulting to 0.95 and 2s.")
+    LLM_HEDGE_QUANTILE = 0.95
+    LLM_HEDGE_MIN_DELAY_SECONDS = 2.0
+
 # --- Other Configurations ---
 # Example: LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
@@ -116,7 +283,27 @@ if __name__ == "__main__":
     logger.info(f"LLM API Key Loaded: {'Yes' if get_llm_api_key() else 'No'}")
     logger.info(f"LLM Model Name: {get_LLM_model_name()}")
     logger.info(f"GitHub Token Loaded: {'Yes' if get_github_token() else 'No'}")
+    logger.info(f"GitHub API URL: {GITHUB_API_URL}")
     logger.info(f"MCP Sources: {MCP_SOURCE_URLS}")
     logger.info(f"GitHub Repositories to Search: {GITHUB_REPOSITORIES_TO_SEARCH}")
     logger.info(f"Search Result Limit Per Source: {SEARCH_RESULT_LIMIT_PER_SOURCE}")
+    logger.info(f"Search Total Result Limit: {SEARCH_TOTAL_RESULT_LIMIT}")
+    logger.info(f"Search Timeouts: {SEARCH_SOURCE_TIMEOUT_SECONDS}s per source, {SEARCH_DEADLINE_SECONDS}s overall")
     logger.info(f"Search Sources Enabled: {SEARCH_SOURCES_ENABLED}")
+    logger.info(f"Pipedream Listing Refresh Interval: {PIPEDREAM_REFRESH_SECONDS:.0f}s")
+    logger.info(f"MCPMarket Crawl Refresh Interval: {MCPMARKET_REFRESH_SECONDS:.0f}s")
+    logger.info(f"Use Case Concurrency: {USE_CASE_CONCURRENCY}")
+    logger.info(f"Fused Use Case + Flowchart Generation: {'enabled' if FUSED_GENERATION_ENABLED else 'disabled'}")
+    logger.info(f"Gradio Streaming: {'enabled' if GRADIO_STREAMING_ENABLED else 'disabled'}")
+    logger.info(f"LLM Max Concurrency: {LLM_MAX_CONCURRENCY or 'unlimited'}")
+    logger.info(f"LLM Rate Limits: {LLM_RATE_LIMIT_RPM or 'unlimited'} RPM, {LLM_RATE_LIMIT_TPM or 'unlimited'} TPM")
+    logger.info(f"LLM Max Retries: {LLM_MAX_RETRIES}")
+    logger.info(f"LLM Request Timeout: {LLM_REQUEST_TIMEOUT_SECONDS:.0f}s")
+    logger.info(
+        f"LLM Hedging: {', '.join(LLM_HEDGE_STAGES) or 'disabled'} "
+        f"(p{LLM_HEDGE_QUANTILE * 100:.0f}, at least {LLM_HEDGE_MIN_DELAY_SECONDS:.1f}s)"
+    )
+    logger.info(f"LLM Cache: {'enabled at ' + LLM_CACHE_PATH if LLM_CACHE_ENABLED else 'disabled'}")
+    logger.info(f"GitHub Retrieval Mode: {GITHUB_RETRIEVAL_MODE} (shortlist K={GITHUB_SHORTLIST_K})")
+    logger.info(f"GitHub Prompt Token Budget: {GITHUB_PROMPT_TOKEN_BUDGET}")
+    logger.info(f"GitHub README Refresh Interval: {GITHUB_README_REFRESH_SECONDS:.0f}s")
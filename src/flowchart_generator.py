@@ -1,10 +1,12 @@
 import logging
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from pydantic import BaseModel, Field
 
 from src.config import OPENAI_API_KEY, configure_logging
+from src.http_pool import LLM_TIMEOUT, get_http_client
+from src.llm_client import StreamUpdate, parse_structured, parse_structured_async, stream_structured_async
 
 # Configure logging if this module is run directly (for testing)
 if __name__ != "__main__":  # Only configure if not main, main.py will configure
@@ -28,6 +30,8 @@ class FlowchartResponse(BaseModel):
 
 MODEL_NAME = "gpt-4.1"
 
+MERMAID_DIAGRAM_TYPES = ("graph", "flowchart")
+
 SYSTEM_PROMPT = """
 Generate a concise and clear Mermaid flowchart (graph TD) from a provided use case description. The flowchart should highlight the main steps, actors, and interactions in the use case with a focus on clarity and simplicity. Ensure the Mermaid syntax is correct.
 
@@ -61,6 +65,18 @@ reply:
 """
 
 
+def is_valid_mermaid_flowchart(code: str) -> bool:
+    """
+    Checks that `code` is a Mermaid flowchart (optionally in a ```mermaid fence) with at least one edge.
+    """
+    lines = [line.strip() for line in code.strip().splitlines() if line.strip()]
+    if lines and lines[0].startswith("```"):
+        lines = lines[1:-1] if lines[-1] == "```" else []
+    if not lines or not lines[0].split(maxsplit=1)[0].startswith(MERMAID_DIAGRAM_TYPES):
+        return False
+    return any("--" in line or "==" in line for line in lines[1:])
+
+
 class FlowchartGenerator:
     """
     Generates a Mermaid flowchart for a given use case using an LLM.
@@ -70,9 +86,24 @@ class FlowchartGenerator:
         if not OPENAI_API_KEY:
             raise ValueError("OpenAI API key is required for FlowchartGenerator.")
 
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = OpenAI(api_key=OPENAI_API_KEY, timeout=LLM_TIMEOUT, max_retries=0)
+        self.async_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY, http_client=get_http_client(), timeout=LLM_TIMEOUT, max_retries=0
+        )
         logger.info(f"FlowchartGenerator initialized with model: {MODEL_NAME}")
 
+    @staticmethod
+    def _build_input(use_case_description: str) -> List[dict]:
+        """Builds the system and user messages for the flowchart generation request."""
+        user_prompt = (
+            f"Generate a Mermaid flowchart (flowchart TD) for the following use case:\n\n"
+            f"'{use_case_description}'\n\n"
+        )
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
+
     def generate_flowchart(self, use_case_description: str) -> Optional[FlowchartResponse]:
         """
         Generates a Mermaid flowchart for the provided use case description.
@@ -87,30 +118,87 @@ class FlowchartGenerator:
             logger.warning("Use case description is empty. Cannot generate flowchart.")
             return None
 
-        user_prompt = (
-            f"Generate a Mermaid flowchart (flowchart TD) for the following use case:\n\n"
-            f"'{use_case_description}'\n\n"
-        )
+        try:
+            logger.info(f"Generating flowchart for use case: '{use_case_description[:100]}...'")
+            flowchart = parse_structured(
+                self.client,
+                model=MODEL_NAME,
+                text_format=FlowchartResponse,
+                input=self._build_input(use_case_description),
+                temperature=0.0,  # Lower temperature for more deterministic flowchart structure
+                stage="flowchart",
+            )
+            logger.info(f"Successfully generated flowchart for use case: '{use_case_description[:100]}...'")
+            return flowchart
+        except Exception as e:
+            logger.error(
+                f"Error generating flowchart for use case '{use_case_description[:100]}...': {e}", exc_info=True
+            )
+            return None
+
+    async def generate_flowchart_async(self, use_case_description: str) -> Optional[FlowchartResponse]:
+        """
+        Async version of `generate_flowchart` that does not block the event loop,
+        so flowcharts for several use cases can be generated concurrently.
+
+        Args:
+            use_case_description: The textual description of the use case.
+
+        Returns:
+            A FlowchartResponse object containing the Mermaid code, or None if generation fails.
+        """
+        if not use_case_description:
+            logger.warning("Use case description is empty. Cannot generate flowchart.")
+            return None
 
         try:
             logger.info(f"Generating flowchart for use case: '{use_case_description[:100]}...'")
-            response = self.client.responses.parse(
+            flowchart = await parse_structured_async(
+                self.async_client,
                 model=MODEL_NAME,
                 text_format=FlowchartResponse,
-                input=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
+                input=self._build_input(use_case_description),
                 temperature=0.0,  # Lower temperature for more deterministic flowchart structure
+                stage="flowchart",
             )
             logger.info(f"Successfully generated flowchart for use case: '{use_case_description[:100]}...'")
-            return response.output_parsed
+            return flowchart
         except Exception as e:
             logger.error(
                 f"Error generating flowchart for use case '{use_case_description[:100]}...': {e}", exc_info=True
             )
             return None
 
+    async def stream_flowchart_async(self, use_case_description: str) -> AsyncIterator[StreamUpdate]:
+        """
+        Streaming version of `generate_flowchart_async`.
+
+        Yields:
+            Updates whose `partial` holds the `flowchart_mermaid_code` decoded so far. The final update's
+            `parsed` is the FlowchartResponse, or None if generation fails.
+        """
+        if not use_case_description:
+            logger.warning("Use case description is empty. Cannot generate flowchart.")
+            yield StreamUpdate(None, None)
+            return
+
+        try:
+            logger.info(f"Streaming flowchart for use case: '{use_case_description[:100]}...'")
+            async for update in stream_structured_async(
+                self.async_client,
+                model=MODEL_NAME,
+                text_format=FlowchartResponse,
+                input=self._build_input(use_case_description),
+                temperature=0.0,  # Lower temperature for more deterministic flowchart structure
+                stage="flowchart",
+            ):
+                yield update
+        except Exception as e:
+            logger.error(
+                f"Error streaming flowchart for use case '{use_case_description[:100]}...': {e}", exc_info=True
+            )
+            yield StreamUpdate(None, None)
+
 
 if __name__ == "__main__":
     # Basic test (requires .env file with OPENAI_API_KEY)
@@ -3,30 +3,59 @@ Gradio Web UI for MCP-Agent
 """
 
 import asyncio
+import contextlib
 import logging
 import os
+from typing import Any, Dict, List, Optional, Tuple
 
 import gradio as gr
+import uvicorn
+from fastapi import FastAPI, Response
 
-from src.config import configure_logging
-from src.flowchart_generator import FlowchartGenerator
+from src.config import FUSED_GENERATION_ENABLED, GRADIO_STREAMING_ENABLED, configure_logging
+from src.flowchart_generator import MODEL_NAME as FLOWCHART_MODEL_NAME
+from src.flowchart_generator import FlowchartGenerator, FlowchartResponse
 from src.input_parser import InputParser
-from src.search_engine.search_manager import SearchManager
-from src.search_engine.sources.github_source import (
-    GitHubSource,  # Assuming direct instantiation
+from src.search_engine.search_manager import SearchManager, SourceResult
+from src.telemetry import METRICS_CONTENT_TYPE, render_metrics, span
+from src.token_counter import load_token_counters
+from src.use_case_generator import MODEL_NAME as USE_CASE_MODEL_NAME
+from src.use_case_generator import (
+    UseCase,
+    UseCaseGenerator,
+    generate_use_cases_and_flowcharts,
+    split_use_case_response,
 )
-from src.use_case_generator import UseCaseGenerator
 
 # Configure logging once when the module is loaded
 configure_logging()
 logger = logging.getLogger(__name__)
 
-# Initialize components once
+# Initialize components once; the generators on first use, the search sources when the page loads
 input_parser = InputParser()
-use_case_generator = UseCaseGenerator()
-flowchart_generator = FlowchartGenerator()
-github_source = GitHubSource()
-search_manager = SearchManager([github_source])
+search_manager = SearchManager()
+_use_case_generator: Optional[UseCaseGenerator] = None
+_flowchart_generator: Optional[FlowchartGenerator] = None
+
+
+def get_use_case_generator() -> UseCaseGenerator:
+    global _use_case_generator
+    if _use_case_generator is None:
+        _use_case_generator = UseCaseGenerator()
+    return _use_case_generator
+
+
+def get_flowchart_generator() -> FlowchartGenerator:
+    global _flowchart_generator
+    if _flowchart_generator is None:
+        _flowchart_generator = FlowchartGenerator()
+    return _flowchart_generator
+
+
+async def start_up():
+    """Starts and warms up the search sources and loads the tokenizers, both off the request path."""
+    await asyncio.gather(search_manager.start(), load_token_counters([USE_CASE_MODEL_NAME, FLOWCHART_MODEL_NAME]))
+
 
 MAX_TABS = 10
 
@@ -62,15 +91,164 @@ MERMAID_TRIGGER = """
 """
 
 
-def process_requirements_gradio(raw_requirements_text: str):
-    logger.info("Gradio app processing request...")
+def _tab_label(uc_index: int, uc: UseCase) -> str:
+    title = uc.title[:30].strip().rstrip("...") + "..." if len(uc.title) > 30 else uc.title.strip()
+    return f"UC {uc_index + 1}: {title}"
+
+
+def _format_use_case_header(uc: UseCase) -> List[str]:
+    return [f"## Use Case: {uc.title} (ID: {uc.id})\n", f"**Description:**\n{uc.description}\n"]
+
+
+def _partial_use_cases(partial: Any) -> List[UseCase]:
+    """Returns the use cases of a streaming response decoded so far, once their title has started."""
+    items = partial.get("use_cases") if isinstance(partial, dict) else None
+    return [
+        UseCase.model_construct(id=item.get("id", "…"), title=item["title"], description=item.get("description", ""))
+        for item in (items if isinstance(items, list) else [])
+        if isinstance(item, dict) and isinstance(item.get("title"), str) and item["title"]
+    ]
+
+
+def _format_partial_flowchart(code: str) -> List[str]:
+    """Renders a streaming flowchart as plain code, since incomplete Mermaid cannot be drawn yet."""
+    lines = code.strip().splitlines()
+    if lines and lines[0].startswith("```"):
+        lines = lines[1:]
+    if lines and lines[-1].startswith("```"):
+        lines = lines[:-1]
+    body = "\n".join(lines)
+    return ["\n### Flowchart\n", "_Generating..._\n", f"\n```text\n{body}\n```\n"]
+
+
+def _format_found_mcps(found_mcps: List[Dict[str, Any]]) -> List[str]:
+    """Renders search results as markdown list parts for a use case tab."""
+    parts = ["\n### Found MCPs/APIs\n"]
+    for mcp_result in found_mcps:
+        parts.append(f"- **Name:** {mcp_result.get('name', 'N/A')}\n")
+        url = mcp_result.get("url", "N/A")
+        parts.append(f"  - **URL:** {url}\n")
+        desc = mcp_result.get("description", "")
+        desc_safe = desc.replace("\n", " ").replace("|", "\\|")  # Basic Markdown escaping
+        parts.append(f"  - **Description:** {desc_safe[:200]}{'...' if len(desc_safe) > 200 else ''}\n")
+        if mcp_result.get("corresponding_functions"):
+            parts.append(f"  - **Functions:** {mcp_result['corresponding_functions']}\n")
+        if mcp_result.get("reasoning"):
+            parts.append(f"  - **Reasoning:** {mcp_result['reasoning']}\n")
+        if mcp_result.get("stars") is not None:
+            parts.append(f"  - **Stars:** {mcp_result['stars']}\n")
+    parts.append("\n")  # Extra newline after list of MCPs
+    return parts
+
+
+def _format_source_issues(source_results: List[SourceResult]) -> List[str]:
+    """Renders a note for every source that timed out or failed."""
+    return [
+        f"_{result.source_name} {'timed out' if result.status == 'timeout' else 'failed'}; "
+        f"its results are missing._\n"
+        for result in source_results
+        if result.status != "ok"
+    ]
+
+
+async def _process_use_case_tab(
+    uc_index: int,
+    uc: UseCase,
+    tab_content_parts: List[str],
+    updates: "asyncio.Queue[Tuple[int, bool]]",
+    flowchart_response: Optional[FlowchartResponse] = None,
+):
+    """
+    Generates the flowchart (unless it came with the fused use case response) and searches MCPs/APIs
+    for one use case, appending to its tab content.
+
+    After each step `(uc_index, finished)` is put on `updates`; the final update (finished=True)
+    is always sent, even if a step fails.
+    """
+    with span("use_case", use_case_id=uc.id):
+        try:
+            # 2. Generate and append flowchart
+            if flowchart_response is None and GRADIO_STREAMING_ENABLED:
+                # Show the flowchart code as it streams in; it is replaced by the rendered chart below.
+                flowchart_start = len(tab_content_parts)
+                stream = get_flowchart_generator().stream_flowchart_async(uc.description)
+                async with contextlib.aclosing(stream):
+                    async for update in stream:
+                        flowchart_response = update.parsed
+                        code = (
+                            update.partial.get("flowchart_mermaid_code") if isinstance(update.partial, dict) else None
+                        )
+                        if update.parsed is None and isinstance(code, str) and code:
+                            del tab_content_parts[flowchart_start:]
+                            tab_content_parts.extend(_format_partial_flowchart(code))
+                            updates.put_nowait((uc_index, False))
+                del tab_content_parts[flowchart_start:]
+            elif flowchart_response is None:
+                logger.info(f"Generating flowchart for use case: '{uc.title}'")
+                flowchart_response = await get_flowchart_generator().generate_flowchart_async(uc.description)
+            flowchart_mermaid_code_for_search = ""
 
-    # Initialize the state for all potential outputs (tabs and their markdown contents)
+            if flowchart_response and flowchart_response.flowchart_mermaid_code:
+                flowchart_mermaid_code_for_search = flowchart_response.flowchart_mermaid_code
+                logger.info(f"Flowchart Mermaid Code: {flowchart_mermaid_code_for_search}")
+                tab_content_parts.append("\n### Flowchart\n")
+                if flowchart_response.reply:
+                    tab_content_parts.append(f"_{flowchart_response.reply}_\n")
+                # Ensure mermaid code block is correctly formatted
+                tab_content_parts.append(f"\n{flowchart_mermaid_code_for_search.strip()}\n")
+            else:
+                logger.warning(f"Could not generate flowchart for use case: {uc.title}")
+                tab_content_parts.append(f"\n_Could not generate flowchart for {uc.title}._\n")
+            updates.put_nowait((uc_index, False))
+
+            # 3. Search for MCPs/APIs and append
+            logger.info(f"Searching for MCPs/APIs for use case: '{uc.title}'")
+            search_query = (
+                f"Use Case Title: {uc.title}\nUse Case Description: {uc.description}\n"
+                f"Mermaid Flowchart:\n{flowchart_mermaid_code_for_search}"
+            )
+            # Results are shown as soon as the first source answers and re-merged as the others arrive.
+            search_start = len(tab_content_parts)
+            source_results: List[SourceResult] = []
+            found_mcps: List[Dict[str, Any]] = []
+            try:
+                async for source_result in search_manager.search_stream(search_query):
+                    source_results.append(source_result)
+                    found_mcps = search_manager.merge(source_results)
+                    del tab_content_parts[search_start:]
+                    if found_mcps:
+                        tab_content_parts.extend(_format_found_mcps(found_mcps))
+                    tab_content_parts.extend(_format_source_issues(source_results))
+                    updates.put_nowait((uc_index, False))
+            except Exception as e:
+                logger.exception(f"Error during MCP search for use case '{uc.title}': {e}")
+                tab_content_parts.append(f"\n_An error occurred while searching for MCPs for {uc.title}._\n")
+                return
+
+            if not found_mcps:
+                tab_content_parts.append(f"\n_No MCPs/APIs found for {uc.title}._\n")
+        except Exception as e:
+            logger.exception(f"Error while processing use case '{uc.title}': {e}")
+            tab_content_parts.append(f"\n_An error occurred while processing {uc.title}._\n")
+        finally:
+            updates.put_nowait((uc_index, True))
+
+
+def _hidden_outputs() -> List[Any]:
+    """Returns the state for all potential outputs with every tab hidden and empty."""
     # Each tab update + markdown update = 2 entries in current_outputs_state
-    current_outputs_state = []
+    outputs = []
     for i in range(MAX_TABS):
-        current_outputs_state.append(gr.update(visible=False, label=f"UC {i + 1}"))  # Tab update object
-        current_outputs_state.append(gr.update(value=""))  # Markdown update object
+        outputs.append(gr.update(visible=False, label=f"UC {i + 1}"))  # Tab update object
+        outputs.append(gr.update(value=""))  # Markdown update object
+    return outputs
+
+
+async def process_requirements_gradio(raw_requirements_text: str):
+    logger.info("Gradio app processing request...")
+
+    # Initialize the state for all potential outputs (tabs and their markdown contents)
+    current_outputs_state = _hidden_outputs()
 
     # Initial yield to set all tabs to hidden and clear content
     yield *current_outputs_state, MERMAID_TRIGGER
@@ -85,7 +263,8 @@ def process_requirements_gradio(raw_requirements_text: str):
         return
 
     try:
-        cleaned_requirements = input_parser.parse(raw_requirements_text)
+        with span("parse"):
+            cleaned_requirements = input_parser.parse(raw_requirements_text)
         # Optionally, display cleaned_requirements. For now, focusing on use case tabs.
         # If MAX_TABS > 0, could prepend to the first tab or have a dedicated "Input" tab.
         # For simplicity, we'll just log it if not directly displayed.
@@ -98,7 +277,32 @@ def process_requirements_gradio(raw_requirements_text: str):
         yield *current_outputs_state, MERMAID_TRIGGER
         return
 
-    use_cases_response = use_case_generator.generate_use_cases(cleaned_requirements)
+    if GRADIO_STREAMING_ENABLED:
+        # Show every use case in its tab as soon as its title starts streaming in
+        final_response = None
+        stream = get_use_case_generator().stream_use_cases_async(cleaned_requirements, fused=FUSED_GENERATION_ENABLED)
+        async with contextlib.aclosing(stream):
+            async for update in stream:
+                final_response = update.parsed
+                if update.parsed is not None:
+                    continue
+                partial_use_cases = _partial_use_cases(update.partial)[:MAX_TABS]
+                for uc_index, uc in enumerate(partial_use_cases):
+                    current_outputs_state[uc_index * 2] = gr.update(label=_tab_label(uc_index, uc), visible=True)
+                    current_outputs_state[uc_index * 2 + 1] = gr.update(value="".join(_format_use_case_header(uc)))
+                if partial_use_cases:
+                    yield *current_outputs_state, MERMAID_TRIGGER
+        result = split_use_case_response(final_response) if final_response else None
+        if result is None:  # Failed or unusable fused response
+            result = await generate_use_cases_and_flowcharts(
+                get_use_case_generator(), cleaned_requirements, fused=False
+            )
+        use_cases_response, flowcharts = result
+        current_outputs_state = _hidden_outputs()  # The final use cases replace the streamed ones
+    else:
+        use_cases_response, flowcharts = await generate_use_cases_and_flowcharts(
+            get_use_case_generator(), cleaned_requirements
+        )
 
     if use_cases_response and use_cases_response.use_cases:
         initial_reply_message = ""
@@ -106,94 +310,52 @@ def process_requirements_gradio(raw_requirements_text: str):
             initial_reply_message = f"**Note from UseCaseGenerator:** {use_cases_response.reply}\n\n---\n"
             logger.info(f"Reply from UseCaseGenerator: {use_cases_response.reply}")
 
-        for uc_index, uc in enumerate(use_cases_response.use_cases):
-            if uc_index >= MAX_TABS:
-                logger.warning(
-                    f"Maximum number of tabs ({MAX_TABS}) reached. Use case '{uc.title}' will not get a new tab."
-                )
-                # Optionally, append a message to the last tab's markdown if MAX_TABS > 0
-                if MAX_TABS > 0:
-                    last_tab_md_idx = (MAX_TABS - 1) * 2 + 1
-                    # To append, we'd need the current content, which is complex with update objects.
-                    # Simplest is to log and stop adding to new tabs.
-                    # Or, could add a gr.Markdown.update(value="...", append=True) if supported, but it's not.
-                break  # Stop processing more use cases for new tabs
-
-            tab_content_parts = []
-
-            # Update Tab visibility and label
-            # Tab component is at current_outputs_state[uc_index * 2]
-            # Markdown component is at current_outputs_state[uc_index * 2 + 1]
-            current_outputs_state[uc_index * 2] = gr.update(
-                label=f"UC {uc_index + 1}: {uc.title[:30].strip().rstrip('...') + '...' if len(uc.title) > 30 else uc.title.strip()}",
-                visible=True,
+        use_cases = use_cases_response.use_cases
+        if len(use_cases) > MAX_TABS:
+            # To append a note to the last tab we'd need its final content, so just log and skip the extra use cases.
+            logger.warning(
+                f"Maximum number of tabs ({MAX_TABS}) reached. "
+                f"{len(use_cases) - MAX_TABS} use case(s) will not get a new tab."
             )
-
-            # 1. Use case description
+            use_cases = use_cases[:MAX_TABS]
+
+        # 1. Show every tab with its use case description right away
+        # Tab component is at current_outputs_state[uc_index * 2]
+        # Markdown component is at current_outputs_state[uc_index * 2 + 1]
+        tab_contents: List[List[str]] = []
+        for uc_index, uc in enumerate(use_cases):
+            current_outputs_state[uc_index * 2] = gr.update(label=_tab_label(uc_index, uc), visible=True)
+            tab_content_parts = []
             if uc_index == 0 and initial_reply_message:  # Prepend general reply to first use case
                 tab_content_parts.append(initial_reply_message)
-
-            tab_content_parts.append(f"## Use Case: {uc.title} (ID: {uc.id})\n")
-            tab_content_parts.append(f"**Description:**\n{uc.description}\n")
+            tab_content_parts.extend(_format_use_case_header(uc))
             current_outputs_state[uc_index * 2 + 1] = gr.update(value="".join(tab_content_parts))
-            yield *current_outputs_state, MERMAID_TRIGGER
-
-            # 2. Generate and append flowchart
-            logger.info(f"Generating flowchart for use case: '{uc.title}'")
-            flowchart_response = flowchart_generator.generate_flowchart(uc.description)
-            flowchart_mermaid_code_for_search = ""
-
-            if flowchart_response and flowchart_response.flowchart_mermaid_code:
-                flowchart_mermaid_code_for_search = flowchart_response.flowchart_mermaid_code
-                logger.info(f"Flowchart Mermaid Code: {flowchart_mermaid_code_for_search}")
-                tab_content_parts.append("\n### Flowchart\n")
-                if flowchart_response.reply:
-                    tab_content_parts.append(f"_{flowchart_response.reply}_\n")
-                # Ensure mermaid code block is correctly formatted
-                tab_content_parts.append(f"\n{flowchart_mermaid_code_for_search.strip()}\n")
-            else:
-                logger.warning(f"Could not generate flowchart for use case: {uc.title}")
-                tab_content_parts.append(f"\n_Could not generate flowchart for {uc.title}._\n")
-            current_outputs_state[uc_index * 2 + 1] = gr.update(value="".join(tab_content_parts))
-            yield *current_outputs_state, MERMAID_TRIGGER
-
-            # 3. Search for MCPs/APIs and append
-            logger.info(f"Searching for MCPs/APIs for use case: '{uc.title}'")
-            search_query = f"Use Case Title: {uc.title}\nUse Case Description: {uc.description}\nMermaid Flowchart:\n{flowchart_mermaid_code_for_search}"
-
-            try:
-                # Call the async search_manager.search using asyncio.run()
-                found_mcps = asyncio.run(search_manager.search(search_query))
-            except Exception as e:
-                logger.exception(f"Error during MCP search for use case '{uc.title}': {e}")
-                found_mcps = []
-                tab_content_parts.append(f"\n_An error occurred while searching for MCPs for {uc.title}._\n")
-
-            if found_mcps:
-                tab_content_parts.append("\n### Found MCPs/APIs\n")
-                for mcp_result in found_mcps:
-                    tab_content_parts.append(f"- **Name:** {mcp_result.get('name', 'N/A')}\n")
-                    url = mcp_result.get("url", "N/A")
-                    tab_content_parts.append(f"  - **URL:** {url}\n")
-                    desc = mcp_result.get("description", "")
-                    desc_safe = desc.replace("\n", " ").replace("|", "\\|")  # Basic Markdown escaping
-                    tab_content_parts.append(
-                        f"  - **Description:** {desc_safe[:200]}{'...' if len(desc_safe) > 200 else ''}\n"
-                    )
-                    if mcp_result.get("corresponding_functions"):
-                        tab_content_parts.append(f"  - **Functions:** {mcp_result['corresponding_functions']}\n")
-                    if mcp_result.get("reasoning"):
-                        tab_content_parts.append(f"  - **Reasoning:** {mcp_result['reasoning']}\n")
-                    if mcp_result.get("stars") is not None:
-                        tab_content_parts.append(f"  - **Stars:** {mcp_result['stars']}\n")
-                tab_content_parts.append("\n")  # Extra newline after list of MCPs
-            else:
-                # Check if error message was already added for this search
-                if not tab_content_parts[-1].strip().startswith("_An error occurred"):
-                    tab_content_parts.append(f"\n_No MCPs/APIs found for {uc.title}._\n")
+            tab_contents.append(tab_content_parts)
+        yield *current_outputs_state, MERMAID_TRIGGER
 
-            current_outputs_state[uc_index * 2 + 1] = gr.update(value="".join(tab_content_parts))
-            yield *current_outputs_state, MERMAID_TRIGGER
+        # 2./3. Flowchart and search run for all use cases at once; a tab is refreshed as soon as one of
+        # its steps completes, regardless of how far the other tabs are.
+        updates: asyncio.Queue = asyncio.Queue()
+        tasks = [
+            asyncio.create_task(
+                _process_use_case_tab(uc_index, uc, tab_contents[uc_index], updates, flowcharts.get(uc.id))
+            )
+            for uc_index, uc in enumerate(use_cases)
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                changed = [await updates.get()]
+                while not updates.empty():  # Coalesce updates that arrived together into one yield
+                    changed.append(updates.get_nowait())
+                for uc_index, finished in changed:
+                    remaining -= finished
+                    current_outputs_state[uc_index * 2 + 1] = gr.update(value="".join(tab_contents[uc_index]))
+                yield *current_outputs_state, MERMAID_TRIGGER
+        finally:
+            # Stop outstanding LLM calls if the client went away before everything finished.
+            for task in tasks:
+                task.cancel()
     else:
         logger.warning("No use cases were generated by UseCaseGenerator, or an error occurred.")
         if MAX_TABS > 0:
@@ -207,68 +369,86 @@ def process_requirements_gradio(raw_requirements_text: str):
 
 
 # --- Gradio Blocks UI ---
-with gr.Blocks() as demo:
-    gr.HTML(MERMAID_LOADER)
-    mermaid_script_inject = gr.HTML()
-    gr.Markdown("# MCP Requirement Analyzer")
-    gr.Markdown(
-        "Input product requirements to generate use cases, Mermaid flowcharts for each use case, and recommended MCPs/APIs."
-    )
-    with gr.Row():
-        with gr.Column(scale=1):  # Input column
-            requirements_input = gr.Textbox(
-                lines=15,
-                label="Enter Product Requirements",
-                placeholder="Describe your product or feature requirements here...",
-            )
-            submit_btn = gr.Button("Analyze Requirements")
-            examples = [
-                [
-                    "I want to build a mobile app that allows users to take photos of plants and get them identified. The app should also provide care instructions for the identified plant."
-                ],
-                [
-                    "Develop a web platform for local artists to showcase and sell their artwork. Users should be able to browse art, view artist profiles, and make purchases. Artists need a dashboard to manage their listings and sales."
-                ],
-            ]
-            gr.Examples(examples=examples, inputs=requirements_input)
-
-        with gr.Column(scale=2):  # Output column with tabs
-            tab_items = []
-            md_outputs = []
-            if MAX_TABS > 0:
-                with gr.Tabs(elem_id="dynamic_tabs_container") as tabs_container:
-                    for i in range(MAX_TABS):
-                        with gr.Tab(label=f"UC {i + 1}", visible=False, elem_id=f"tab_uc_{i+1}") as tab_item:
-                            md_output = gr.Markdown(elem_id=f"md_output_uc_{i+1}")
-                            tab_items.append(tab_item)
-                            md_outputs.append(md_output)
-            else:  # Fallback if MAX_TABS is 0 (though it should be >= 1)
-                gr.Markdown("Output will appear here. (MAX_TABS is 0, configure at least 1 tab for results)")
-
-    # Prepare the list of all output components for the click handler
-    # This list must match the structure expected by the yields in process_requirements_gradio
-    all_outputs = []
-    if MAX_TABS > 0:
-        for i in range(MAX_TABS):
-            all_outputs.append(tab_items[i])
-            all_outputs.append(md_outputs[i])
-    else:
-        # If MAX_TABS is 0, the process_requirements_gradio function will have issues
-        # as it's designed to yield updates for tab and markdown pairs.
-        # For robustness, ensure MAX_TABS is at least 1 in practice.
-        # If we absolutely had to handle MAX_TABS=0, process_requirements_gradio would need
-        # a different yielding structure, and a single Markdown output might be used here.
-        # Given MAX_TABS=10, this 'else' branch for all_outputs is not hit.
-        pass
-
-    if MAX_TABS > 0:  # Only set up click if there are tabs to output to
-        submit_btn.click(
-            process_requirements_gradio, inputs=requirements_input, outputs=all_outputs + [mermaid_script_inject]
+def build_demo() -> gr.Blocks:
+    """Builds the Gradio Blocks UI."""
+    with gr.Blocks() as demo:
+        gr.HTML(MERMAID_LOADER)
+        mermaid_script_inject = gr.HTML()
+        gr.Markdown("# MCP Requirement Analyzer")
+        gr.Markdown(
+            "Input product requirements to generate use cases, Mermaid flowcharts for each use case, and recommended MCPs/APIs."
         )
-    else:
-        # If no tabs, clicking the button should perhaps show an error or do nothing.
-        # For now, it won't be wired if MAX_TABS = 0.
-        pass
+        with gr.Row():
+            with gr.Column(scale=1):  # Input column
+                requirements_input = gr.Textbox(
+                    lines=15,
+                    label="Enter Product Requirements",
+                    placeholder="Describe your product or feature requirements here...",
+                )
+                submit_btn = gr.Button("Analyze Requirements")
+                examples = [
+                    [
+                        "I want to build a mobile app that allows users to take photos of plants and get them identified. The app should also provide care instructions for the identified plant."
+                    ],
+                    [
+                        "Develop a web platform for local artists to showcase and sell their artwork. Users should be able to browse art, view artist profiles, and make purchases. Artists need a dashboard to manage their listings and sales."
+                    ],
+                ]
+                gr.Examples(examples=examples, inputs=requirements_input)
+
+            with gr.Column(scale=2):  # Output column with tabs
+                tab_items = []
+                md_outputs = []
+                if MAX_TABS > 0:
+                    with gr.Tabs(elem_id="dynamic_tabs_container"):
+                        for i in range(MAX_TABS):
+                            with gr.Tab(label=f"UC {i + 1}", visible=False, elem_id=f"tab_uc_{i+1}") as tab_item:
+                                md_output = gr.Markdown(elem_id=f"md_output_uc_{i+1}")
+                                tab_items.append(tab_item)
+                                md_outputs.append(md_output)
+                else:  # Fallback if MAX_TABS is 0 (though it should be >= 1)
+                    gr.Markdown("Output will appear here. (MAX_TABS is 0, configure at least 1 tab for results)")
+
+        # Prepare the list of all output components for the click handler
+        # This list must match the structure expected by the yields in process_requirements_gradio
+        all_outputs = []
+        if MAX_TABS > 0:
+            for i in range(MAX_TABS):
+                all_outputs.append(tab_items[i])
+                all_outputs.append(md_outputs[i])
+        else:
+            # If MAX_TABS is 0, the process_requirements_gradio function will have issues
+            # as it's designed to yield updates for tab and markdown pairs.
+            # For robustness, ensure MAX_TABS is at least 1 in practice.
+            # If we absolutely had to handle MAX_TABS=0, process_requirements_gradio would need
+            # a different yielding structure, and a single Markdown output might be used here.
+            # Given MAX_TABS=10, this 'else' branch for all_outputs is not hit.
+            pass
+
+        # Start and warm up the search sources and tokenizers when the page loads, not on the first request
+        demo.load(start_up)
+
+        if MAX_TABS > 0:  # Only set up click if there are tabs to output to
+            submit_btn.click(
+                process_requirements_gradio, inputs=requirements_input, outputs=all_outputs + [mermaid_script_inject]
+            )
+        else:
+            # If no tabs, clicking the button should perhaps show an error or do nothing.
+            # For now, it won't be wired if MAX_TABS = 0.
+            pass
+
+    return demo
+
+
+def create_app() -> FastAPI:
+    """Returns the web app: the Gradio UI at / and the Prometheus metrics at /metrics."""
+    app = FastAPI()
+
+    @app.get("/metrics")
+    def metrics():
+        return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+    return gr.mount_gradio_app(app, build_demo(), path="/")
 
 
 if __name__ == "__main__":
@@ -280,4 +460,4 @@ if __name__ == "__main__":
 
     logger.info("Launching Gradio Blocks interface...")
     server_port = int(os.environ.get("PORT", 7860))  # Use PORT from env, default to 7860 if not set
-    demo.launch(server_name="0.0.0.0", server_port=server_port, share=False)
+    uvicorn.run(create_app(), host="0.0.0.0", port=server_port)
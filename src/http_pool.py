@@ -0,0 +1,49 @@
+"""
+Process-wide HTTP connection pool.
+
+OpenAI clients, GitHub API calls and the scraped sources all send their requests through one
+`httpx.AsyncClient`, so TLS connections (and HTTP/2 streams) are reused across searches instead
+of every component keeping, and leaking, its own pool. Components must not close the shared
+client themselves; the owner of the process lifecycle (SearchManager, the CLI) calls
+`close_http_client()` on shutdown.
+
+The pool's 30s read timeout suits the GitHub and scraping requests; the OpenAI clients override it per
+request with `LLM_TIMEOUT`, since large structured LLM calls routinely take longer.
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+
+from src.config import LLM_REQUEST_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+LLM_TIMEOUT = httpx.Timeout(LLM_REQUEST_TIMEOUT_SECONDS, connect=5.0)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Creates a client with the shared pool settings (HTTP/2, keep-alive)."""
+    return httpx.AsyncClient(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS, follow_redirects=True)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the process-wide client, creating it on first use (or after it was closed)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+    return _http_client
+
+
+async def close_http_client():
+    """Closes the process-wide client and all of its connections."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+        logger.info("Closed the shared HTTP connection pool.")
+    _http_client = None
@@ -0,0 +1,180 @@
+"""
+Persistent, content-addressed cache for structured LLM responses.
+
+Responses are stored in a SQLite database keyed by a hash of (model, prompts, response schema,
+request options), so identical requests (Gradio examples, retries, repeated briefs) are answered
+from disk in milliseconds. Entries expire after a TTL and the least recently used entries are
+evicted once the cache exceeds its size bound. SQLite in WAL mode makes the cache safe to share
+between threads and between worker processes on the same volume.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from src.config import LLM_CACHE_ENABLED, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model: str, input: List[Dict[str, Any]], text_format: Type[BaseModel], **options: Any) -> str:
+    """
+    Hashes everything that determines a structured response.
+
+    Args:
+        model: The model name.
+        input: The request messages (system and user prompts).
+        text_format: The pydantic response schema.
+        **options: Other request options that change the output, e.g. temperature.
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "input": input,
+            "schema": text_format.model_json_schema(),
+            "options": options,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    TTL + size-bounded LRU cache of serialized LLM responses backed by SQLite.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per operation keeps the cache safe to use from any thread.
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _count(self, hit: bool):
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached value for `key`, or None if it is missing or expired."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    row = None
+                if row is not None:
+                    conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            row = None
+        finally:
+            conn.close()
+        self._count(row is not None)
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: str):
+        """Stores `value` under `key` and evicts expired and least recently used entries."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+        finally:
+            conn.close()
+
+    def get_model(self, key: str, text_format: Type[BaseModel]) -> Optional[BaseModel]:
+        """Returns the cached response parsed into `text_format`, or None on a miss."""
+        value = self.get(key)
+        if value is None:
+            return None
+        try:
+            return text_format.model_validate_json(value)
+        except ValueError:
+            logger.warning(f"Discarding cached LLM response that no longer matches {text_format.__name__}.")
+            return None
+
+    def set_model(self, key: str, model: BaseModel):
+        """Stores a parsed response."""
+        self.set(key, model.model_dump_json())
+
+    def clear(self):
+        """Removes all entries and resets the counters."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM responses")
+        finally:
+            conn.close()
+        with self._counter_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Returns hit/miss counters (for this process) and the number of stored entries."""
+        conn = self._connect()
+        try:
+            entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        finally:
+            conn.close()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Returns the shared LLM response cache, or None if caching is disabled (LLM_CACHE_ENABLED)."""
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES)
+            logger.info(f"LLM response cache enabled at {LLM_CACHE_PATH}.")
+    return _llm_cache
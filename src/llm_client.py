@@ -0,0 +1,453 @@
+"""
+Shared entry points for structured (pydantic) LLM calls.
+
+UseCaseGenerator, FlowchartGenerator and GitHubSource send every `responses.parse` request
+through these helpers, which consult the persistent response cache before calling OpenAI.
+Every request draws on the RPM/TPM budget of the process-wide adaptive rate limiter. Async requests
+additionally hold one of its concurrency slots and follow the `RequestPolicy` of their pipeline
+stage: 429s and transient API errors are retried with jittered backoff (the OpenAI clients are created with `max_retries=0`, so every 429 reaches the
+limiter), and optionally a slow request is hedged with a duplicate once it exceeds the stage's
+observed p95 latency.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, NamedTuple, Optional, Type, TypeVar
+
+import openai
+from pydantic import BaseModel
+
+from src.config import LLM_HEDGE_MIN_DELAY_SECONDS, LLM_HEDGE_QUANTILE, LLM_HEDGE_STAGES, LLM_MAX_RETRIES
+from src.llm_cache import get_llm_cache, make_cache_key
+from src.partial_json import PartialJSONParser
+from src.rate_limiter import AdaptiveRateLimiter, get_rate_limiter, parse_retry_after
+from src.telemetry import format_metric, registry, span
+from src.token_counter import get_token_counter, load_token_counter
+
+logger = logging.getLogger(__name__)
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+# Completion tokens assumed for the TPM budget when the request sets no max_output_tokens
+DEFAULT_OUTPUT_TOKEN_ESTIMATE = 1000
+# Minimum interval between two partial updates of a streamed response
+STREAM_UPDATE_INTERVAL_SECONDS = 0.1
+# Latencies kept per stage, and how many are needed before hedging starts
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+
+class RequestPolicy(NamedTuple):
+    """How the requests of one pipeline stage are retried and hedged."""
+
+    max_retries: int = LLM_MAX_RETRIES
+    # Retry backoff is drawn uniformly from [0, min(max, base * 2^attempt)] ("full jitter")
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 8.0
+    hedge: bool = False
+    hedge_quantile: float = LLM_HEDGE_QUANTILE
+    hedge_min_delay: float = LLM_HEDGE_MIN_DELAY_SECONDS
+
+
+class StageStats:
+    """Latency window and counters of one pipeline stage."""
+
+    def __init__(self):
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.retries = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.failures = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns the q-quantile of the recent latencies, or None while there are too few samples."""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "failures": self.failures,
+            "p95_seconds": self.quantile(0.95),
+        }
+
+
+DEFAULT_STAGE = "default"
+_stage_policies: Dict[str, RequestPolicy] = {stage: RequestPolicy(hedge=True) for stage in LLM_HEDGE_STAGES}
+_stage_stats: Dict[str, StageStats] = {}
+
+
+def get_stage_policy(stage: str) -> RequestPolicy:
+    """Returns the request policy of a stage (the default policy if none was set)."""
+    return _stage_policies.get(stage, RequestPolicy())
+
+
+def set_stage_policy(stage: str, policy: RequestPolicy):
+    """Sets the request policy of a stage, e.g. `set_stage_policy("flowchart", RequestPolicy(hedge=True))`."""
+    _stage_policies[stage] = policy
+
+
+def get_stage_stats(stage: str) -> StageStats:
+    if stage not in _stage_stats:
+        _stage_stats[stage] = StageStats()
+    return _stage_stats[stage]
+
+
+def get_llm_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns request, retry and hedge counters plus the p95 latency of every stage."""
+    return {stage: stats.snapshot() for stage, stats in _stage_stats.items()}
+
+
+def set_llm_concurrency(limit: int):
+    """Caps the number of async LLM requests in flight process-wide (<= 0 for no cap)."""
+    get_rate_limiter().set_max_concurrency(limit)
+
+
+def estimate_request_tokens(model: str, input: List[Dict[str, Any]], options: Dict[str, Any]) -> int:
+    """Estimates the total tokens (prompt plus completion) a request will consume."""
+    counter = get_token_counter(model)
+    # Counted per message: the large system prompts repeat and hit the counter's memo.
+    prompt_tokens = sum(counter.count(str(message.get("content", ""))) + 4 for message in input)
+    return prompt_tokens + int(options.get("max_output_tokens") or DEFAULT_OUTPUT_TOKEN_ESTIMATE)
+
+
+def _used_tokens(response) -> Optional[int]:
+    total = getattr(getattr(response, "usage", None), "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+def parse_structured(
+    client,
+    *,
+    model: str,
+    input: List[Dict[str, Any]],
+    text_format: Type[ResponseModel],
+    stage: str = DEFAULT_STAGE,
+    **options: Any,
+) -> Optional[ResponseModel]:
+    """
+    Calls `client.responses.parse` and returns the parsed response, using the LLM cache if enabled.
+
+    Args:
+        client: An `OpenAI` client.
+        model: The model name.
+        input: The request messages.
+        text_format: The pydantic response schema.
+        **options: Additional request options (e.g. temperature); they are part of the cache key.
+        stage: Pipeline stage of the request, used as the name of its tracing span.
+
+    Returns:
+        The parsed response, or None if the model returned no parsable output.
+    """
+    with span(f"llm.{stage}", model=model) as llm_span:
+        cache = get_llm_cache()
+        key = make_cache_key(model, input, text_format, **options) if cache else None
+        if cache:
+            cached = cache.get_model(key, text_format)
+            llm_span.set_attribute("cache_hit", cached is not None)
+            if cached is not None:
+                logger.info(f"LLM cache hit for {text_format.__name__} ({model}).")
+                return cached
+
+        # Sync requests draw on the same RPM/TPM budget as the async ones, so they cannot overrun it.
+        limiter = get_rate_limiter()
+        estimated_tokens = estimate_request_tokens(model, input, options) if limiter.token_bucket is not None else 0
+        with limiter.acquire_sync(estimated_tokens) as permit:
+            try:
+                response = client.responses.parse(model=model, input=input, text_format=text_format, **options)
+            except openai.RateLimitError as e:
+                limiter.on_rate_limited(permit, parse_retry_after(e.response.headers))
+                raise
+            limiter.record_usage(permit, _used_tokens(response))
+        parsed = response.output_parsed
+        if cache and parsed is not None:
+            cache.set_model(key, parsed)
+        return parsed
+
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+def _retry_delay(
+    error: Exception, attempt: int, policy: RequestPolicy, limiter: AdaptiveRateLimiter, permit
+) -> Optional[float]:
+    """Returns the jittered backoff before retrying after `error`, or None if the error must be raised."""
+    if isinstance(error, openai.RateLimitError):
+        if error.code == "insufficient_quota":
+            return None
+        # Jitter on top of Retry-After so that paused requests don't all resume at once.
+        delay = limiter.on_rate_limited(permit, parse_retry_after(error.response.headers))
+        delay += random.uniform(0, policy.retry_base_delay)
+    else:
+        delay = random.uniform(0, min(policy.retry_max_delay, policy.retry_base_delay * 2**attempt))
+    if attempt >= policy.max_retries:
+        return None
+    logger.warning(f"LLM request failed ({type(error).__name__}), retrying in {delay:.1f}s: {error}")
+    return delay
+
+
+async def _send_with_retries(
+    client,
+    request: Dict[str, Any],
+    policy: RequestPolicy,
+    stats: StageStats,
+    limiter: AdaptiveRateLimiter,
+    estimated_tokens: int,
+    sent: asyncio.Event,
+):
+    """Sends one request through the rate limiter, retrying 429s and transient errors with jitter."""
+    for attempt in range(policy.max_retries + 1):
+        async with limiter.acquire(estimated_tokens) as permit:
+            sent.set()
+            started = time.monotonic()
+            try:
+                response = await client.responses.parse(**request)
+            except RETRYABLE_ERRORS as e:
+                delay = _retry_delay(e, attempt, policy, limiter, permit)
+                if delay is None:
+                    raise
+            else:
+                stats.latencies.append(time.monotonic() - started)
+                limiter.on_success(permit, _used_tokens(response))
+                return response
+        stats.retries += 1
+        # Wait outside the limiter so the slot is free for others in the meantime.
+        await asyncio.sleep(delay)
+
+
+async def _send_hedged(send, policy: RequestPolicy, stats: StageStats, limiter: AdaptiveRateLimiter, stage: str):
+    """
+    Runs `send(sent_event)`; if it is still running `hedge_delay` after the request was sent, starts a
+    duplicate and returns whichever succeeds first, cancelling the other.
+    """
+    sent = asyncio.Event()
+    primary = asyncio.create_task(send(sent))
+    tasks = {primary}
+    try:
+        p_latency = stats.quantile(policy.hedge_quantile) if policy.hedge else None
+        if p_latency is None:
+            return await primary
+        waiting_for_send = asyncio.create_task(sent.wait())
+        try:
+            await asyncio.wait({primary, waiting_for_send}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiting_for_send.cancel()
+        hedge_delay = max(policy.hedge_min_delay, p_latency)
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        # Don't hedge into a saturated limiter: the duplicate would only queue behind other work.
+        if done or not limiter.has_spare_capacity():
+            return await primary
+
+        stats.hedges_fired += 1
+        logger.info(f"Hedging {stage} request after {hedge_delay:.1f}s ({stats.hedges_fired} hedges so far).")
+        hedge = asyncio.create_task(send(asyncio.Event()))
+        tasks.add(hedge)
+        error: Optional[BaseException] = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            # Retrieve every exception, so a failed duplicate is never reported as unhandled.
+            failed = {task for task in done if task.exception() is not None}
+            for task in done - failed:
+                if task is hedge:
+                    stats.hedges_won += 1
+                return task.result()
+            error = next(iter(failed)).exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def parse_structured_async(
+    client,
+    *,
+    model: str,
+    input: List[Dict[str, Any]],
+    text_format: Type[ResponseModel],
+    stage: str = DEFAULT_STAGE,
+    **options: Any,
+) -> Optional[ResponseModel]:
+    """
+    Async version of `parse_structured` for an `AsyncOpenAI` client.
+    Cache reads and writes run in a worker thread so they never block the event loop.
+
+    Args:
+        stage: Pipeline stage of the request (e.g. "flowchart"); selects the retry/hedging policy
+            and the latency statistics. Not part of the cache key.
+    """
+    with span(f"llm.{stage}", model=model) as llm_span:
+        cache = get_llm_cache()
+        key = make_cache_key(model, input, text_format, **options) if cache else None
+        if cache:
+            cached = await asyncio.to_thread(cache.get_model, key, text_format)
+            llm_span.set_attribute("cache_hit", cached is not None)
+            if cached is not None:
+                logger.info(f"LLM cache hit for {text_format.__name__} ({model}).")
+                return cached
+
+        # Cache hits above never wait for the rate limiter.
+        limiter = get_rate_limiter()
+        policy = get_stage_policy(stage)
+        stats = get_stage_stats(stage)
+        estimated_tokens = 0
+        if limiter.token_bucket is not None:
+            await load_token_counter(model)  # A missing encoding is loaded off the event loop
+            estimated_tokens = estimate_request_tokens(model, input, options)
+        request = dict(model=model, input=input, text_format=text_format, **options)
+
+        stats.requests += 1
+        try:
+            response = await _send_hedged(
+                lambda sent: _send_with_retries(client, request, policy, stats, limiter, estimated_tokens, sent),
+                policy,
+                stats,
+                limiter,
+                stage,
+            )
+        except Exception:
+            stats.failures += 1
+            raise
+        parsed = response.output_parsed
+        if cache and parsed is not None:
+            await asyncio.to_thread(cache.set_model, key, parsed)
+        return parsed
+
+
+class StreamUpdate(NamedTuple):
+    """One update of a streamed structured response."""
+
+    # JSON decoded from the output so far (dicts and lists; strings may be cut off), None before anything arrived
+    partial: Any
+    # The validated response; set on the final update only
+    parsed: Optional[BaseModel] = None
+
+
+async def stream_structured_async(
+    client,
+    *,
+    model: str,
+    input: List[Dict[str, Any]],
+    text_format: Type[ResponseModel],
+    stage: str = DEFAULT_STAGE,
+    min_interval: float = STREAM_UPDATE_INTERVAL_SECONDS,
+    **options: Any,
+) -> AsyncIterator[StreamUpdate]:
+    """
+    Streaming version of `parse_structured_async`: yields the partially decoded output at most every
+    `min_interval` seconds, then a final update with the parsed response (None if unparsable).
+
+    Errors before the first partial update are retried like in `parse_structured_async`; later errors
+    are raised, since part of the output has already been shown. Streams are never hedged. Consumers
+    that may stop early should close the generator (e.g. with `contextlib.aclosing`) to free its slot.
+    """
+    # Not activated: the span stays open across the yields below, while the consumer runs in between
+    with span(f"llm.{stage}", activate=False, model=model, streamed=True) as llm_span:
+        cache = get_llm_cache()
+        key = make_cache_key(model, input, text_format, **options) if cache else None
+        if cache:
+            cached = await asyncio.to_thread(cache.get_model, key, text_format)
+            llm_span.set_attribute("cache_hit", cached is not None)
+            if cached is not None:
+                logger.info(f"LLM cache hit for {text_format.__name__} ({model}).")
+                yield StreamUpdate(cached.model_dump(), cached)
+                return
+
+        limiter = get_rate_limiter()
+        policy = get_stage_policy(stage)
+        stats = get_stage_stats(stage)
+        estimated_tokens = 0
+        if limiter.token_bucket is not None:
+            await load_token_counter(model)  # A missing encoding is loaded off the event loop
+            estimated_tokens = estimate_request_tokens(model, input, options)
+
+        stats.requests += 1
+        try:
+            for attempt in range(policy.max_retries + 1):
+                parser = PartialJSONParser()
+                streamed = False
+                async with limiter.acquire(estimated_tokens) as permit:
+                    started = last_update = time.monotonic()
+                    try:
+                        async with client.responses.stream(
+                            model=model, input=input, text_format=text_format, **options
+                        ) as stream:
+                            async for event in stream:
+                                if event.type != "response.output_text.delta":
+                                    continue
+                                parser.feed(event.delta)
+                                now = time.monotonic()
+                                if now - last_update >= min_interval:
+                                    partial = parser.snapshot()
+                                    if partial is not None:
+                                        last_update = now
+                                        streamed = True
+                                        yield StreamUpdate(partial)
+                            response = await stream.get_final_response()
+                    except RETRYABLE_ERRORS as e:
+                        delay = None if streamed else _retry_delay(e, attempt, policy, limiter, permit)
+                        if delay is None:
+                            raise
+                    else:
+                        stats.latencies.append(time.monotonic() - started)
+                        limiter.on_success(permit, _used_tokens(response))
+                        break
+                stats.retries += 1
+                await asyncio.sleep(delay)
+        except Exception:
+            stats.failures += 1
+            raise
+
+        parsed = response.output_parsed
+        if cache and parsed is not None:
+            await asyncio.to_thread(cache.set_model, key, parsed)
+        yield StreamUpdate(parsed.model_dump() if parsed is not None else parser.snapshot(), parsed)
+
+
+_STAGE_COUNTERS = {
+    "requests": "LLM requests per stage (excluding cache hits).",
+    "retries": "LLM request retries per stage.",
+    "hedges_fired": "Hedged duplicate LLM requests sent per stage.",
+    "hedges_won": "Hedged duplicate LLM requests that answered first.",
+    "failures": "LLM requests that failed after all retries.",
+}
+
+
+def _collect_metrics() -> List[str]:
+    """Exports the per-stage request counters and the rate limiter state to /metrics."""
+    snapshots = get_llm_stats()
+    lines = []
+    for counter, help_text in _STAGE_COUNTERS.items():
+        samples = [({"stage": stage}, snapshot[counter]) for stage, snapshot in sorted(snapshots.items())]
+        lines += format_metric(f"mcp_agent_llm_{counter}_total", "counter", help_text, samples)
+    limiter = get_rate_limiter().stats()
+    lines += format_metric(
+        "mcp_agent_llm_concurrency_limit",
+        "gauge",
+        "Current adaptive LLM concurrency limit.",
+        [({}, limiter["concurrency_limit"])],
+    )
+    lines += format_metric(
+        "mcp_agent_llm_in_flight", "gauge", "LLM requests holding a limiter slot.", [({}, limiter["in_flight"])]
+    )
+    lines += format_metric(
+        "mcp_agent_llm_waiting", "gauge", "LLM requests waiting for a limiter slot.", [({}, limiter["waiting"])]
+    )
+    lines += format_metric(
+        "mcp_agent_llm_rate_limited_total",
+        "counter",
+        "429 responses received from OpenAI.",
+        [({}, limiter["rate_limited"])],
+    )
+    return lines
+
+
+registry.register_collector(_collect_metrics)
@@ -2,17 +2,21 @@
 MCP-Agent Main CLI Application
 """
 
+import argparse
 import asyncio  # Added asyncio
 import logging
+from typing import Any, Dict, List, Optional, Tuple
 
-from src.config import configure_logging
-from src.flowchart_generator import FlowchartGenerator  # Added FlowchartGenerator
+from src.config import FUSED_GENERATION_ENABLED, USE_CASE_CONCURRENCY, configure_logging
+from src.flowchart_generator import MODEL_NAME as FLOWCHART_MODEL_NAME
+from src.flowchart_generator import FlowchartGenerator, FlowchartResponse
+from src.http_pool import close_http_client
 from src.input_parser import InputParser
-from src.search_engine.search_manager import (  # Added SearchManager
-    SearchManager,
-)
-from src.search_engine.sources.github_source import GitHubSource
-from src.use_case_generator import UseCaseGenerator
+from src.search_engine.search_manager import SearchManager, SearchResponse
+from src.telemetry import span
+from src.token_counter import load_token_counters
+from src.use_case_generator import MODEL_NAME as USE_CASE_MODEL_NAME
+from src.use_case_generator import UseCase, UseCaseGenerator, generate_use_cases_and_flowcharts
 
 configure_logging()
 
@@ -37,9 +41,91 @@ def get_user_requirements() -> str:
     return "\n".join(lines)
 
 
-async def main():  # Changed to async def
+async def process_use_case(
+    uc: UseCase,
+    flowchart_generator: FlowchartGenerator,
+    search_manager: SearchManager,
+    semaphore: asyncio.Semaphore,
+    flowchart_response: Optional[FlowchartResponse] = None,
+) -> Tuple[Optional[FlowchartResponse], SearchResponse]:
+    """
+    Generates the flowchart for a use case and then searches MCPs/APIs for it.
+
+    Args:
+        uc: The use case to process.
+        flowchart_generator: Generator used for the Mermaid flowchart.
+        search_manager: SearchManager used for the MCP/API search.
+        semaphore: Bounds how many use cases are processed at the same time.
+        flowchart_response: Flowchart already generated in fused mode; skips the flowchart call.
+
+    Returns:
+        The flowchart response (None if generation failed) and the search response, which also
+        records the status of every search source.
+    """
+    async with semaphore:
+        with span("use_case", use_case_id=uc.id):
+            # 4a. Generate Flowchart for the use case (unless it came with the fused use case response)
+            if flowchart_response is None:
+                logger.info(f"Generating flowchart for use case: '{uc.title}'")
+                flowchart_response = await flowchart_generator.generate_flowchart_async(uc.description)
+            flowchart_code = flowchart_response.flowchart_mermaid_code if flowchart_response else ""
+
+            # 4b. Search for MCPs/APIs for the use case
+            logger.info(f"Searching for MCPs/APIs for use case: '{uc.title}'")
+            # Using title and description and flowchart for search
+            search_query = f"{uc.title} {uc.description}\n Flowchart: {flowchart_code}"
+            search_response = await search_manager.search_detailed(search_query)
+    return flowchart_response, search_response
+
+
+def print_use_case_result(
+    uc: UseCase, flowchart_response: Optional[FlowchartResponse], found_mcps: List[Dict[str, Any]]
+):
+    """
+    Prints the flowchart and the found MCPs/APIs of a processed use case.
+    """
+    print(f"\nProcessing Use Case: {uc.title} (ID: {uc.id})")
+    print(f"Description: {uc.description}")
+
+    if flowchart_response and flowchart_response.flowchart_mermaid_code:
+        print(f"\n--- Flowchart for {uc.title} ---")
+        if flowchart_response.reply:
+            print(f"Flowchart Description: {flowchart_response.reply}")
+        print("```mermaid")
+        print(flowchart_response.flowchart_mermaid_code)
+        print("```")
+        print("-----------------------------------\n")
+    else:
+        logger.warning(f"Could not generate flowchart for use case: {uc.title}")
+        print(f"--- No Flowchart Generated for {uc.title} ---\n")
+
+    if found_mcps:
+        print(f"--- Found MCPs/APIs for Use Case: {uc.title} ---")
+        for mcp_result in found_mcps:
+            print(f"  Name: {mcp_result.get('name', 'N/A')}")
+            print(f"  URL: {mcp_result.get('url', 'N/A')}")
+            description = mcp_result.get("description", "")
+            print(f"  Description: {description[:150]}..." if description else "N/A")
+            if mcp_result.get("corresponding_functions"):
+                print(f"  Functions: {mcp_result['corresponding_functions']}")
+            if mcp_result.get("reasoning"):
+                print(f"  Reasoning: {mcp_result['reasoning']}")
+            if mcp_result.get("stars") is not None:
+                print(f"  Stars: {mcp_result['stars']}")
+            print("  " + "." * 20)
+        print("--------------------------------------------------\n")
+    else:
+        print(f"No MCPs/APIs found for use case: {uc.title}\n")
+    print("====================================================\n")  # Separator for each use case block
+
+
+async def main(concurrency: int = USE_CASE_CONCURRENCY, fused: bool = FUSED_GENERATION_ENABLED):
     """
     Main function to run the MCP-Agent.
+
+    Args:
+        concurrency: Maximum number of use cases whose flowchart and search run at the same time.
+        fused: Whether use cases and flowcharts are generated in a single LLM call.
     """
     logger.info("MCP-Agent starting...")
 
@@ -53,7 +139,8 @@ async def main():  # Changed to async def
     # 2. Call InputParser
     parser = InputParser()
     try:
-        cleaned_requirements = parser.parse(raw_requirements)
+        with span("parse"):
+            cleaned_requirements = parser.parse(raw_requirements)
         print("\n--- Cleaned Requirements ---")
         print(cleaned_requirements)
         print("--------------------------\n")
@@ -61,9 +148,12 @@ async def main():  # Changed to async def
         logger.exception(f"Error processing input: {e}")
         return
 
-    # 3. Call UseCaseGenerator
+    # 3. Call UseCaseGenerator (tokenizers are loaded first, off the event loop)
+    await load_token_counters([USE_CASE_MODEL_NAME, FLOWCHART_MODEL_NAME])
     use_case_generator = UseCaseGenerator()
-    use_cases_response = use_case_generator.generate_use_cases(cleaned_requirements)
+    use_cases_response, flowcharts = await generate_use_cases_and_flowcharts(
+        use_case_generator, cleaned_requirements, fused=fused
+    )
 
     if use_cases_response and use_cases_response.use_cases:
         print(f"Reply from UseCaseGenerator: {use_cases_response.reply}")
@@ -78,55 +168,32 @@ async def main():  # Changed to async def
         # Initialize FlowchartGenerator
         flowchart_generator = FlowchartGenerator()
 
-        # 4. Initialize SearchManager
-        github_source = GitHubSource()
-        search_manager = SearchManager([github_source])
-
-        # Process each use case
-        for uc in use_cases_response.use_cases:
-            print(f"\nProcessing Use Case: {uc.title} (ID: {uc.id})")
-            print(f"Description: {uc.description}")
-
-            # 4a. Generate Flowchart for the use case
-            logger.info(f"Generating flowchart for use case: '{uc.title}'")
-            flowchart_response = flowchart_generator.generate_flowchart(uc.description)
-
-            if flowchart_response and flowchart_response.flowchart_mermaid_code:
-                print(f"\n--- Flowchart for {uc.title} ---")
-                if flowchart_response.reply:
-                    print(f"Flowchart Description: {flowchart_response.reply}")
-                print("```mermaid")
-                print(flowchart_response.flowchart_mermaid_code)
-                print("```")
-                print("-----------------------------------\n")
-            else:
-                logger.warning(f"Could not generate flowchart for use case: {uc.title}")
-                print(f"--- No Flowchart Generated for {uc.title} ---\n")
-
-            # 4b. Search for MCPs/APIs for the use case
-            logger.info(f"Searching for MCPs/APIs for use case: '{uc.title}'")
-            search_query = f"{uc.title} {uc.description}\n Flowchart: {flowchart_response.flowchart_mermaid_code}"
-            # Using title and description and flowchart for search
-            found_mcps = await search_manager.search(search_query)
-
-            if found_mcps:
-                print(f"--- Found MCPs/APIs for Use Case: {uc.title} ---")
-                for mcp_result in found_mcps:
-                    print(f"  Name: {mcp_result.get('name', 'N/A')}")
-                    print(f"  URL: {mcp_result.get('url', 'N/A')}")
-                    description = mcp_result.get("description", "")
-                    print(f"  Description: {description[:150]}..." if description else "N/A")
-                    if mcp_result.get("corresponding_functions"):
-                        print(f"  Functions: {mcp_result['corresponding_functions']}")
-                    if mcp_result.get("reasoning"):
-                        print(f"  Reasoning: {mcp_result['reasoning']}")
-                    if mcp_result.get("stars") is not None:
-                        print(f"  Stars: {mcp_result['stars']}")
-                    print("  " + "." * 20)
-                print("--------------------------------------------------\n")
-            else:
-                print(f"No MCPs/APIs found for use case: {uc.title}\n")
-            print("====================================================\n")  # Separator for each use case block
+        # 4. Initialize SearchManager; it creates (from SEARCH_SOURCES_ENABLED), starts, warms up and closes its sources
+        search_manager = SearchManager()
+
+        async with search_manager:
+            # Process all use cases concurrently (bounded by `concurrency`) and print them in use-case order
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+            tasks = [
+                asyncio.create_task(
+                    process_use_case(uc, flowchart_generator, search_manager, semaphore, flowcharts.get(uc.id))
+                )
+                for uc in use_cases_response.use_cases
+            ]
+            try:
+                for uc, task in zip(use_cases_response.use_cases, tasks):
+                    try:
+                        flowchart_response, search_response = await task
+                    except Exception as e:
+                        logger.exception(f"Processing use case '{uc.title}' failed: {e}")
+                        print(f"\nProcessing Use Case: {uc.title} (ID: {uc.id}) failed: {e}\n")
+                        continue
+                    print_use_case_result(uc, flowchart_response, search_response.results)
+            finally:
+                # On cancellation (or any other exit) no task may outlive the SearchManager
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
     else:
         logger.warning("No use cases were generated, or an error occurred.")
@@ -135,5 +202,32 @@ async def main():  # Changed to async def
     logger.info("MCP-Agent processing complete.")
 
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses the CLI options."""
+    arg_parser = argparse.ArgumentParser(description="MCP-Agent: find MCPs/APIs for your product requirements.")
+    arg_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=USE_CASE_CONCURRENCY,
+        help=f"Maximum number of use cases processed at the same time (default: {USE_CASE_CONCURRENCY}).",
+    )
+    arg_parser.add_argument(
+        "--fused",
+        action=argparse.BooleanOptionalAction,
+        default=FUSED_GENERATION_ENABLED,
+        help="Generate use cases and their flowcharts in a single LLM call.",
+    )
+    return arg_parser.parse_args(argv)
+
+
+async def run(concurrency: int = USE_CASE_CONCURRENCY, fused: bool = FUSED_GENERATION_ENABLED):
+    """Runs the CLI and closes the shared HTTP connection pool on exit."""
+    try:
+        await main(concurrency=concurrency, fused=fused)
+    finally:
+        await close_http_client()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())  # Run the async main function
+    args = parse_args()
+    asyncio.run(run(concurrency=args.concurrency, fused=args.fused))  # Run the async main function
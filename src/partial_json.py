@@ -0,0 +1,140 @@
+"""
+Incremental parser for truncated JSON, used to show structured LLM output while it streams.
+
+`PartialJSONParser.feed()` scans only the newly arrived characters and keeps track of the open
+containers and of the last position where the document can be cut cleanly. `snapshot()` then
+completes the prefix (closing a value string that is still streaming, dropping a dangling key or
+an incomplete number/literal, closing open objects and arrays) and decodes it, e.g.
+
+    '{"use_cases": [{"id": 1, "title": "User reg'  ->  {"use_cases": [{"id": 1, "title": "User reg"}]}
+"""
+
+import json
+from typing import Any, List, Optional
+
+_CLOSERS = {"{": "}", "[": "]"}
+_SCALAR_DELIMITERS = set(",}] \t\r\n")
+
+
+class PartialJSONParser:
+    """
+    Parses a JSON document that arrives in chunks.
+    """
+
+    def __init__(self):
+        self.text = ""
+        # Open containers, and per container the expected token: "key", "colon", "value" or "after".
+        self._stack: List[str] = []
+        self._states: List[str] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._unicode_digits = 0
+        self._scalar_start: Optional[int] = None
+        # Longest prefix that is valid JSON once the open containers are closed.
+        self._safe = 0
+        self._started = False
+
+    @property
+    def complete(self) -> bool:
+        """Whether the top-level value has been closed."""
+        return self._started and not self._stack and not self._in_string and self._scalar_start is None
+
+    def feed(self, chunk: str):
+        """Appends a chunk of the document."""
+        start = len(self.text)
+        self.text += chunk
+        for pos in range(start, len(self.text)):
+            self._scan(self.text[pos], pos)
+
+    def _value_done(self, end: int):
+        if self._states:
+            self._states[-1] = "after"
+        self._safe = end
+
+    def _scan(self, char: str, pos: int):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+                self._unicode_digits = 4 if char == "u" else 0
+            elif self._unicode_digits:
+                self._unicode_digits -= 1
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._string_is_key:
+                    self._states[-1] = "colon"
+                else:
+                    self._value_done(pos + 1)
+            return
+
+        if self._scalar_start is not None:
+            if char not in _SCALAR_DELIMITERS:
+                return
+            self._scalar_start = None
+            self._value_done(pos)
+
+        if char in "{[":
+            self._started = True
+            self._stack.append(char)
+            self._states.append("key" if char == "{" else "value")
+            self._safe = pos + 1
+        elif char in "}]":
+            if self._stack:
+                self._stack.pop()
+                self._states.pop()
+            self._value_done(pos + 1)
+        elif char == '"':
+            self._started = True
+            self._in_string = True
+            self._string_is_key = bool(self._states) and self._states[-1] == "key"
+        elif char == ":":
+            if self._states:
+                self._states[-1] = "value"
+        elif char == ",":
+            if self._states:
+                self._states[-1] = "key" if self._stack[-1] == "{" else "value"
+        elif not char.isspace():
+            self._started = True
+            self._scalar_start = pos
+
+    def _completed_text(self) -> Optional[str]:
+        closers = "".join(_CLOSERS[opener] for opener in reversed(self._stack))
+        if self._in_string and not self._string_is_key:
+            # Close the streaming value string, without a trailing incomplete escape sequence.
+            text = self.text
+            if self._escape:
+                text = text[:-1]
+            elif self._unicode_digits:
+                text = text[: -(6 - self._unicode_digits)]
+            return text + '"' + closers
+        if self._scalar_start is not None:
+            token = self.text[self._scalar_start :]
+            try:
+                json.loads(token)
+                return self.text + closers
+            except ValueError:
+                pass
+        if not self._started or self._safe == 0:
+            return None
+        return self.text[: self._safe] + closers
+
+    def snapshot(self) -> Any:
+        """
+        Returns the value decoded from the document so far (None before anything decodable arrived).
+        """
+        text = self._completed_text()
+        if text is None:
+            return None
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+
+def parse_partial_json(text: str) -> Any:
+    """Decodes a possibly truncated JSON document (see `PartialJSONParser`)."""
+    parser = PartialJSONParser()
+    parser.feed(text)
+    return parser.snapshot()
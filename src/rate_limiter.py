@@ -0,0 +1,285 @@
+"""
+Process-wide adaptive rate limiter for OpenAI calls.
+
+Every LLM request (use cases, flowcharts, GitHub search, from any number of Gradio sessions)
+acquires a permit from one `AdaptiveRateLimiter` before it is sent:
+
+- Requests-per-minute and tokens-per-minute token buckets keep the request rate within the
+  account's limits. Token costs are estimated up front and reconciled with the reported usage.
+- The number of requests in flight follows AIMD (additive increase, multiplicative decrease):
+  a 429 halves the concurrency limit and pauses all requests for the Retry-After interval,
+  and every window of successful requests at the limit raises it by one slot again. The limit
+  therefore settles just below the highest throughput the API sustains.
+
+Synchronous callers use `acquire_sync()`: they draw on the same RPM/TPM budget and respect 429
+pauses, but do not take concurrency slots, which are handed out on the event loop.
+"""
+
+import asyncio
+import contextlib
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, Optional
+
+from src.config import LLM_MAX_CONCURRENCY, LLM_RATE_LIMIT_RPM, LLM_RATE_LIMIT_TPM
+
+logger = logging.getLogger(__name__)
+
+# Pause after a 429 without a Retry-After header
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at `per_minute / 60` tokens per second.
+
+    Callers reserve their cost up front; the balance may go negative, and the returned delay is
+    the time until the reservation is covered. Reservations are therefore served in order
+    without polling.
+    """
+
+    def __init__(
+        self, per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(per_minute)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` tokens and returns the seconds to wait until they are available."""
+        self._refill()
+        self.tokens -= amount
+        return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount: float):
+        """Takes (positive) or refunds (negative) tokens after the fact, e.g. once the real usage is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class Permit:
+    """A granted request slot; tracks the estimated token cost and when the request started."""
+
+    def __init__(self, estimated_tokens: int, started_at: float):
+        self.estimated_tokens = estimated_tokens
+        self.started_at = started_at
+
+
+class AdaptiveRateLimiter:
+    """
+    Shared RPM/TPM token buckets plus an AIMD concurrency limit for one API.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 0,
+        min_concurrency: int = 1,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            requests_per_minute: Request rate limit (<= 0 for none).
+            tokens_per_minute: Token rate limit (<= 0 for none).
+            max_concurrency: Ceiling of the adaptive concurrency limit (<= 0 for none; the limit is
+                then only set by the first 429).
+            min_concurrency: Floor of the adaptive concurrency limit.
+            decrease_factor: Factor the concurrency limit is multiplied with on a 429.
+        """
+        self.clock = clock
+        self.request_bucket = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute > 0 else None
+        self.min_concurrency = max(1, min_concurrency)
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.max_concurrency = math.inf
+        self.limit = math.inf
+        self.set_max_concurrency(max_concurrency)
+        self._paused_until = 0.0
+        self._last_decrease = -math.inf
+        self.rate_limited_count = 0
+        # Guards the buckets and the 429 state, which sync callers also update from their own threads
+        self._rate_lock = threading.Lock()
+
+    def set_max_concurrency(self, max_concurrency: int):
+        """Sets the ceiling of the concurrency limit (<= 0 for none)."""
+        self.max_concurrency = float(max_concurrency) if max_concurrency > 0 else math.inf
+        self.limit = min(self.limit, self.max_concurrency) if math.isfinite(self.limit) else self.max_concurrency
+        self._wake_waiters()
+
+    def _slots(self) -> float:
+        return max(self.min_concurrency, math.floor(self.limit)) if math.isfinite(self.limit) else math.inf
+
+    def _wake_waiters(self):
+        while self._waiters and self.in_flight < self._slots():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    async def _acquire_slot(self):
+        if self.in_flight < self._slots() and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()  # The slot was granted just before the cancellation
+            else:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+            raise
+
+    def _reserve_rate(self, tokens: int) -> float:
+        with self._rate_lock:
+            delay = max(0.0, self._paused_until - self.clock())
+            if self.request_bucket is not None:
+                delay = max(delay, self.request_bucket.reserve(1))
+            if self.token_bucket is not None and tokens > 0:
+                delay = max(delay, self.token_bucket.reserve(tokens))
+        return delay
+
+    def _refund_rate(self, tokens: int):
+        with self._rate_lock:
+            if self.request_bucket is not None:
+                self.request_bucket.adjust(-1)
+            if self.token_bucket is not None and tokens > 0:
+                self.token_bucket.adjust(-tokens)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, estimated_tokens: int = 0) -> AsyncIterator[Permit]:
+        """
+        Waits for a concurrency slot and for rate budget, and holds the slot until the block exits.
+
+        Args:
+            estimated_tokens: Expected token usage (prompt plus completion) of the request.
+        """
+        await self._acquire_slot()
+        try:
+            delay = self._reserve_rate(estimated_tokens)
+            if delay > 0:
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self._refund_rate(estimated_tokens)
+                    raise
+            yield Permit(estimated_tokens, self.clock())
+        finally:
+            self._release_slot()
+
+    @contextlib.contextmanager
+    def acquire_sync(self, estimated_tokens: int = 0) -> Iterator[Permit]:
+        """
+        Blocking counterpart of `acquire` for synchronous clients: waits in the calling thread for rate
+        budget and for any 429 pause. Report the outcome with `record_usage` and `on_rate_limited`.
+
+        Args:
+            estimated_tokens: Expected token usage (prompt plus completion) of the request.
+        """
+        delay = self._reserve_rate(estimated_tokens)
+        if delay > 0:
+            time.sleep(delay)
+        yield Permit(estimated_tokens, self.clock())
+
+    def record_usage(self, permit: Permit, used_tokens: Optional[int]):
+        """Reconciles the token bucket with the usage a response reported."""
+        if self.token_bucket is not None and used_tokens is not None:
+            with self._rate_lock:
+                self.token_bucket.adjust(used_tokens - permit.estimated_tokens)
+
+    def on_success(self, permit: Permit, used_tokens: Optional[int] = None):
+        """
+        Records a successful request: reconciles the token bucket with the reported usage and
+        grows the concurrency limit if it was the bottleneck.
+        """
+        self.record_usage(permit, used_tokens)
+        if math.isfinite(self.limit) and self.limit < self.max_concurrency and self.in_flight >= self._slots():
+            # One extra slot per `limit` successful requests, i.e. roughly per round trip.
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            self._wake_waiters()
+
+    def on_rate_limited(self, permit: Permit, retry_after: Optional[float] = None) -> float:
+        """
+        Records a 429: pauses all requests for the Retry-After interval and, once per congestion
+        event, multiplies the concurrency limit by `decrease_factor`.
+
+        Returns:
+            The seconds the caller should wait before retrying.
+        """
+        with self._rate_lock:
+            self.rate_limited_count += 1
+            now = self.clock()
+            pause = retry_after if retry_after is not None and retry_after >= 0 else DEFAULT_RETRY_AFTER_SECONDS
+            self._paused_until = max(self._paused_until, now + pause)
+            # Requests started before the last decrease were sent under the old limit; don't count them twice.
+            if permit.started_at >= self._last_decrease:
+                current = self.limit if math.isfinite(self.limit) else float(self.in_flight)
+                self.limit = max(float(self.min_concurrency), math.floor(current * self.decrease_factor))
+                self._last_decrease = now
+                logger.warning(
+                    f"LLM rate limit hit: concurrency limit lowered to {self.limit:.0f}, "
+                    f"pausing requests for {pause:.1f}s."
+                )
+            return max(0.0, self._paused_until - now)
+
+    def has_spare_capacity(self) -> bool:
+        """Whether a new request would get a slot right away."""
+        return self.in_flight < self._slots() and not self._waiters
+
+    def stats(self) -> Dict[str, float]:
+        """Current limiter state, for logging and monitoring."""
+        return {
+            "concurrency_limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "rate_limited": self.rate_limited_count,
+        }
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Reads the retry delay in seconds from `retry-after-ms` / `retry-after` response headers."""
+    if headers is None:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass  # An HTTP date; fall back to the default pause
+    return None
+
+
+_rate_limiter: Optional[AdaptiveRateLimiter] = None
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Returns the process-wide limiter for LLM calls, configured from src.config on first use."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = AdaptiveRateLimiter(
+            requests_per_minute=LLM_RATE_LIMIT_RPM,
+            tokens_per_minute=LLM_RATE_LIMIT_TPM,
+            max_concurrency=LLM_MAX_CONCURRENCY,
+        )
+    return _rate_limiter
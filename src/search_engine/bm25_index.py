@@ -0,0 +1,155 @@
+"""
+BM25 lexical retrieval over the MCP catalog.
+
+Used by GitHubSource to shortlist the catalog entries most relevant to a use case, so that only
+those candidates (instead of all curated lists) are sent to the matching LLM call. The inverted
+index is built once per catalog version and persisted next to the catalog index.
+"""
+
+import heapq
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from src.search_engine.catalog import CatalogIndex
+
+logger = logging.getLogger(__name__)
+
+BM25_INDEX_PATH = "resources/github/index/bm25_index.json"
+BM25_INDEX_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have in into is it its of on or that the this to "
+    "use used using via was will with your you mcp server servers model context protocol".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases, splits on non-alphanumerics, drops stopwords and folds simple plurals."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def entry_text(entry) -> str:
+    """The text of a catalog entry that retrieval indexes."""
+    return f"{entry.name} {entry.name} {entry.category} {entry.description}"
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over the entries of a `CatalogIndex`.
+    """
+
+    def __init__(
+        self,
+        postings: Dict[str, List[Tuple[int, int]]],
+        doc_lengths: List[int],
+        catalog_fingerprint: str,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.catalog_fingerprint = catalog_fingerprint
+        self.k1 = k1
+        self.b = b
+        num_docs = len(doc_lengths)
+        self.avg_doc_length = (sum(doc_lengths) / num_docs) if num_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5)) for term, docs in postings.items()
+        }
+
+    @classmethod
+    def build(cls, catalog: CatalogIndex) -> "BM25Index":
+        """Builds the inverted index for every entry of the catalog."""
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_lengths = []
+        for doc_id, entry in enumerate(catalog.entries):
+            tokens = tokenize(entry_text(entry))
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_id, tf))
+        return cls(postings, doc_lengths, catalog.fingerprint)
+
+    def top_k(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Scores the catalog entries against a query.
+
+        Args:
+            query: Free text, e.g. a use case description.
+            k: Maximum number of results.
+
+        Returns:
+            Up to `k` (entry index, score) pairs with a positive score, best first.
+        """
+        scores: Dict[int, float] = {}
+        for term, query_tf in Counter(tokenize(query)).items():
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf[term]
+            for doc_id, tf in docs:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + query_tf * idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def save(self, index_path: str = BM25_INDEX_PATH):
+        """Writes the index to disk as compact JSON."""
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        payload = {
+            "version": BM25_INDEX_VERSION,
+            "catalog_fingerprint": self.catalog_fingerprint,
+            "k1": self.k1,
+            "b": self.b,
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+        # A per-process temporary file, so concurrent workers never write into each other's file
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, separators=(",", ":"))
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, index_path: str = BM25_INDEX_PATH) -> Optional["BM25Index"]:
+        """Loads a previously saved index, or returns None if it is missing or unreadable."""
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != BM25_INDEX_VERSION:
+            return None
+        postings = {term: [tuple(posting) for posting in docs] for term, docs in payload["postings"].items()}
+        return cls(postings, payload["doc_lengths"], payload["catalog_fingerprint"], payload["k1"], payload["b"])
+
+    @classmethod
+    def load_or_build(cls, catalog: CatalogIndex, index_path: str = BM25_INDEX_PATH) -> "BM25Index":
+        """Loads the on-disk index if it was built from this catalog version, otherwise rebuilds and saves it."""
+        index = cls.load(index_path)
+        if index is not None and index.catalog_fingerprint == catalog.fingerprint:
+            return index
+
+        logger.info("Building BM25 index over the MCP catalog...")
+        index = cls.build(catalog)
+        try:
+            index.save(index_path)
+        except OSError as e:
+            logger.warning(f"Failed to save BM25 index to {index_path}: {e}")
+        return index
@@ -0,0 +1,251 @@
+"""
+Structured catalog of MCP servers ingested from the curated GitHub READMEs.
+
+The curated READMEs in `resources/github/` are parsed once into `CatalogEntry` objects
+(name, repository URL, description, category heading and the lists that mention it).
+The entries are persisted as a compact JSON index next to the READMEs and only rebuilt
+when the content hash of one of the READMEs changes, so searches never re-parse markdown.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from src.search_engine.markdown_sections import get_document
+
+logger = logging.getLogger(__name__)
+
+CATALOG_INDEX_PATH = "resources/github/index/catalog_index.json"
+CATALOG_INDEX_VERSION = 2
+
+# Section of each README that holds the server listings (None means the whole file).
+# These mirror the sections GitHubSource has always sent to the LLM.
+GITHUB_SECTION_KEYWORDS: Dict[str, Optional[str]] = {
+    "modelcontextprotocol/servers": "servers",
+    "punkpeye/awesome-mcp-servers": "Server Implementations",
+    "appcypher/awesome-mcp-servers": None,
+}
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+class CatalogEntry(BaseModel):
+    """
+    A single MCP server listed in one or more of the curated READMEs.
+    """
+
+    name: str
+    url: str
+    description: str
+    category: str
+    sources: List[str]
+
+
+def content_hash(text: str) -> str:
+    """Returns the SHA-256 hex digest of a README's content."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def read_readmes(readme_paths: Dict[str, str]) -> Dict[str, str]:
+    """Reads the local README copies, keyed by `owner/name`."""
+    readme_texts = {}
+    for repo, file_path in readme_paths.items():
+        with open(file_path, "r", encoding="utf-8") as f:
+            readme_texts[repo] = f.read()
+    return readme_texts
+
+
+def readme_hashes(readme_paths: Dict[str, str]) -> Dict[str, str]:
+    """Returns the current content hash of each local README."""
+    return {repo: content_hash(md_text) for repo, md_text in read_readmes(readme_paths).items()}
+
+
+def _clean_heading(text: str) -> str:
+    """Strips inline HTML anchors and leading emoji/punctuation from a heading."""
+    text = _HTML_TAG_RE.sub("", text)
+    match = re.search(r"[\w(\[]", text)
+    return text[match.start() :].strip() if match else text.strip()
+
+
+def _resolve_url(href: str, repo: str) -> str:
+    """Turns README-relative links (e.g. `src/fetch`) into absolute GitHub URLs."""
+    if href.startswith(("http://", "https://")):
+        return href
+    return f"https://github.com/{repo}/tree/main/{href.lstrip('./')}"
+
+
+def _parse_list_item(inline_token, repo: str) -> Optional[tuple]:
+    """
+    Extracts (name, url, description) from the inline token of a list item.
+    Returns None if the item does not start with a link to a server.
+    """
+    name_parts: List[str] = []
+    description_parts: List[str] = []
+    href = None
+    in_link = False
+    for child in inline_token.children or []:
+        if child.type == "link_open" and href is None:
+            href = child.attrs.get("href", "")
+            in_link = True
+            continue
+        if child.type == "link_close" and in_link:
+            in_link = False
+            continue
+        if child.type in ("text", "code_inline"):
+            (name_parts if in_link else description_parts).append(child.content)
+        elif child.type in ("softbreak", "hardbreak"):
+            description_parts.append(" ")
+        # Images (logos), html_inline and formatting tokens carry no catalog information.
+
+    if not href or href.startswith("#"):
+        return None
+    name = "".join(name_parts).strip()
+    if not name:
+        return None
+    description = re.sub(r"\s+", " ", "".join(description_parts)).strip()
+    # punkpeye/awesome-mcp-servers prefixes descriptions with legend emojis, e.g. "🐍 ☁️ - ..."
+    prefix, separator, rest = description.partition(" - ")
+    if separator and not re.search(r"\w", prefix):
+        description = rest
+    description = description.lstrip("-–—: ").strip()
+    return name, _resolve_url(href, repo), description
+
+
+def parse_catalog_entries(md_text: str, repo: str, section_keyword: Optional[str] = None) -> List[CatalogEntry]:
+    """
+    Parses the server listings of a curated README into catalog entries.
+
+    Args:
+        md_text: The raw README markdown.
+        repo: The `owner/name` of the README's repository, recorded as the entry source.
+        section_keyword: Only list items in the section introduced by the first heading
+            containing this keyword are collected (see `MarkdownDocument.section_bounds`).
+
+    Returns:
+        The catalog entries in document order.
+    """
+    document = get_document(md_text)
+    tokens = document.tokens
+    start, end, _ = document.section_bounds(section_keyword)
+    entries: List[CatalogEntry] = []
+    category = ""
+    list_item_depth = 0
+
+    for i in range(start, end):
+        token = tokens[i]
+        if token.type == "heading_open":
+            category = _clean_heading(tokens[i + 1].content)
+        elif token.type == "list_item_open":
+            list_item_depth += 1
+        elif token.type == "list_item_close":
+            list_item_depth -= 1
+        elif token.type == "inline" and list_item_depth > 0 and tokens[i - 1].type == "paragraph_open":
+            parsed = _parse_list_item(token, repo)
+            if parsed is not None:
+                name, url, description = parsed
+                entries.append(
+                    CatalogEntry(name=name, url=url, description=description, category=category, sources=[repo])
+                )
+    return entries
+
+
+class CatalogIndex:
+    """
+    In-memory catalog of MCP servers backed by a JSON index on disk.
+    """
+
+    def __init__(self, entries: List[CatalogEntry], readme_hashes: Dict[str, str]):
+        self.entries = entries
+        self.readme_hashes = readme_hashes
+
+    @property
+    def fingerprint(self) -> str:
+        """A stable hash of the README versions this catalog was built from."""
+        return content_hash(json.dumps(self.readme_hashes, sort_keys=True))
+
+    def entries_for_source(self, repo: str) -> List[CatalogEntry]:
+        """Returns the entries whose first listing is in the given README."""
+        return [entry for entry in self.entries if entry.sources[0] == repo]
+
+    @classmethod
+    def build(cls, readme_texts: Dict[str, str]) -> "CatalogIndex":
+        """
+        Builds the catalog from README contents, merging servers listed in several READMEs.
+
+        Args:
+            readme_texts: Mapping of `owner/name` to README markdown.
+        """
+        merged: Dict[str, CatalogEntry] = {}
+        for repo, md_text in readme_texts.items():
+            for entry in parse_catalog_entries(md_text, repo, GITHUB_SECTION_KEYWORDS.get(repo)):
+                key = entry.url.lower().rstrip("/")
+                existing = merged.get(key)
+                if existing is None:
+                    merged[key] = entry
+                elif repo not in existing.sources:
+                    existing.sources.append(repo)
+        readme_hashes = {repo: content_hash(md_text) for repo, md_text in readme_texts.items()}
+        return cls(list(merged.values()), readme_hashes)
+
+    def save(self, index_path: str = CATALOG_INDEX_PATH):
+        """Writes the catalog to disk as compact JSON."""
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        payload = {
+            "version": CATALOG_INDEX_VERSION,
+            "readme_hashes": self.readme_hashes,
+            "entries": [entry.model_dump() for entry in self.entries],
+        }
+        # A per-process temporary file, so concurrent workers never write into each other's file
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, separators=(",", ":"), ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, index_path: str = CATALOG_INDEX_PATH) -> Optional["CatalogIndex"]:
+        """Loads a previously saved catalog, or returns None if it is missing or unreadable."""
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != CATALOG_INDEX_VERSION:
+            return None
+        entries = [CatalogEntry.model_validate(entry) for entry in payload["entries"]]
+        return cls(entries, payload["readme_hashes"])
+
+    @classmethod
+    def load_or_build(cls, readme_paths: Dict[str, str], index_path: str = CATALOG_INDEX_PATH) -> "CatalogIndex":
+        """
+        Loads the on-disk catalog if it matches the current READMEs, otherwise rebuilds and saves it.
+
+        Args:
+            readme_paths: Mapping of `owner/name` to the local README path.
+            index_path: Where the catalog index is stored.
+        """
+        readme_texts = read_readmes(readme_paths)
+        current_hashes = {repo: content_hash(md_text) for repo, md_text in readme_texts.items()}
+
+        catalog = cls.load(index_path)
+        if catalog is not None and catalog.readme_hashes == current_hashes:
+            logger.info(f"Loaded MCP catalog with {len(catalog.entries)} entries from {index_path}.")
+            return catalog
+
+        logger.info("Curated READMEs changed or catalog index missing, rebuilding MCP catalog...")
+        catalog = cls.build(readme_texts)
+        try:
+            catalog.save(index_path)
+        except OSError as e:
+            logger.warning(f"Failed to save MCP catalog index to {index_path}: {e}")
+        logger.info(f"Built MCP catalog with {len(catalog.entries)} entries.")
+        return catalog
@@ -0,0 +1,180 @@
+"""
+CPU-only dense vector retrieval over the MCP catalog.
+
+Entries are embedded offline with hashed word and character n-gram features (no model download),
+weighted by inverse document frequency and L2-normalized. The embedding matrix is stored as a
+`.npy` file that is memory-mapped on load, and a top-K lookup is a single matrix-vector product.
+Character n-grams let paraphrases such as "spreadsheet" and "Google Sheets" share features that
+BM25's whole-word matching misses.
+
+The matrix file is named after a hash of its contents and the JSON metadata names the matrix it
+belongs to, so replacing the metadata publishes a new index atomically: a reader never pairs a new
+matrix with old metadata, even while another process is saving.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.search_engine.bm25_index import entry_text
+from src.search_engine.catalog import CatalogIndex
+
+logger = logging.getLogger(__name__)
+
+DENSE_INDEX_DIR = "resources/github/index"
+DENSE_INDEX_VERSION = 2
+EMBEDDING_DIM = 2048
+CHAR_NGRAM_SIZES = (3, 4, 5)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _features(text: str) -> List[str]:
+    """Word unigrams plus character n-grams of each word (padded with word boundaries)."""
+    features = []
+    for word in _WORD_RE.findall(text.lower()):
+        features.append(f"w:{word}")
+        padded = f"<{word}>"
+        for n in CHAR_NGRAM_SIZES:
+            features.extend(padded[i : i + n] for i in range(len(padded) - n + 1))
+    return features
+
+
+def hash_features(texts: List[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Projects texts into a `dim`-dimensional space with the signed hashing trick.
+
+    Returns:
+        A float32 matrix of sublinear term frequencies, one row per text.
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feature in _features(text):
+            # crc32 is stable across processes, unlike the built-in hash().
+            h = zlib.crc32(feature.encode("utf-8"))
+            matrix[row, h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    return np.sign(matrix) * np.log1p(np.abs(matrix))
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class DenseIndex:
+    """
+    Memory-mappable embedding matrix for the entries of a `CatalogIndex`.
+    """
+
+    def __init__(self, embeddings: np.ndarray, idf: np.ndarray, catalog_fingerprint: str):
+        self.embeddings = embeddings
+        self.idf = idf
+        self.catalog_fingerprint = catalog_fingerprint
+
+    @classmethod
+    def build(cls, catalog: CatalogIndex, dim: int = EMBEDDING_DIM) -> "DenseIndex":
+        """Embeds every catalog entry."""
+        features = hash_features([entry_text(entry) for entry in catalog.entries], dim)
+        doc_freq = np.count_nonzero(features, axis=0)
+        idf = np.log((1 + len(catalog.entries)) / (1 + doc_freq)).astype(np.float32) + 1.0
+        embeddings = _normalize(features * idf).astype(np.float32)
+        return cls(embeddings, idf, catalog.fingerprint)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embeds a query into the same space as the catalog entries."""
+        return _normalize(hash_features([query], self.embeddings.shape[1])[0] * self.idf)
+
+    def top_k(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Returns up to `k` (entry index, cosine similarity) pairs with a positive score, best first.
+        """
+        if k <= 0 or len(self.embeddings) == 0:
+            return []
+        scores = self.embeddings @ self.embed_query(query)
+        k = min(k, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in ranked if scores[doc_id] > 0]
+
+    def content_hash(self) -> str:
+        """Hash of the embedding matrix and the IDF weights, naming the saved matrix file."""
+        digest = hashlib.sha256(np.ascontiguousarray(self.embeddings).tobytes())
+        digest.update(np.ascontiguousarray(self.idf).tobytes())
+        return digest.hexdigest()[:16]
+
+    def save(self, index_dir: str = DENSE_INDEX_DIR):
+        """
+        Writes the embedding matrix as `dense_embeddings.<hash>.npy`, then the metadata naming it as JSON.
+        Matrices of previous saves are removed afterwards.
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        matrix_name = f"dense_embeddings.{self.content_hash()}.npy"
+        matrix_path = os.path.join(index_dir, matrix_name)
+        tmp_matrix_path = os.path.join(index_dir, f"{matrix_name}.{os.getpid()}.tmp")
+        with open(tmp_matrix_path, "wb") as f:
+            np.save(f, self.embeddings)
+        os.replace(tmp_matrix_path, matrix_path)
+
+        # Replacing the metadata is the commit point: until then, readers keep loading the previous pair.
+        meta_path = os.path.join(index_dir, "dense_index.json")
+        tmp_meta_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_meta_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": DENSE_INDEX_VERSION,
+                    "catalog_fingerprint": self.catalog_fingerprint,
+                    "matrix": matrix_name,
+                    "shape": list(self.embeddings.shape),
+                    "idf": self.idf.tolist(),
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_meta_path, meta_path)
+
+        for old_matrix_path in glob.glob(os.path.join(index_dir, "dense_embeddings*.npy")):
+            if os.path.basename(old_matrix_path) != matrix_name:
+                try:
+                    os.remove(old_matrix_path)
+                except OSError:
+                    pass  # e.g. still memory-mapped by a reader on Windows; removed by a later save
+
+    @classmethod
+    def load(cls, index_dir: str = DENSE_INDEX_DIR) -> Optional["DenseIndex"]:
+        """Memory-maps a previously saved index, or returns None if it is missing or unreadable."""
+        try:
+            with open(os.path.join(index_dir, "dense_index.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != DENSE_INDEX_VERSION:
+                return None
+            # The metadata names its own matrix, so a concurrent save can never mix two versions.
+            embeddings = np.load(os.path.join(index_dir, os.path.basename(meta["matrix"])), mmap_mode="r")
+            idf = np.asarray(meta["idf"], dtype=np.float32)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if list(embeddings.shape) != meta.get("shape") or embeddings.shape[1:] != idf.shape:
+            logger.warning(f"Dense index in {index_dir} does not match its metadata; rebuilding it.")
+            return None
+        return cls(embeddings, idf, meta["catalog_fingerprint"])
+
+    @classmethod
+    def load_or_build(cls, catalog: CatalogIndex, index_dir: str = DENSE_INDEX_DIR) -> "DenseIndex":
+        """Loads the on-disk index if it was built from this catalog version, otherwise rebuilds and saves it."""
+        index = cls.load(index_dir)
+        if index is not None and index.catalog_fingerprint == catalog.fingerprint:
+            return index
+
+        logger.info("Building dense vector index over the MCP catalog...")
+        index = cls.build(catalog)
+        try:
+            index.save(index_dir)
+        except OSError as e:
+            logger.warning(f"Failed to save dense index to {index_dir}: {e}")
+        return index
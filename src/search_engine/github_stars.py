@@ -0,0 +1,159 @@
+"""
+Batched GitHub star lookups with a TTL cache.
+
+All repositories recommended for a use case are resolved with a single GitHub GraphQL query
+(falling back to concurrent REST calls if GraphQL fails), and results are cached per
+`owner/repo` so popular repositories are looked up at most once per TTL.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from src.config import GITHUB_API_URL
+from src.http_pool import get_http_client
+
+logger = logging.getLogger(__name__)
+
+STARS_CACHE_TTL_SECONDS = 3600
+
+_GITHUB_REPO_RE = re.compile(r"^(?:https?://)?(?:www\.)?github\.com/([\w.-]+)/([\w.-]+)", re.IGNORECASE)
+
+
+def parse_github_repo_id(url: str) -> Optional[str]:
+    """
+    Extracts `owner/repo` from a GitHub URL, e.g.
+    `https://github.com/x/y/tree/main/src/z` -> `x/y`. Returns None for non-GitHub URLs.
+    """
+    match = _GITHUB_REPO_RE.match(url.strip())
+    if not match:
+        return None
+    owner, repo = match.groups()
+    if repo.endswith(".git"):
+        repo = repo[:-4]
+    return f"{owner}/{repo}"
+
+
+class TTLCache:
+    """
+    Minimal in-memory cache whose entries expire `ttl_seconds` after they were stored.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, object]] = {}
+
+    def get(self, key: str) -> Tuple[bool, object]:
+        """Returns (found, value)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return False, None
+        return True, value
+
+    def set(self, key: str, value: object):
+        self._entries[key] = (time.monotonic(), value)
+
+
+class GitHubStarsClient:
+    """
+    Resolves stargazer counts for many repositories with as few GitHub round-trips as possible.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str],
+        http_client: Optional[httpx.AsyncClient] = None,
+        ttl_seconds: float = STARS_CACHE_TTL_SECONDS,
+    ):
+        self.token = token
+        self.http_client = http_client or get_http_client()
+        self.cache = TTLCache(ttl_seconds)
+
+    @property
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    async def get_stars(self, repo_ids: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Returns the star count per `owner/repo` (None if the repository could not be resolved).
+        Only repositories missing from the cache are fetched.
+        """
+        stars: Dict[str, Optional[int]] = {}
+        missing: List[str] = []
+        for repo_id in dict.fromkeys(repo_ids):
+            found, value = self.cache.get(repo_id.lower())
+            if found:
+                stars[repo_id] = value
+            else:
+                missing.append(repo_id)
+        if not missing:
+            return stars
+
+        try:
+            fetched = await self._fetch_graphql(missing)
+        except Exception as e:
+            logger.warning(f"GraphQL star lookup failed ({e}), falling back to concurrent REST calls.")
+            fetched = await self._fetch_rest(missing)
+
+        for repo_id in missing:
+            stars[repo_id] = fetched.get(repo_id)
+            # Only definitive answers are cached; transient failures are retried on the next search.
+            if repo_id in fetched:
+                self.cache.set(repo_id.lower(), fetched[repo_id])
+        return stars
+
+    async def _fetch_graphql(self, repo_ids: List[str]) -> Dict[str, Optional[int]]:
+        """Fetches all star counts with one aliased GraphQL query (requires a token)."""
+        if not self.token:
+            raise RuntimeError("GitHub GraphQL API requires a token")
+        variable_defs = []
+        fields = []
+        variables = {}
+        for i, repo_id in enumerate(repo_ids):
+            owner, name = repo_id.split("/", 1)
+            variable_defs.append(f"$o{i}: String!, $n{i}: String!")
+            fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ stargazerCount }}")
+            variables[f"o{i}"] = owner
+            variables[f"n{i}"] = name
+        query = f"query({', '.join(variable_defs)}) {{ {' '.join(fields)} }}"
+
+        response = await self.http_client.post(
+            f"{GITHUB_API_URL}/graphql", json={"query": query, "variables": variables}, headers=self._headers
+        )
+        response.raise_for_status()
+        data = response.json().get("data")
+        if data is None:
+            raise RuntimeError(f"GraphQL returned no data: {response.text[:200]}")
+        # Missing repositories come back as null aliases (with an error entry), which we record as None.
+        return {repo_id: (data.get(f"r{i}") or {}).get("stargazerCount") for i, repo_id in enumerate(repo_ids)}
+
+    async def _fetch_rest(self, repo_ids: List[str]) -> Dict[str, Optional[int]]:
+        """
+        Fetches star counts with one concurrent REST call per repository.
+        Repositories that failed for a transient reason are left out of the result.
+        """
+
+        async def fetch_one(repo_id: str) -> Tuple[bool, Optional[int]]:
+            try:
+                response = await self.http_client.get(f"{GITHUB_API_URL}/repos/{repo_id}", headers=self._headers)
+                if response.status_code == 404:
+                    return True, None
+                response.raise_for_status()
+                return True, response.json().get("stargazers_count")
+            except Exception as e:
+                logger.warning(f"Failed to get stars for {repo_id}: {e}")
+                return False, None
+
+        results = await asyncio.gather(*(fetch_one(repo_id) for repo_id in repo_ids))
+        return {repo_id: stars for repo_id, (resolved, stars) in zip(repo_ids, results) if resolved}
@@ -0,0 +1,125 @@
+"""
+Single-pass markdown section extraction with memoization.
+
+A README is parsed with markdown-it once; all headings are indexed in the same linear pass,
+so locating the section for a keyword is a scan over the (few hundred) headings instead of
+the (tens of thousands of) tokens. Parsed documents and extracted sections are cached by
+(content hash, keyword), so repeated lookups do no parsing or string building.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    from markdown_it.token import Token
+
+# Only a handful of READMEs are ever tracked; keep a few versions around while one is being refreshed.
+MAX_CACHED_DOCUMENTS = 8
+
+
+class Heading(NamedTuple):
+    """A heading in a parsed document: its `heading_open` token index, level and raw text."""
+
+    token_index: int
+    level: int
+    text: str
+
+
+class MarkdownDocument:
+    """
+    A markdown document parsed once, with all of its headings indexed.
+    """
+
+    def __init__(self, md_text: str):
+        # Imported on first parse: with an up-to-date catalog index on disk nothing is parsed at startup.
+        from markdown_it import MarkdownIt
+
+        self.tokens: List["Token"] = MarkdownIt().parse(md_text)
+        self.headings: List[Heading] = []
+        for i, token in enumerate(self.tokens):
+            if token.type == "heading_open":
+                # The heading text is always in the inline token right after heading_open.
+                self.headings.append(Heading(i, int(token.tag[1]), self.tokens[i + 1].content))
+
+    def section_bounds(self, keyword: Optional[str]) -> Tuple[int, int, List[int]]:
+        """
+        Locates the section introduced by the first heading containing `keyword`.
+
+        Nested headings that also contain the keyword re-anchor the section level, and the
+        section ends at the next heading of the same or a higher level.
+
+        Returns:
+            (start, end, matched) where tokens[start:end] is the section and `matched` holds the
+            token indexes of the keyword headings. (0, 0, []) if no heading matches; the whole
+            document if `keyword` is None.
+        """
+        if keyword is None:
+            return 0, len(self.tokens), []
+        keyword = keyword.lower()
+        start = None
+        current_level = None
+        matched: List[int] = []
+        for heading in self.headings:
+            if keyword in heading.text.lower():
+                if start is None:
+                    start = heading.token_index
+                current_level = heading.level
+                matched.append(heading.token_index)
+            elif start is not None and heading.level <= current_level:
+                return start, heading.token_index, matched
+        if start is None:
+            return 0, 0, []
+        return start, len(self.tokens), matched
+
+    def extract_section(self, keyword: str) -> str:
+        """Returns the text content of the section introduced by `keyword`."""
+        start, end, matched = self.section_bounds(keyword)
+        skipped = set(matched)
+        return "\n".join(self.tokens[i].content for i in range(start, end) if i not in skipped).strip()
+
+
+_documents: "OrderedDict[str, MarkdownDocument]" = OrderedDict()
+_sections: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+
+def _content_hash(md_text: str) -> str:
+    return hashlib.sha256(md_text.encode("utf-8")).hexdigest()
+
+
+def _remember(cache: OrderedDict, key, value, max_size: int):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+def get_document(md_text: str) -> MarkdownDocument:
+    """Returns the parsed document for `md_text`, parsing it only the first time it is seen."""
+    key = _content_hash(md_text)
+    document = _documents.get(key)
+    if document is None:
+        document = MarkdownDocument(md_text)
+        _remember(_documents, key, document, MAX_CACHED_DOCUMENTS)
+    else:
+        _documents.move_to_end(key)
+    return document
+
+
+def extract_section_with_keyword(md_text: str, keyword: str) -> str:
+    """
+    Extracts the section of `md_text` introduced by the first heading containing `keyword`.
+    Results are memoized by (content hash, keyword).
+    """
+    key = (_content_hash(md_text), keyword.lower())
+    section = _sections.get(key)
+    if section is None:
+        section = get_document(md_text).extract_section(keyword)
+        _remember(_sections, key, section, MAX_CACHED_DOCUMENTS * 4)
+    return section
+
+
+def clear_caches():
+    """Drops all memoized documents and sections."""
+    _documents.clear()
+    _sections.clear()
@@ -0,0 +1,172 @@
+"""
+Token-budgeted, prefix-stable assembly of the curated-list prompt.
+
+The system prompt is laid out deterministically: static instructions first, then each curated
+list under a fixed heading in a fixed order, with entries in catalog order. Identical catalog
+content therefore always yields an identical prompt prefix, which keeps provider-side prompt
+caching effective; the per-request use case goes last, in the user message. If the curated
+content does not fit the token budget, the lowest-priority entries are dropped.
+"""
+
+import logging
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from src.search_engine.catalog import CatalogEntry
+from src.token_counter import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+
+class CuratedList(NamedTuple):
+    """One curated list of the prompt: its heading and entries in catalog order."""
+
+    name: str
+    heading: str
+    entries: List[CatalogEntry]
+
+
+class PromptSection(NamedTuple):
+    name: str
+    text: str
+    tokens: int
+
+
+class AssembledPrompt(NamedTuple):
+    text: str
+    sections: List[PromptSection]
+    total_tokens: int
+    dropped_entries: int
+
+
+def render_entry(entry: CatalogEntry) -> str:
+    """Renders one catalog entry as a markdown list item."""
+    line = f"- [{entry.name}]({entry.url}) - {entry.description}"
+    if len(entry.sources) > 1:
+        line += f" (also listed in: {', '.join(entry.sources[1:])})"
+    return line
+
+
+def render_curated_list(entries: List[CatalogEntry]) -> str:
+    """Renders catalog entries as a compact markdown list grouped by category heading."""
+    lines = []
+    current_category = None
+    for entry in entries:
+        if entry.category != current_category:
+            current_category = entry.category
+            lines.append(f"\n## {current_category}")
+        lines.append(render_entry(entry))
+    return "\n".join(lines).strip()
+
+
+def _round_robin(curated_lists: List[CuratedList]) -> List[CatalogEntry]:
+    """Interleaves the lists (first entry of each list, then the second, ...) so none is starved."""
+    ordered = []
+    for i in range(max((len(curated_list.entries) for curated_list in curated_lists), default=0)):
+        for curated_list in curated_lists:
+            if i < len(curated_list.entries):
+                ordered.append(curated_list.entries[i])
+    return ordered
+
+
+class PromptAssembler:
+    """
+    Fits static instructions plus curated lists into a token budget.
+    """
+
+    def __init__(self, counter: TokenCounter, budget_tokens: int):
+        """
+        Args:
+            counter: Token counter of the target model.
+            budget_tokens: Maximum size of the assembled system prompt in tokens (<= 0 for no limit).
+        """
+        self.counter = counter
+        self.budget_tokens = budget_tokens
+
+    @staticmethod
+    def _total_tokens(sections: List[PromptSection]) -> int:
+        # One extra token per section separator.
+        return sum(section.tokens for section in sections) + len(sections) - 1
+
+    def _render(self, instructions: str, curated_lists: List[CuratedList], kept: set) -> List[PromptSection]:
+        sections = [PromptSection("instructions", instructions, self.counter.count(instructions))]
+        for curated_list in curated_lists:
+            content = render_curated_list([entry for entry in curated_list.entries if id(entry) in kept])
+            text = f"{curated_list.heading}\n\n{content}"
+            sections.append(PromptSection(curated_list.name, text, self.counter.count(text)))
+        return sections
+
+    def assemble(
+        self,
+        instructions: str,
+        curated_lists: List[CuratedList],
+        priority: Optional[Sequence[CatalogEntry]] = None,
+    ) -> AssembledPrompt:
+        """
+        Assembles the system prompt.
+
+        Args:
+            instructions: Static instructions, always kept in full.
+            curated_lists: The lists in prompt order.
+            priority: Entries from most to least important (e.g. by retrieval score). Defaults to
+                interleaving the lists in catalog order. Only decides what is dropped, never the layout.
+
+        Returns:
+            The prompt text and the token count of every section.
+        """
+        instructions = instructions.strip()
+        all_entries = [entry for curated_list in curated_lists for entry in curated_list.entries]
+        kept = {id(entry) for entry in all_entries}
+
+        if self.budget_tokens > 0:
+            fixed = self.counter.count(instructions) + sum(
+                self.counter.count(f"{curated_list.heading}\n\n") for curated_list in curated_lists
+            )
+            remaining = self.budget_tokens - fixed
+            category_of = {
+                id(entry): (curated_list.name, entry.category)
+                for curated_list in curated_lists
+                for entry in curated_list.entries
+            }
+            ordered = list(priority) if priority is not None else _round_robin(curated_lists)
+            kept = set()
+            categories = set()
+            for entry in ordered:
+                category = category_of.get(id(entry))
+                if category is None or id(entry) in kept:
+                    continue
+                cost = self.counter.count(render_entry(entry)) + 1
+                if category not in categories:
+                    cost += self.counter.count(f"\n## {entry.category}") + 1
+                if cost <= remaining:
+                    remaining -= cost
+                    kept.add(id(entry))
+                    categories.add(category)
+            # Summing per-line counts is an approximation; trim further if the exact count disagrees.
+            kept_in_priority = [entry for entry in ordered if id(entry) in kept]
+            sections = self._render(instructions, curated_lists, kept)
+            while self._total_tokens(sections) > self.budget_tokens and kept_in_priority:
+                for entry in kept_in_priority[-max(1, len(kept_in_priority) // 20) :]:
+                    kept.discard(id(entry))
+                kept_in_priority = [entry for entry in kept_in_priority if id(entry) in kept]
+                sections = self._render(instructions, curated_lists, kept)
+        else:
+            sections = self._render(instructions, curated_lists, kept)
+
+        return AssembledPrompt(
+            text="\n\n".join(section.text for section in sections),
+            sections=sections,
+            total_tokens=self._total_tokens(sections),
+            dropped_entries=len(all_entries) - len(kept),
+        )
+
+
+def log_prompt_tokens(
+    prompt: AssembledPrompt, budget_tokens: int, counter_name: str, extra: Optional[Dict[str, int]] = None
+):
+    """Logs the token count of every prompt section."""
+    parts = [f"{section.name}={section.tokens}" for section in prompt.sections]
+    parts += [f"{name}={tokens}" for name, tokens in (extra or {}).items()]
+    logger.info(
+        f"Prompt tokens ({counter_name}): {', '.join(parts)}; system total {prompt.total_tokens}/{budget_tokens}, "
+        f"{prompt.dropped_entries} entries dropped."
+    )
@@ -0,0 +1,182 @@
+"""
+Background refresh of the curated README cache.
+
+A `ReadmeRefresher` runs as an asyncio task, periodically re-validating each cached README with
+a conditional GitHub request (`If-None-Match` with the stored ETag), so unchanged READMEs cost a
+304 and no data. Changed READMEs are written with an atomic rename while holding a file lock, so
+several workers sharing one volume never see or produce a partially written file.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from filelock import FileLock
+
+from src.config import GITHUB_API_URL
+from src.http_pool import get_http_client
+from src.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+README_ETAGS_PATH = "resources/github/index/readme_etags.json"
+
+
+def atomic_write(path: str, content: str):
+    """Writes `content` to a temporary file next to `path` and renames it over `path`."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ReadmeRefresher:
+    """
+    Keeps the local README copies in sync with GitHub from a background task.
+    """
+
+    def __init__(
+        self,
+        readme_paths: Dict[str, str],
+        token: str,
+        interval_seconds: float,
+        on_refresh: Optional[Callable[[], Awaitable[object]]] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        etags_path: str = README_ETAGS_PATH,
+    ):
+        """
+        Args:
+            readme_paths: Mapping of `owner/name` to the local README path.
+            token: GitHub token used for the (conditional) README requests.
+            interval_seconds: Time between refresh rounds.
+            on_refresh: Awaited after every round, e.g. to hot-swap the catalog if a README changed
+                (possibly written by another worker).
+            http_client: Client for the GitHub API; defaults to the shared connection pool.
+            etags_path: Where the ETag of each README is stored.
+        """
+        self.readme_paths = readme_paths
+        self.token = token
+        self.interval_seconds = interval_seconds
+        self.on_refresh = on_refresh
+        self.http_client = http_client or get_http_client()
+        self.etags_path = etags_path
+        self._task: Optional[asyncio.Task] = None
+
+    def _lock(self, path: str) -> FileLock:
+        return FileLock(f"{path}.lock", timeout=30)
+
+    def _load_etags(self) -> Dict[str, str]:
+        try:
+            with open(self.etags_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _read_hash(self, path: str) -> Optional[str]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return self._content_hash(f.read())
+        except OSError:
+            return None
+
+    def _store_readme(self, repo: str, content: str, etag: Optional[str]) -> bool:
+        """
+        Atomically replaces the README and records its ETag (runs in a worker thread).
+
+        Returns:
+            False if the file on disk already had this content (e.g. the first 200 after a cold start,
+            which only seeds the ETag), True if it was rewritten.
+        """
+        file_path = self.readme_paths[repo]
+        with self._lock(file_path):
+            changed = self._read_hash(file_path) != self._content_hash(content)
+            if changed:
+                atomic_write(file_path, content)
+        if etag:
+            with self._lock(self.etags_path):
+                etags = self._load_etags()
+                etags[repo] = etag
+                atomic_write(self.etags_path, json.dumps(etags, indent=2))
+        return changed
+
+    async def _refresh_readme(self, repo: str, etag: Optional[str]) -> bool:
+        """Re-validates one README. Returns True if a new version was written."""
+        headers = {"Accept": "application/vnd.github.raw", "Authorization": f"Bearer {self.token}"}
+        if etag:
+            headers["If-None-Match"] = etag
+        response = await self.http_client.get(f"{GITHUB_API_URL}/repos/{repo}/readme", headers=headers)
+        if response.status_code == 304:
+            logger.info(f"README of {repo} is unchanged.")
+            return False
+        response.raise_for_status()
+        changed = await asyncio.to_thread(self._store_readme, repo, response.text, response.headers.get("ETag"))
+        if not changed:
+            logger.info(f"README of {repo} matches the cached copy.")
+            return False
+        logger.info(f"Updated {self.readme_paths[repo]} from {repo}.")
+        return True
+
+    async def refresh_once(self) -> List[str]:
+        """
+        Runs one refresh round over all READMEs concurrently.
+
+        Returns:
+            The repositories whose README was rewritten.
+        """
+        with span("readme_cache_check", repos=len(self.readme_paths)) as check_span:
+            etags = await asyncio.to_thread(self._load_etags)
+            repos = list(self.readme_paths)
+            results = await asyncio.gather(
+                *(self._refresh_readme(repo, etags.get(repo)) for repo in repos), return_exceptions=True
+            )
+            updated = []
+            for repo, result in zip(repos, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to refresh README of {repo}: {result}")
+                elif result:
+                    updated.append(repo)
+            check_span.set_attribute("updated", len(updated))
+        if self.on_refresh is not None:
+            await self.on_refresh()
+        return updated
+
+    async def _run(self):
+        # The cached READMEs were just loaded at startup, so the first round waits a full interval
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.refresh_once()
+            except Exception as e:
+                logger.exception(f"README refresh round failed: {e}")
+
+    def start(self):
+        """Starts the background refresh task on the running event loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Started background README refresh every {self.interval_seconds:.0f}s.")
+
+    async def stop(self):
+        """Cancels the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
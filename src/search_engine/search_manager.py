@@ -1,12 +1,135 @@
 """
-Contains the SearchManager class for orchestrating searches and the SearchResult model.
+Contains the SearchManager class for orchestrating searches and merging their results,
+and the SourceResult/SearchResponse models describing them.
 """
 
 import asyncio
-from typing import Any, Dict, List
+import heapq
+import logging
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 
+from pydantic import BaseModel
+
+from src.config import SEARCH_DEADLINE_SECONDS, SEARCH_SOURCE_TIMEOUT_SECONDS, SEARCH_TOTAL_RESULT_LIMIT
+from src.search_engine.github_stars import parse_github_repo_id
 from src.search_engine.sources.base_source import BaseSourceHandler
-from src.search_engine.sources.github_source import GitHubSource
+from src.search_engine.sources.registry import create_sources
+from src.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+# Damping constant of reciprocal-rank fusion (the value from the original RRF paper).
+RRF_K = 60
+
+_GITHUB_SUBPATH_RE = re.compile(r"github\.com/[^/]+/[^/]+/(?:tree|blob)/[^/]+/([^?#]+)", re.IGNORECASE)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Returns a key under which equivalent URLs collide, e.g.
+    `https://www.github.com/x/y.git` and `github.com/x/y/` -> `x/y`.
+    Paths inside a GitHub repository are kept without the branch (`github.com/x/y/tree/main/src/z` ->
+    `x/y/src/z`), so servers of a monorepo such as modelcontextprotocol/servers stay distinct.
+    """
+    url = url.strip()
+    repo_id = parse_github_repo_id(url)
+    if repo_id is not None:
+        match = _GITHUB_SUBPATH_RE.search(url)
+        subpath = match.group(1).strip("/") if match else ""
+        return f"{repo_id}/{subpath}".lower() if subpath else repo_id.lower()
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/')}".lower()
+
+
+def merge_results(
+    results_per_source: Sequence[Tuple[str, List[Dict[str, Any]]]],
+    limit: Optional[int] = SEARCH_TOTAL_RESULT_LIMIT,
+    rrf_k: int = RRF_K,
+) -> List[Dict[str, Any]]:
+    """
+    Merges duplicate candidates across sources and ranks them with reciprocal-rank fusion.
+
+    A candidate at (1-based) rank r in a source contributes 1 / (rrf_k + r); candidates found by
+    several sources accumulate the contributions of each. The merged record is the one from the
+    source that ranked it best, with missing fields filled in and `corresponding_functions`
+    united from the other sources. Runs in O(n log limit) for n results.
+
+    Args:
+        results_per_source: (source name, ranked results) per source.
+        limit: Maximum number of merged results (None for no limit).
+        rrf_k: Damping constant of the fusion.
+
+    Returns:
+        The merged results, best first, each with a `sources` list.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    scores: Dict[str, float] = {}
+    best_ranks: Dict[str, int] = {}
+    for source_name, results in results_per_source:
+        seen_in_source = set()
+        for rank, result in enumerate(results, start=1):
+            url = result.get("url") or ""
+            key = canonicalize_url(url) if url else f"{source_name}:{result.get('name', rank)}"
+            if key in seen_in_source:
+                continue  # A source listing the same candidate twice does not boost it.
+            seen_in_source.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = {**result, "sources": [source_name]}
+                best_ranks[key] = rank
+                continue
+            if rank < best_ranks[key]:
+                # The better-ranked record wins; the previous one only fills gaps.
+                existing, result = {**result, "sources": existing["sources"]}, existing
+                merged[key] = existing
+                best_ranks[key] = rank
+            for field, value in result.items():
+                if field != "sources" and existing.get(field) in (None, "", []):
+                    existing[field] = value
+            functions = existing.get("corresponding_functions") or []
+            extra_functions = [f for f in result.get("corresponding_functions") or [] if f not in functions]
+            if extra_functions:
+                existing["corresponding_functions"] = list(functions) + extra_functions
+            if source_name not in existing["sources"]:
+                existing["sources"].append(source_name)
+
+    keys = list(merged)
+    if limit is not None:
+        # Ties keep source/rank order: earlier-seen keys sort first.
+        order = {key: i for i, key in enumerate(keys)}
+        keys = heapq.nsmallest(limit, keys, key=lambda key: (-scores[key], order[key]))
+    else:
+        keys.sort(key=lambda key: -scores[key])
+    return [merged[key] for key in keys]
+
+
+class SourceResult(BaseModel):
+    """
+    Outcome of one source's search, including why it returned nothing.
+    """
+
+    source_name: str
+    status: Literal["ok", "timeout", "error"]
+    results: List[Dict[str, Any]] = []
+    elapsed_seconds: float
+    error: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    """
+    Merged search results together with the status of every source.
+    """
+
+    results: List[Dict[str, Any]]
+    sources: List[SourceResult]
 
 
 class SearchManager:
@@ -14,55 +137,213 @@ class SearchManager:
     Orchestrates the search process across various sources.
     """
 
-    def __init__(self, source_handlers: List[BaseSourceHandler]):
+    def __init__(
+        self,
+        source_handlers: Optional[List[BaseSourceHandler]] = None,
+        total_result_limit: Optional[int] = None,
+        source_timeout_seconds: Optional[float] = None,
+        deadline_seconds: Optional[float] = None,
+        source_timeouts: Optional[Dict[str, float]] = None,
+    ):
         """
         Initializes the SearchManager with source handlers.
         Configuration is handled by individual components/handlers directly from src.config.
+
+        Args:
+            source_handlers: The sources to search. Defaults to the sources in SEARCH_SOURCES_ENABLED, which
+                are created (and their modules imported) on `start()`.
+            total_result_limit: Maximum number of merged results; defaults to SEARCH_TOTAL_RESULT_LIMIT.
+            source_timeout_seconds: Time budget of each source; defaults to SEARCH_SOURCE_TIMEOUT_SECONDS.
+            deadline_seconds: Time budget of the whole search; defaults to SEARCH_DEADLINE_SECONDS.
+            source_timeouts: Per-source overrides of the time budget, keyed by source name.
         """
         # self.config = get_config() # Removed as get_config() is not a general config provider
         self.source_handlers = source_handlers
+        self.total_result_limit = SEARCH_TOTAL_RESULT_LIMIT if total_result_limit is None else total_result_limit
+        self.source_timeout_seconds = (
+            SEARCH_SOURCE_TIMEOUT_SECONDS if source_timeout_seconds is None else source_timeout_seconds
+        )
+        self.deadline_seconds = SEARCH_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+        self.source_timeouts = source_timeouts or {}
+        self._started = False
+        self._start_lock = asyncio.Lock()
 
-    async def search(self, use_case_description: str) -> List[Dict[str, Any]]:
+    async def start(self, warmup: bool = True):
         """
-        Performs a search for a given use case description across all configured sources.
+        Starts every source handler (once) and optionally warms them up concurrently.
+        A handler that fails to start or warm up is logged and still searched, so it can recover later.
+        """
+        async with self._start_lock:
+            if self._started:
+                return
+            if self.source_handlers is None:
+                # Source construction loads catalogs and indexes from disk: keep it off the event loop.
+                self.source_handlers = await asyncio.to_thread(create_sources)
+            if not self.source_handlers:
+                logger.error("No search source is available; searches will return no results.")
+            for handler in self.source_handlers:
+                try:
+                    await handler.start()
+                except Exception as e:
+                    logger.exception(f"Failed to start source {handler.source_name}: {e}")
+            if warmup:
+                outcomes = await asyncio.gather(
+                    *(handler.warmup() for handler in self.source_handlers), return_exceptions=True
+                )
+                for handler, outcome in zip(self.source_handlers, outcomes):
+                    if isinstance(outcome, Exception):
+                        logger.warning(f"Warmup of source {handler.source_name} failed: {outcome}")
+            self._started = True
+
+    async def close(self):
+        """
+        Closes every source handler. The shared HTTP pool (src.http_pool) is left open for the other
+        components using it; the process owner closes it with `close_http_client()`.
+        """
+        handlers = self.source_handlers or []
+        outcomes = await asyncio.gather(*(handler.close() for handler in handlers), return_exceptions=True)
+        for handler, outcome in zip(handlers, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Failed to close source {handler.source_name}: {outcome}")
+        self._started = False
+
+    async def __aenter__(self) -> "SearchManager":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _search_source(self, handler: BaseSourceHandler, use_case_description: str) -> SourceResult:
+        """Runs one source under its timeout and turns every outcome into a SourceResult."""
+        timeout = self.source_timeouts.get(handler.source_name, self.source_timeout_seconds)
+        started = time.monotonic()
+        try:
+            with span(f"search.{handler.source_name}"):
+                results = await asyncio.wait_for(handler.search(use_case_description=use_case_description), timeout)
+        except asyncio.TimeoutError:
+            return SourceResult(
+                source_name=handler.source_name,
+                status="timeout",
+                elapsed_seconds=time.monotonic() - started,
+                error=f"No response within {timeout:.1f}s",
+            )
+        except Exception as e:
+            logger.exception(f"Error during search with source {handler.source_name}: {e}")
+            return SourceResult(
+                source_name=handler.source_name,
+                status="error",
+                elapsed_seconds=time.monotonic() - started,
+                error=f"{type(e).__name__}: {e}",
+            )
+        return SourceResult(
+            source_name=handler.source_name,
+            status="ok",
+            results=results or [],
+            elapsed_seconds=time.monotonic() - started,
+        )
+
+    async def search_stream(self, use_case_description: str) -> AsyncIterator[SourceResult]:
+        """
+        Searches all sources concurrently and yields each source's outcome as soon as it is known.
+
+        Sources still running when the overall deadline expires are cancelled and yielded with
+        status "timeout". If the consumer stops iterating early, the remaining searches are cancelled.
+
+        Args:
+            use_case_description: The textual description of the use case.
+
+        Yields:
+            One SourceResult per source, fastest first; a single "error" result if there is no source.
+        """
+        if not self._started:
+            await self.start(warmup=False)
+        if not self.source_handlers:
+            yield SourceResult(
+                source_name="none", status="error", elapsed_seconds=0.0, error="No search source is available"
+            )
+            return
+
+        started = time.monotonic()
+        pending = {
+            asyncio.create_task(self._search_source(handler, use_case_description)): handler
+            for handler in self.source_handlers
+        }
+        try:
+            while pending:
+                remaining = self.deadline_seconds - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del pending[task]
+                    yield task.result()
+            for task, handler in list(pending.items()):
+                task.cancel()
+                del pending[task]
+                yield SourceResult(
+                    source_name=handler.source_name,
+                    status="timeout",
+                    elapsed_seconds=time.monotonic() - started,
+                    error=f"Search deadline of {self.deadline_seconds:.1f}s exceeded",
+                )
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def merge(self, source_results: List[SourceResult]) -> List[Dict[str, Any]]:
+        """Merges the results of the successful sources (see `merge_results`)."""
+        results_per_source = [(r.source_name, r.results) for r in source_results if r.status == "ok"]
+        return merge_results(results_per_source, limit=self.total_result_limit)
+
+    async def search_detailed(self, use_case_description: str) -> SearchResponse:
+        """
+        Performs a search across all sources and reports the status of every source.
 
         Args:
             use_case_description: The textual description of the use case.
 
         Returns:
-            A list of SearchResult objects.
+            The merged results and one SourceResult per source.
         """
-        assert len(self.source_handlers) > 0, "No source handlers provided"
+        source_results = [result async for result in self.search_stream(use_case_description)]
+        for result in source_results:
+            if result.status != "ok":
+                logger.warning(f"Source {result.source_name} returned no results ({result.status}): {result.error}")
+        merged = self.merge(source_results)
+        logger.info(
+            f"Merged {sum(len(r.results) for r in source_results)} results from "
+            f"{len(source_results)} source(s) into {len(merged)}."
+        )
+        return SearchResponse(results=merged, sources=source_results)
 
-        tasks = [handler.search(use_case_description=use_case_description) for handler in self.source_handlers]
+    async def search(self, use_case_description: str) -> List[Dict[str, Any]]:
+        """
+        Performs a search for a given use case description across all configured sources.
 
-        results_from_all_sources = await asyncio.gather(*tasks, return_exceptions=True)
-        all_results: List[Dict[str, Any]] = []
-        for result_list in results_from_all_sources:
-            if isinstance(result_list, list):
-                all_results.extend(result_list)
-            elif isinstance(result_list, Exception):
-                # log.error(f"Error during search with a source handler: {result_list}")
-                # Optionally, re-raise or handle more gracefully
-                pass
+        Args:
+            use_case_description: The textual description of the use case.
 
-        # TODO: Implement deduplication
-        # TODO: Implement ranking/sorting if needed
-        # TODO: Implement limiting results based on config.SEARCH_TOTAL_RESULT_LIMIT
-        return all_results
+        Returns:
+            The deduplicated results of all sources, ranked by reciprocal-rank fusion and cut to the total limit.
+        """
+        return (await self.search_detailed(use_case_description)).results
 
 
 if __name__ == "__main__":
     import asyncio
 
+    from src.http_pool import close_http_client
     from src.search_engine.sources.github_source import GitHubSource
 
     async def main_test():
         github_handler = GitHubSource()
-        manager = SearchManager([github_handler])
-
         test_use_case = "A system to manage customer orders and track shipments."
-        results = await manager.search(test_use_case)
+        try:
+            async with SearchManager([github_handler]) as manager:
+                results = await manager.search(test_use_case)
+        finally:
+            await close_http_client()
 
         if results:
             print(f"\nFound {len(results)} results for use case: '{test_use_case}'")
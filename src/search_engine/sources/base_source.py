@@ -2,8 +2,13 @@
 """
 Defines the abstract base class for all source handlers.
 """
+
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from src.http_pool import get_http_client
 
 
 class BaseSourceHandler(ABC):
@@ -11,19 +16,23 @@ class BaseSourceHandler(ABC):
     Abstract base class for source handlers.
     Each handler is responsible for searching one specific type of source.
     Individual handlers will fetch necessary config values directly from src.config.
+
+    Handlers are async context managers: `start()` acquires resources and starts background work,
+    `warmup()` prepares anything the first search would otherwise wait for, and `close()` releases
+    what the handler owns. HTTP requests go through the shared connection pool, which handlers
+    never close themselves.
     """
 
-    def __init__(self, source_name: str):
+    def __init__(self, source_name: str, http_client: Optional[httpx.AsyncClient] = None):
         """
         Initializes the source handler.
 
         Args:
             source_name: A string name for this source (e.g., "GitHub", "Pipedream").
+            http_client: Client for outgoing requests; defaults to the shared connection pool.
         """
-        # self.config = config # Removed, handlers get their own config
         self.source_name = source_name
-        # Potentially initialize httpx client here if shared across all handlers
-        # self.http_client = httpx.AsyncClient()
+        self.http_client = http_client or get_http_client()
 
     @abstractmethod
     async def search(self, use_case_description: str) -> List[Dict[str, Any]]:
@@ -31,17 +40,26 @@ class BaseSourceHandler(ABC):
         Performs a search for a given query related to a use case.
 
         Args:
-            query: The search query string (can be the use case description itself
-                   or a transformed version).
             use_case_description: The original use case description, for context.
 
         Returns:
-            A list of SearchResult objects found by this source.
+            A list of result dicts (name, description, url, ...) found by this source.
             Should return an empty list if no results are found or an error occurs.
         """
         pass
 
-    # Optional: Add a method to close resources like httpx client if created per handler
-    # async def close(self):
-    #     if hasattr(self, 'http_client'):
-    #         await self.http_client.aclose()
+    async def start(self):
+        """Starts background work (e.g. periodic refreshes). Called once before the first search."""
+
+    async def warmup(self):
+        """Prepares data the first search would otherwise wait for (e.g. indexes, listings)."""
+
+    async def close(self):
+        """Stops background work and releases resources owned by this handler."""
+
+    async def __aenter__(self) -> "BaseSourceHandler":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -1,18 +1,35 @@
 """Source handler for searching GitHub."""
 
+import asyncio
 import logging
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from github import Auth, Github
-from markdown_it import MarkdownIt
-from openai import OpenAI
+from openai import AsyncOpenAI
 from pydantic import BaseModel
 
-from src.config import get_llm_api_key
+from src.config import (
+    GITHUB_PROMPT_TOKEN_BUDGET,
+    GITHUB_README_REFRESH_SECONDS,
+    GITHUB_RETRIEVAL_MODE,
+    GITHUB_RETRIEVAL_MODES,
+    GITHUB_SHORTLIST_K,
+    get_llm_api_key,
+)
+from src.http_pool import LLM_TIMEOUT
+from src.llm_client import parse_structured_async
+from src.search_engine.bm25_index import BM25Index
+from src.search_engine.catalog import GITHUB_SECTION_KEYWORDS, CatalogEntry, CatalogIndex, readme_hashes
+from src.search_engine.github_stars import GitHubStarsClient, parse_github_repo_id
+from src.search_engine.prompt_assembler import AssembledPrompt, CuratedList, PromptAssembler, log_prompt_tokens
+from src.search_engine.readme_refresher import ReadmeRefresher
 from src.search_engine.sources.base_source import BaseSourceHandler
+from src.telemetry import span
+from src.token_counter import get_token_counter
+
+if TYPE_CHECKING:
+    from src.search_engine.dense_index import DenseIndex
 
 GITHUB_CACHE_PATHS = {
     "modelcontextprotocol/servers": "resources/github/modelcontextprotocol_servers.md",
@@ -46,20 +63,15 @@ Provide expert advice and recommendations based on your findings.
 
 - Ensure to consider compatibility, reliability, and community support during the matching process.
 - Discuss any alternatives or additional considerations if needed, but focus on providing clear and directed recommendations.
-
-# Curated MCP List 1 (modelcontextprotocol/servers)
-
-{curated_file1}
-
-# Curated MCP list 2 (punkpeye/awesome-mcp-servers)
-
-{curated_file2}
-
-# Curated MCP list 3 (appcypher/awesome-mcp-servers)
-
-{curated_file3}
 """
 
+# The curated lists follow SYSTEM_PROMPT in this order (see PromptAssembler).
+CURATED_LIST_HEADINGS = {
+    "modelcontextprotocol/servers": "# Curated MCP List 1 (modelcontextprotocol/servers)",
+    "punkpeye/awesome-mcp-servers": "# Curated MCP list 2 (punkpeye/awesome-mcp-servers)",
+    "appcypher/awesome-mcp-servers": "# Curated MCP list 3 (appcypher/awesome-mcp-servers)",
+}
+
 
 class MCPCandidate(BaseModel):
     """
@@ -89,122 +101,205 @@ class GitHubSource(BaseSourceHandler):
 
     def __init__(
         self,
+        retrieval_mode: Optional[str] = None,
+        shortlist_k: Optional[int] = None,
+        prompt_token_budget: Optional[int] = None,
     ):
+        """
+        Args:
+            retrieval_mode: "bm25" (lexical) or "dense" (hashed n-gram vectors) to shortlist catalog
+                entries before the LLM call, or "full" to send every curated list.
+                Defaults to config.GITHUB_RETRIEVAL_MODE.
+            shortlist_k: Number of shortlisted entries. Defaults to config.GITHUB_SHORTLIST_K.
+            prompt_token_budget: Maximum system prompt size in tokens. Defaults to config.GITHUB_PROMPT_TOKEN_BUDGET.
+        """
+        self.retrieval_mode = (retrieval_mode or GITHUB_RETRIEVAL_MODE).strip().lower()
+        if self.retrieval_mode not in GITHUB_RETRIEVAL_MODES:
+            raise ValueError(
+                f"Unknown retrieval mode '{retrieval_mode}'. Expected one of {', '.join(GITHUB_RETRIEVAL_MODES)}."
+            )
         super().__init__(source_name="GitHub")
-        self.client = OpenAI(api_key=get_llm_api_key())
+        self.shortlist_k = GITHUB_SHORTLIST_K if shortlist_k is None else shortlist_k
+        self.client = AsyncOpenAI(
+            api_key=get_llm_api_key(), http_client=self.http_client, timeout=LLM_TIMEOUT, max_retries=0
+        )
         github_token = os.getenv("GITHUB_TOKEN")
         if not github_token:
             logger.info("GITHUB_TOKEN is not set, using prefetched repositories as searching sources.")
-            self.github_client = None
+            self.stars_client = None
+            self.readme_refresher = None
         else:
-            self.github_client = Github(auth=Auth.Token(github_token))
-            logger.info("PyGithub client initialized successfully.")
-
-    def _is_file_older_than_a_week(self, file_path):
-        """We have the cached readme files by default, so we don't need to check if the file exists."""
-        file_mtime = os.path.getmtime(file_path)
-        file_datetime = datetime.fromtimestamp(file_mtime)
-        return datetime.now() - file_datetime > timedelta(weeks=1)
-
-    def _update_github_cache_if_needed(self) -> Dict[str, str]:
-        curated_files = {}
-        if self.github_client is None:
-            logger.info("No GitHub client available, skipping cache update.")
-            for repo, file_path in GITHUB_CACHE_PATHS.items():
-                with open(file_path, "r") as file:
-                    curated_files[repo] = file.read()
-            return curated_files
-
-        for repo, file_path in GITHUB_CACHE_PATHS.items():
-            if self._is_file_older_than_a_week(file_path):
-                logger.info(f"Updating cache for {repo} (file: {file_path})...")
-                try:
-                    repo_obj = self.github_client.get_repo(repo)
-                    readme_content = repo_obj.get_readme().decoded_content.decode("utf-8")
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        f.write(readme_content)
-                    logger.info(f"Updated {file_path} from {repo}.")
-                    curated_files[repo] = readme_content
-                except Exception as e:
-                    logger.exception(f"Failed to update {file_path} from {repo}: {e}")
-            else:
-                logger.info(f"Cache for {repo} is up to date.")
-                with open(file_path, "r") as file:
-                    curated_files[repo] = file.read()
-        return curated_files
-
-    def _extract_section_with_keyword(self, md_text, keyword):
-        md = MarkdownIt()
-        tokens = md.parse(md_text)
-        result = []
-        in_section = False
-        current_level = None
-        for token in tokens:
-            if token.type == "heading_open":
-                heading_level = int(token.tag[1])  # e.g., 'h2' → 2
-                heading_text = tokens[tokens.index(token) + 1].content.lower()
-
-                if keyword.lower() in heading_text:
-                    in_section = True
-                    current_level = heading_level
-                    continue
-
-                if in_section and heading_level <= current_level:
-                    # Stop collecting at next heading of same or higher level
-                    break
-            if in_section:
-                result.append(token.content if hasattr(token, "content") else "")
-        return "\n".join(result).strip()
-
-    def post_processing(
+            self.stars_client = GitHubStarsClient(github_token, http_client=self.http_client)
+            self.readme_refresher = ReadmeRefresher(
+                GITHUB_CACHE_PATHS,
+                github_token,
+                interval_seconds=GITHUB_README_REFRESH_SECONDS,
+                on_refresh=self.reload_catalog_if_changed,
+                http_client=self.http_client,
+            )
+        self.catalog = CatalogIndex.load_or_build(GITHUB_CACHE_PATHS)
+        self.bm25_index, self.dense_index = self._load_retrieval_indexes(self.catalog)
+        self.token_counter = get_token_counter(MODEL_NAME)
+        self.prompt_assembler = PromptAssembler(
+            self.token_counter, GITHUB_PROMPT_TOKEN_BUDGET if prompt_token_budget is None else prompt_token_budget
+        )
+        self._system_prompt: Optional[AssembledPrompt] = None
+        self._system_prompt_cache_key = None
+
+    def _load_retrieval_indexes(self, catalog: CatalogIndex) -> Tuple[Optional[BM25Index], Optional["DenseIndex"]]:
+        """Loads (or builds) the retrieval index for the configured mode and the given catalog."""
+        if self.retrieval_mode == "bm25":
+            return BM25Index.load_or_build(catalog), None
+        if self.retrieval_mode == "dense":
+            from src.search_engine.dense_index import DenseIndex  # Imports numpy, only needed in dense mode
+
+            return None, DenseIndex.load_or_build(catalog)
+        return None, None
+
+    def _load_catalog_if_changed(self) -> Optional[Tuple[CatalogIndex, Optional[BM25Index], Optional["DenseIndex"]]]:
+        """Loads the catalog and its retrieval index if a README on disk no longer matches the current catalog."""
+        if readme_hashes(GITHUB_CACHE_PATHS) == self.catalog.readme_hashes:
+            return None
+        catalog = CatalogIndex.load_or_build(GITHUB_CACHE_PATHS)
+        return (catalog, *self._load_retrieval_indexes(catalog))
+
+    async def reload_catalog_if_changed(self) -> bool:
+        """
+        Hot-swaps the catalog if a README changed on disk (refreshed by this or another worker).
+        Parsing and index building run in a worker thread; in-flight searches keep the version they started with.
+
+        Returns:
+            True if a new catalog was loaded.
+        """
+        state = await asyncio.to_thread(self._load_catalog_if_changed)
+        if state is None:
+            return False
+        # Swapped on the event loop in one step, so a search never pairs a catalog with another version's index.
+        self.catalog, self.bm25_index, self.dense_index = state
+        logger.info(f"Reloaded MCP catalog with {len(self.catalog.entries)} entries.")
+        return True
+
+    def start_background_refresh(self):
+        """Starts the background README refresh on the running event loop, if a GitHub token is configured."""
+        if self.readme_refresher is not None:
+            self.readme_refresher.start()
+
+    async def start(self):
+        self.start_background_refresh()
+
+    async def warmup(self):
+        """Renders the full-context system prompt (also the fallback when retrieval finds nothing) ahead of time."""
+        await asyncio.to_thread(self._build_system_prompt, self.catalog)
+
+    async def close(self):
+        """Stops the background README refresh."""
+        if self.readme_refresher is not None:
+            await self.readme_refresher.stop()
+
+    def _assemble_system_prompt(
+        self, catalog: CatalogIndex, shortlist: Optional[List[CatalogEntry]] = None
+    ) -> AssembledPrompt:
+        """
+        Lays out SYSTEM_PROMPT and the curated lists (all entries, or only the shortlisted ones) within the token
+        budget. Entries are grouped under the curated list that first lists them and always appear in catalog
+        order; the shortlist's relevance order only decides which entries are dropped when over budget.
+        """
+        selected = None if shortlist is None else {id(entry) for entry in shortlist}
+        by_source: Dict[str, List[CatalogEntry]] = {repo: [] for repo in GITHUB_CACHE_PATHS}
+        for entry in catalog.entries:
+            if selected is None or id(entry) in selected:
+                by_source.setdefault(entry.sources[0], []).append(entry)
+        curated_lists = [
+            CuratedList(repo, CURATED_LIST_HEADINGS.get(repo, f"# Curated MCP list ({repo})"), entries)
+            for repo, entries in by_source.items()
+        ]
+        return self.prompt_assembler.assemble(SYSTEM_PROMPT, curated_lists, priority=shortlist)
+
+    def _build_system_prompt(self, catalog: CatalogIndex) -> AssembledPrompt:
+        """Renders the full-context prompt for a catalog version, reusing the cached prompt when nothing changed."""
+        cache_key = (catalog.fingerprint, tuple(GITHUB_SECTION_KEYWORDS.items()), self.prompt_assembler.budget_tokens)
+        if self._system_prompt_cache_key != cache_key:
+            self._system_prompt = self._assemble_system_prompt(catalog)
+            self._system_prompt_cache_key = cache_key
+        return self._system_prompt
+
+    def _shortlist_candidates(self, catalog: CatalogIndex, use_case_description: str) -> Optional[List[CatalogEntry]]:
+        """
+        Picks the top-K catalog entries for the use case with the configured retrieval index.
+
+        Returns:
+            The shortlisted entries, most relevant first, or None to fall back to full-context mode
+            (retrieval disabled, K <= 0 or no match at all).
+        """
+        if self.retrieval_mode == "bm25":
+            index = self.bm25_index
+        elif self.retrieval_mode == "dense":
+            index = self.dense_index
+        else:
+            return None
+        if self.shortlist_k <= 0:
+            return None
+        hits = index.top_k(use_case_description, self.shortlist_k)
+        if not hits:
+            logger.info(f"No catalog entries matched ({self.retrieval_mode}), falling back to full-context mode.")
+            return None
+        logger.info(f"Shortlisted {len(hits)} of {len(catalog.entries)} catalog entries ({self.retrieval_mode}).")
+        return [catalog.entries[doc_id] for doc_id, _ in hits]
+
+    async def post_processing(
         self,
         mcp_candidates: List[MCPCandidate],
     ):
-        if self.github_client is not None:
+        """Fills in GitHub stars for all candidates with one batched (and cached) lookup."""
+        if self.stars_client is not None:
+            repo_ids = {candidate.url: parse_github_repo_id(candidate.url) for candidate in mcp_candidates}
+            with span("star_lookup", repos=len(set(filter(None, repo_ids.values())))):
+                stars = await self.stars_client.get_stars(repo_id for repo_id in repo_ids.values() if repo_id)
             for mcp_candidate in mcp_candidates:
-                github_repo_id = "/".join(mcp_candidate.url.split("https://github.com/")[1].split("/")[:2])
-                try:
-                    repo_obj = self.github_client.get_repo(github_repo_id)
-                    stars = repo_obj.stargazers_count
-                    mcp_candidate.stars = stars
-                except Exception as e:
-                    logger.exception(f"Failed to get stars for {github_repo_id}: {e}")
+                repo_id = repo_ids[mcp_candidate.url]
+                if repo_id is not None:
+                    mcp_candidate.stars = stars.get(repo_id)
         return mcp_candidates
 
     async def search(self, use_case_description: str):
         """
         Searches GitHub for relevant repositories or code.
         """
-        curated_files = self._update_github_cache_if_needed()
-        curated_file1 = self._extract_section_with_keyword(curated_files["modelcontextprotocol/servers"], "servers")
-        curated_file2 = self._extract_section_with_keyword(
-            curated_files["punkpeye/awesome-mcp-servers"], "Server Implementations"
-        )
-        curated_file3 = curated_files["appcypher/awesome-mcp-servers"]
-        system_prompt = SYSTEM_PROMPT.format(
-            curated_file1=curated_file1,
-            curated_file2=curated_file2,
-            curated_file3=curated_file3,
-        )
-
-        user_prompt = f"Use case description: {use_case_description}"
+        self.start_background_refresh()
+        catalog = self.catalog
+        with span("prompt_build", retrieval_mode=self.retrieval_mode) as prompt_span:
+            shortlist = self._shortlist_candidates(catalog, use_case_description)
+            if shortlist is None:
+                system_prompt = self._build_system_prompt(catalog)
+            else:
+                system_prompt = self._assemble_system_prompt(catalog, shortlist)
+            prompt_span.set_attribute("shortlisted", len(shortlist) if shortlist is not None else len(catalog.entries))
+
+            # The use case goes last so every request with the same catalog shares the system prompt prefix.
+            user_prompt = f"Use case description: {use_case_description}"
+            log_prompt_tokens(
+                system_prompt,
+                self.prompt_assembler.budget_tokens,
+                self.token_counter.name,
+                {"use_case": self.token_counter.count(user_prompt)},
+            )
         logger.info("Searching over curated lists of MCPs/APIs...")
-        response = self.client.responses.parse(
+        mcp_candidates_response = await parse_structured_async(
+            self.client,
             model=MODEL_NAME,
             input=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": system_prompt.text},
                 {"role": "user", "content": user_prompt},
             ],
             text_format=MCPCandidates,
+            stage="github_search",
         )
-        MCP_candidates = [i for i in response.output_parsed.MCP_candidates if i.url != ""]
-        MCP_candidates = self.post_processing(MCP_candidates)
+        MCP_candidates = [i for i in mcp_candidates_response.MCP_candidates if i.url != ""]
+        MCP_candidates = await self.post_processing(MCP_candidates)
         return [i.model_dump() for i in MCP_candidates]
 
 
 if __name__ == "__main__":
-    import asyncio
-
     load_dotenv(override=True)
 
     async def main():
@@ -1,62 +1,349 @@
 # src/search_engine/sources/mcp_market_source.py
 """
 Source handler for searching MCPMarket or similar MCP marketplaces.
+
+The paginated server listing is crawled incrementally: pages are fetched concurrently (with a
+bounded limit), each response is parsed as it streams in with lxml's pull parser, and the items
+are kept in a local SQLite store together with each page's ETag/Last-Modified. Later crawls send
+conditional requests, so unchanged pages cost a 304. Queries are answered from the store.
 """
-from typing import List
 
-# from bs4 import BeautifulSoup
-# from src.config import AppConfig # AppConfig is not defined
-from src.search_engine.search_manager import SearchResult
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+from lxml import etree
+
+from src.config import MCP_SOURCE_URLS, MCPMARKET_REFRESH_SECONDS, SEARCH_RESULT_LIMIT_PER_SOURCE
+from src.http_pool import close_http_client
+from src.search_engine.bm25_index import BM25Index
+from src.search_engine.catalog import CatalogEntry, CatalogIndex, content_hash
 
 from .base_source import BaseSourceHandler
 
-# Config will be fetched by specific getters if needed
+logger = logging.getLogger(__name__)
+
+MCPMARKET_STORE_PATH = ".cache/mcpmarket.sqlite3"
+MCPMARKET_LISTING_PATH = "/server"
+MCPMARKET_CATEGORY = "MCPMarket"
+CRAWL_CONCURRENCY = 4
+MAX_LISTING_PAGES = 500
+
+_base = urlsplit(MCP_SOURCE_URLS["mcpmarket"])
+MCPMARKET_BASE_URL = f"{_base.scheme}://{_base.netloc}"
+
+_HEADING_TAGS = frozenset(("h1", "h2", "h3", "h4"))
+
+
+def _text(element) -> str:
+    return " ".join("".join(element.itertext()).split())
+
+
+class ListingPageParser:
+    """
+    Incremental parser for one listing page: feed it chunks as they arrive, and each server card
+    (a link to `<item_path>/<slug>`) is extracted as soon as it is complete and then dropped from
+    the tree, so the whole DOM is never held in memory.
+    """
+
+    def __init__(self, page_url: str, item_path: str = MCPMARKET_LISTING_PATH):
+        self.page_url = page_url
+        self.item_prefix = item_path.rstrip("/") + "/"
+        self.items: Dict[str, CatalogEntry] = {}
+        self._parser = etree.HTMLPullParser(events=("end",))
+
+    def feed(self, chunk: bytes):
+        self._parser.feed(chunk)
+        self._drain()
+
+    def close(self) -> List[CatalogEntry]:
+        self._parser.close()
+        self._drain()
+        return list(self.items.values())
+
+    def _drain(self):
+        for _event, element in self._parser.read_events():
+            if element.tag != "a":
+                continue
+            href = element.get("href") or ""
+            url = urljoin(self.page_url, href).split("?", 1)[0].split("#", 1)[0].rstrip("/")
+            if urlsplit(url).path.startswith(self.item_prefix):
+                self._add_item(url, element)
+            # The card is fully processed; free it and everything parsed before it.
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    def _add_item(self, url: str, element):
+        heading = next((child for child in element.iter() if child.tag in _HEADING_TAGS), None)
+        paragraph = next((child for child in element.iter() if child.tag == "p"), None)
+        name = _text(heading if heading is not None else element)
+        description = _text(paragraph) if paragraph is not None else ""
+        # Keep the link that carries the card text if the same server is linked more than once.
+        if not name or (url in self.items and not description):
+            return
+        self.items[url] = CatalogEntry(
+            name=name, url=url, description=description, category=MCPMARKET_CATEGORY, sources=["mcpmarket"]
+        )
+
+
+class MCPMarketStore:
+    """
+    SQLite store of crawled listing pages (with their validators) and the items found on them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "page INTEGER PRIMARY KEY, etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "url TEXT PRIMARY KEY, page INTEGER NOT NULL, position INTEGER NOT NULL, entry TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS items_page ON items (page)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Yields a short-lived connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def validators(self) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+        """Returns (ETag, Last-Modified) per stored page."""
+        with self._connection() as conn:
+            rows = conn.execute("SELECT page, etag, last_modified FROM pages").fetchall()
+        return {page: (etag, last_modified) for page, etag, last_modified in rows}
 
-# import logging
-# log = logging.getLogger(__name__)
+    def save_page(self, page: int, entries: List[CatalogEntry], etag: Optional[str], last_modified: Optional[str]):
+        """Replaces the items of a page that changed."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM items WHERE page = ?", (page,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO items (url, page, position, entry) VALUES (?, ?, ?, ?)",
+                [(entry.url, page, position, entry.model_dump_json()) for position, entry in enumerate(entries)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (page, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?)",
+                (page, etag, last_modified, time.time()),
+            )
+
+    def remove_pages_after(self, last_page: int) -> int:
+        """Drops pages (and their items) beyond the end of the listing and returns the number of rows removed."""
+        with self._connection() as conn:
+            removed = conn.execute("DELETE FROM items WHERE page > ?", (last_page,)).rowcount
+            removed += conn.execute("DELETE FROM pages WHERE page > ?", (last_page,)).rowcount
+        return removed
+
+    def entries(self) -> List[CatalogEntry]:
+        """Returns all stored items in listing order."""
+        with self._connection() as conn:
+            rows = conn.execute("SELECT entry FROM items ORDER BY page, position").fetchall()
+        return [CatalogEntry(**json.loads(entry)) for (entry,) in rows]
+
+    def get_crawled_at(self) -> float:
+        with self._connection() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'crawled_at'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def set_crawled_at(self, crawled_at: float):
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('crawled_at', ?)", (str(crawled_at),))
 
 
 class MCPMarketSource(BaseSourceHandler):
     """
     Handles searching for MCPs on MCPMarket or similar marketplaces.
-    This will likely involve web scraping.
+    Searches are answered from the local store; the listing is re-crawled in the background once
+    the last crawl is older than the refresh interval.
     """
 
-    def __init__(self):  # Removed config: AppConfig
-        super().__init__(source_name="MCPMarket")
-        # from src.config import MCP_SOURCE_URLS # Example
-        # self.target_url = MCP_SOURCE_URLS.get("mcpmarket")
-        # self.http_client = httpx.AsyncClient(timeout=10.0)
+    def __init__(
+        self,
+        base_url: str = MCPMARKET_BASE_URL,
+        listing_path: str = MCPMARKET_LISTING_PATH,
+        http_client: Optional[httpx.AsyncClient] = None,
+        store_path: str = MCPMARKET_STORE_PATH,
+        refresh_interval_seconds: float = MCPMARKET_REFRESH_SECONDS,
+        concurrency: int = CRAWL_CONCURRENCY,
+        result_limit: int = SEARCH_RESULT_LIMIT_PER_SOURCE,
+    ):
+        super().__init__(source_name="MCPMarket", http_client=http_client)
+        self.base_url = base_url.rstrip("/")
+        self.listing_path = listing_path
+        self.store = MCPMarketStore(store_path)
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.concurrency = max(1, concurrency)
+        self.result_limit = result_limit
+        self.catalog: Optional[CatalogIndex] = None
+        self.index: Optional[BM25Index] = None
+        self._crawl_lock = asyncio.Lock()
+        self._crawl_task: Optional[asyncio.Task] = None
+        self._load_store()
+
+    def _load_store(self):
+        """Builds the in-memory search index from the store."""
+        entries = self.store.entries()
+        if not entries:
+            return
+        catalog = CatalogIndex(entries, {self.base_url: content_hash(json.dumps([e.url for e in entries]))})
+        # Catalog and index are replaced together so a concurrent search never mixes two crawls.
+        self.catalog, self.index = catalog, BM25Index.build(catalog)
+
+    def _page_url(self, page: int) -> str:
+        return f"{self.base_url}{self.listing_path}?page={page}"
 
-    async def search(self, query: str, use_case_description: str) -> List[SearchResult]:
+    async def _fetch_page(self, page: int, validators: Tuple[Optional[str], Optional[str]]) -> Optional[bool]:
         """
-        Searches an MCP marketplace.
-        This is a placeholder and needs full implementation.
+        Fetches and stores one listing page.
+
+        Returns:
+            True if the page changed, False if it is unchanged (304), None if it is past the end of the listing.
+        """
+        etag, last_modified = validators
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        url = self._page_url(page)
+        async with self.http_client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                return False
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            parser = ListingPageParser(str(response.url), self.listing_path)
+            async for chunk in response.aiter_bytes():
+                parser.feed(chunk)
+            entries = parser.close()
+            if not entries:
+                return None
+            await asyncio.to_thread(
+                self.store.save_page, page, entries, response.headers.get("ETag"), response.headers.get("Last-Modified")
+            )
+        return True
+
+    async def crawl(self) -> int:
         """
-        # log.info(f"MCPMarketSource searching for: {query} at {self.target_url}")
-        results: List[SearchResult] = []
-
-        # Implementation Details: (Similar to PipedreamMCPSource)
-        # 1. Fetch HTML from self.target_url (potentially with search query params if supported).
-        # 2. Parse HTML with BeautifulSoup.
-        # 3. Identify and extract MCP listings (name, description, link, price if relevant).
-        # 4. Filter/match based on `query` or `use_case_description`.
-        # 5. Create SearchResult objects.
-        # 6. Handle errors gracefully.
-
-        # Placeholder result:
-        # if query:
-        #     results.append(SearchResult(
-        #         name="Placeholder MCPMarket Item",
-        #         description="A placeholder result from MCPMarketSource.",
-        #         url="https://mcpmarket.com/example-item",
-        #         source_name=self.source_name,
-        #         metadata={"price": "$10"}
-        #     ))
-
-        # log.info(f"MCPMarketSource found {len(results)} results.")
+        Crawls the listing with up to `concurrency` pages in flight. Pages are claimed in order
+        until one is past the end of the listing (404 or no items).
+
+        Returns:
+            The number of pages that changed.
+        """
+        async with self._crawl_lock:
+            validators = await asyncio.to_thread(self.store.validators)
+            next_page = 1
+            last_page = MAX_LISTING_PAGES
+            changed = 0
+            failed = 0
+            removed = 0
+
+            async def worker():
+                nonlocal next_page, last_page, changed, failed
+                while next_page <= last_page:
+                    page = next_page
+                    next_page += 1
+                    try:
+                        result = await self._fetch_page(page, validators.get(page, (None, None)))
+                    except Exception as e:
+                        logger.warning(f"Failed to crawl {self._page_url(page)}: {e}")
+                        failed += 1
+                        continue
+                    if result is None:
+                        last_page = min(last_page, page - 1)
+                    elif result:
+                        changed += 1
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            if not failed:
+                # Only a complete crawl can tell where the listing ends; otherwise the next search retries.
+                removed = await asyncio.to_thread(self.store.remove_pages_after, last_page)
+                await asyncio.to_thread(self.store.set_crawled_at, time.time())
+            if changed or removed or self.catalog is None:
+                await asyncio.to_thread(self._load_store)
+            logger.info(
+                f"Crawled {last_page} MCPMarket listing page(s): {changed} changed, {failed} failed, {removed} stale row(s) removed."
+            )
+            return changed
+
+    async def _crawl_in_background(self):
+        try:
+            await self.crawl()
+        except Exception as e:
+            logger.warning(f"Background crawl of the MCPMarket listing failed: {e}")
+
+    async def search(self, use_case_description: str) -> List[Dict[str, Any]]:
+        """
+        Searches the locally stored MCPMarket listing.
+        Only the very first search (with an empty store) waits for a crawl.
+        """
+        if self.catalog is None:
+            await self.crawl()
+        else:
+            crawled_at = await asyncio.to_thread(self.store.get_crawled_at)
+            is_stale = time.time() - crawled_at > self.refresh_interval_seconds
+            if is_stale and (self._crawl_task is None or self._crawl_task.done()):
+                self._crawl_task = asyncio.get_running_loop().create_task(self._crawl_in_background())
+
+        catalog, index = self.catalog, self.index
+        if catalog is None:
+            return []
+        results = []
+        for doc_id, _score in index.top_k(use_case_description, self.result_limit):
+            entry = catalog.entries[doc_id]
+            results.append(
+                {
+                    "name": entry.name,
+                    "description": entry.description,
+                    "url": entry.url,
+                    "corresponding_functions": [],
+                    "reasoning": "",
+                    "stars": None,
+                }
+            )
+        logger.info(f"MCPMarketSource found {len(results)} results.")
         return results
 
-    # async def close(self):
-    #     """Closes any open resources, like the httpx client."""
-    #     await self.http_client.aclose()
+    async def warmup(self):
+        """Crawls the listing if the store is still empty."""
+        if self.catalog is None:
+            await self.crawl()
+
+    async def close(self):
+        """Cancels a running background crawl."""
+        if self._crawl_task is not None:
+            self._crawl_task.cancel()
+            self._crawl_task = None
+
+
+if __name__ == "__main__":
+
+    async def main():
+        source = MCPMarketSource()
+        try:
+            for result in await source.search("Query a Postgres database and chart the results"):
+                print(f"{result['name']}: {result['url']}\n  {result['description']}")
+        finally:
+            await source.close()
+            await close_http_client()
+
+    asyncio.run(main())
@@ -1,107 +1,211 @@
 # src/search_engine/sources/pipedream_mcp_source.py
 """
 Source handler for searching Pipedream MCPs or similar curated MCP lists.
+
+The app listing of mcp.pipedream.com is scraped at most once per refresh interval over a
+long-lived HTTP/2 client, kept in a local JSON cache, and every query is answered from an
+in-memory BM25 index over that listing instead of a live scrape.
 """
-from typing import List
 
-# from bs4 import BeautifulSoup
-# from src.config import AppConfig # AppConfig is not defined
-from src.search_engine.search_manager import SearchResult
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+from lxml import html
+
+from src.config import MCP_SOURCE_URLS, PIPEDREAM_REFRESH_SECONDS, SEARCH_RESULT_LIMIT_PER_SOURCE
+from src.http_pool import close_http_client
+from src.search_engine.bm25_index import BM25Index
+from src.search_engine.catalog import CatalogEntry, CatalogIndex, content_hash
+from src.search_engine.readme_refresher import atomic_write
 
 from .base_source import BaseSourceHandler
 
-# Config will be fetched by specific getters if needed
+logger = logging.getLogger(__name__)
+
+PIPEDREAM_CACHE_PATH = ".cache/pipedream_apps.json"
+PIPEDREAM_CATEGORY = "Pipedream"
+# Safety net for listings that paginate with rel="next" links.
+MAX_LISTING_PAGES = 50
+
+_base = urlsplit(MCP_SOURCE_URLS["pipedream"])
+PIPEDREAM_BASE_URL = f"{_base.scheme}://{_base.netloc}"
+
 
-# import logging
-# log = logging.getLogger(__name__)
+def parse_listing_page(page: str, base_url: str) -> Tuple[List[CatalogEntry], Optional[str]]:
+    """
+    Extracts the apps of one listing page.
+
+    Every link to `/app/<slug>` is an app card; its name is the card's first heading (or the
+    link text) and its description the card's first paragraph.
+
+    Returns:
+        (entries, absolute URL of the next page or None)
+    """
+    tree = html.fromstring(page)
+    entries: Dict[str, CatalogEntry] = {}
+    for link in tree.xpath('//a[contains(@href, "/app/")]'):
+        url = urljoin(base_url, link.get("href")).split("?", 1)[0].split("#", 1)[0].rstrip("/")
+        if not urlsplit(url).path.startswith("/app/"):
+            continue
+        headings = link.xpath(".//h1|.//h2|.//h3|.//h4")
+        name = " ".join((headings[0] if headings else link).text_content().split())
+        paragraphs = link.xpath(".//p")
+        description = " ".join(paragraphs[0].text_content().split()) if paragraphs else ""
+        # The same app may also be linked from navigation; keep the link that carries the card text.
+        if not name or (url in entries and not description):
+            continue
+        entries[url] = CatalogEntry(
+            name=name, url=url, description=description, category=PIPEDREAM_CATEGORY, sources=["pipedream"]
+        )
+    next_links = tree.xpath('//a[@rel="next"]/@href')
+    return list(entries.values()), (urljoin(base_url, next_links[0]) if next_links else None)
 
 
 class PipedreamMCPSource(BaseSourceHandler):
     """
     Handles searching for MCPs on Pipedream or similar curated MCP sites.
-    This will likely involve web scraping if no direct API is available.
+    The listing is cached locally and searched in memory; it is re-scraped once it is older than
+    the refresh interval, in the background so searches never wait for a scrape they don't need.
     """
 
-    def __init__(self):  # Removed config: AppConfig
-        super().__init__(source_name="PipedreamMCP")
-        # from src.config import MCP_SOURCE_URLS # Example
-        # self.target_url = MCP_SOURCE_URLS.get("pipedream")
-        # self.http_client = httpx.AsyncClient(timeout=10.0) # Configure timeout
+    def __init__(
+        self,
+        base_url: str = PIPEDREAM_BASE_URL,
+        http_client: Optional[httpx.AsyncClient] = None,
+        refresh_interval_seconds: float = PIPEDREAM_REFRESH_SECONDS,
+        cache_path: str = PIPEDREAM_CACHE_PATH,
+        result_limit: int = SEARCH_RESULT_LIMIT_PER_SOURCE,
+    ):
+        # Requests go through the shared pool, so connections stay alive (and multiplexed over HTTP/2).
+        super().__init__(source_name="PipedreamMCP", http_client=http_client)
+        self.base_url = base_url.rstrip("/")
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.cache_path = cache_path
+        self.result_limit = result_limit
+        self.catalog: Optional[CatalogIndex] = None
+        self.index: Optional[BM25Index] = None
+        self.fetched_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._load_cache()
+
+    def _load_cache(self):
+        """Loads the listing cached by a previous run, if any."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("base_url") != self.base_url:
+                return
+            self._set_entries([CatalogEntry(**entry) for entry in data["entries"]], data["fetched_at"])
+            logger.info(f"Loaded {len(self.catalog.entries)} Pipedream apps from {self.cache_path}.")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.info(f"No usable Pipedream cache at {self.cache_path} ({e}).")
+
+    def _save_cache(self):
+        data = {
+            "base_url": self.base_url,
+            "fetched_at": self.fetched_at,
+            "entries": [entry.model_dump() for entry in self.catalog.entries],
+        }
+        atomic_write(self.cache_path, json.dumps(data, ensure_ascii=False))
 
-    async def search(self, query: str, use_case_description: str) -> List[SearchResult]:
+    def _set_entries(self, entries: List[CatalogEntry], fetched_at: float):
+        catalog = CatalogIndex(entries, {self.base_url: content_hash(json.dumps([e.url for e in entries]))})
+        # Catalog and index are replaced together so a concurrent search never mixes two listings.
+        self.catalog, self.index = catalog, BM25Index.build(catalog)
+        self.fetched_at = fetched_at
+
+    def _is_stale(self) -> bool:
+        return time.time() - self.fetched_at > self.refresh_interval_seconds
+
+    async def _fetch_listing(self) -> List[CatalogEntry]:
+        """Scrapes all listing pages."""
+        entries: List[CatalogEntry] = []
+        seen = set()
+        url: Optional[str] = f"{self.base_url}/"
+        for _ in range(MAX_LISTING_PAGES):
+            if url is None:
+                break
+            response = await self.http_client.get(url)
+            response.raise_for_status()
+            page_entries, url = parse_listing_page(response.text, str(response.url))
+            for entry in page_entries:
+                if entry.url not in seen:
+                    seen.add(entry.url)
+                    entries.append(entry)
+        return entries
+
+    async def refresh(self):
+        """Re-scrapes the listing; concurrent callers share one scrape."""
+        async with self._refresh_lock:
+            if self.catalog is not None and not self._is_stale():
+                return
+            entries = await self._fetch_listing()
+            if not entries:
+                raise RuntimeError(f"No apps found on {self.base_url}, the page layout may have changed")
+            self._set_entries(entries, time.time())
+            await asyncio.to_thread(self._save_cache)
+            logger.info(f"Fetched {len(entries)} Pipedream apps from {self.base_url}.")
+
+    async def _refresh_in_background(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Background refresh of the Pipedream listing failed: {e}")
+
+    async def search(self, use_case_description: str) -> List[Dict[str, Any]]:
         """
         Searches the Pipedream MCP directory.
-        This is a placeholder and needs full implementation.
+        Only the very first search (without a cached listing) waits for a scrape.
         """
-        # log.info(f"PipedreamMCPSource searching for: {query} at {self.target_url}")
-        results: List[SearchResult] = []
-
-        # Implementation Details:
-        # 1. Fetch the content from self.target_url (and potentially subsequent pages).
-        #    - Use self.http_client.get()
-        # 2. Parse the HTML content using BeautifulSoup.
-        #    - Identify the structure containing MCP listings (name, description, link).
-        # 3. Filter/match listings based on the `query` or `use_case_description`.
-        #    - This might involve text matching within names and descriptions.
-        # 4. For each relevant MCP found:
-        #    - Extract name, description, direct URL to the MCP.
-        #    - Create a SearchResult object.
-        # 5. Handle network errors, parsing errors, and changes in website structure gracefully.
-
-        # Example (very basic structure):
-        # try:
-        #     response = await self.http_client.get(self.target_url, params={"q": query}) # If site supports query params
-        #     response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-        #
-        #     soup = BeautifulSoup(response.text, "lxml") # or "html.parser"
-        #
-        #     # Find all elements that represent an MCP item (this selector is hypothetical)
-        #     mcp_items = soup.select(".mcp-list-item")
-        #     limit = self.config.SEARCH_RESULT_LIMIT_PER_SOURCE or 5
-        #
-        #     count = 0
-        #     for item in mcp_items:
-        #         if count >= limit:
-        #             break
-        #
-        #         name_tag = item.select_one(".mcp-name a") # Hypothetical selector
-        #         desc_tag = item.select_one(".mcp-description") # Hypothetical selector
-        #
-        #         if name_tag and name_tag.text and desc_tag and desc_tag.text:
-        #             # Further filter by query relevance if needed
-        #             item_name = name_tag.text.strip()
-        #             item_desc = desc_tag.text.strip()
-        #             item_url = name_tag.get("href")
-        #             if item_url and (query.lower() in item_name.lower() or query.lower() in item_desc.lower()):
-        #                 results.append(
-        #                     SearchResult(
-        #                         name=item_name,
-        #                         description=item_desc,
-        #                         url=item_url, # Ensure it's an absolute URL
-        #                         source_name=self.source_name
-        #                     )
-        #                 )
-        #                 count += 1
-        #
-        # except httpx.HTTPStatusError as e:
-        #     log.error(f"HTTP error while fetching Pipedream MCPs: {e.response.status_code} - {e.request.url}")
-        # except httpx.RequestError as e:
-        #     log.error(f"Request error while fetching Pipedream MCPs: {e.request.url} - {e}")
-        # except Exception as e:
-        #     log.error(f"Unexpected error during Pipedream MCP search: {e}")
-
-        # Placeholder result:
-        # if query:
-        #     results.append(SearchResult(
-        #         name="Placeholder Pipedream MCP",
-        #         description="A placeholder result from PipedreamMCPSource.",
-        #         url="https://mcp.pipedream.com/example-mcp",
-        #         source_name=self.source_name
-        #     ))
-
-        # log.info(f"PipedreamMCPSource found {len(results)} results.")
+        if self.catalog is None:
+            await self.refresh()
+        elif self._is_stale() and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_in_background())
+
+        catalog, index = self.catalog, self.index
+        results = []
+        for doc_id, _score in index.top_k(use_case_description, self.result_limit):
+            entry = catalog.entries[doc_id]
+            results.append(
+                {
+                    "name": entry.name,
+                    "description": entry.description,
+                    "url": entry.url,
+                    "corresponding_functions": [],
+                    "reasoning": "",
+                    "stars": None,
+                }
+            )
+        logger.info(f"PipedreamMCPSource found {len(results)} results.")
         return results
 
-    # async def close(self):
-    #     """Closes any open resources, like the httpx client."""
-    #     await self.http_client.aclose()
+    async def warmup(self):
+        """Scrapes the listing if no cached copy was found."""
+        if self.catalog is None:
+            await self.refresh()
+
+    async def close(self):
+        """Cancels a running background refresh."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+
+if __name__ == "__main__":
+
+    async def main():
+        source = PipedreamMCPSource()
+        try:
+            for result in await source.search("Send Slack messages when a GitHub issue is opened"):
+                print(f"{result['name']}: {result['url']}\n  {result['description']}")
+        finally:
+            await source.close()
+            await close_http_client()
+
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Registry of the search source handlers, by the names used in `SEARCH_SOURCES_ENABLED`.
+
+Handlers are registered as "module:Class" paths, so a source's module (and its dependencies, e.g.
+lxml for the scraped sources or the curated catalog for GitHub) is only imported when the source
+is enabled and created.
+"""
+
+import importlib
+import logging
+from typing import Dict, List, Optional, Sequence, Type, Union
+
+from src.config import SEARCH_SOURCES_ENABLED
+from src.search_engine.sources.base_source import BaseSourceHandler
+
+logger = logging.getLogger(__name__)
+
+_source_handlers: Dict[str, Union[str, Type[BaseSourceHandler]]] = {
+    "github": "src.search_engine.sources.github_source:GitHubSource",
+    "pipedream": "src.search_engine.sources.pipedream_mcp_source:PipedreamMCPSource",
+    "mcpmarket": "src.search_engine.sources.mcp_market_source:MCPMarketSource",
+}
+
+
+def register_source(name: str, handler: Union[str, Type[BaseSourceHandler]]):
+    """
+    Registers a source handler under a name usable in `SEARCH_SOURCES_ENABLED`.
+
+    Args:
+        name: The source name, e.g. "pipedream" (case-insensitive).
+        handler: The handler class, or its "module:Class" path to import it only when needed.
+    """
+    _source_handlers[name.strip().lower()] = handler
+
+
+def available_sources() -> List[str]:
+    return sorted(_source_handlers)
+
+
+def get_source_class(name: str) -> Type[BaseSourceHandler]:
+    """Returns the handler class registered under `name`, importing its module on first use."""
+    key = name.strip().lower()
+    if key not in _source_handlers:
+        raise ValueError(f"Unknown search source '{name}'. Available: {', '.join(available_sources())}")
+    handler = _source_handlers[key]
+    if isinstance(handler, str):
+        module_name, class_name = handler.split(":", 1)
+        handler = getattr(importlib.import_module(module_name), class_name)
+        _source_handlers[key] = handler
+    return handler
+
+
+def create_sources(names: Optional[Sequence[str]] = None) -> List[BaseSourceHandler]:
+    """
+    Instantiates the enabled source handlers.
+
+    Unknown names and handlers that fail to import or initialize are logged and skipped, so one
+    broken source does not take the others down.
+
+    Args:
+        names: Source names; defaults to config.SEARCH_SOURCES_ENABLED.
+    """
+    handlers = []
+    for name in SEARCH_SOURCES_ENABLED if names is None else names:
+        try:
+            handlers.append(get_source_class(name)())
+        except Exception as e:
+            logger.exception(f"Failed to create search source '{name}': {e}")
+    if not handlers:
+        logger.warning(f"No search source could be created from {list(names or SEARCH_SOURCES_ENABLED)}.")
+    else:
+        logger.info(f"Search sources: {', '.join(handler.source_name for handler in handlers)}")
+    return handlers
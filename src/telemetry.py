@@ -0,0 +1,229 @@
+"""
+Tracing spans and Prometheus metrics for the pipeline stages.
+
+Every stage (input parsing, LLM calls, README cache check, prompt build, star lookup, ...) runs in
+a `span`. Spans nest through a context variable, so spans started inside a use case carry its
+`use_case_id`, and every finished span feeds the metrics registry. Spans around `yield` points of
+async generators are created with `activate=False`: they record their parent explicitly instead of
+becoming the current span, which would otherwise leak into the consumer between iterations.
+
+- `mcp_agent_stage_duration_seconds`: latency histogram per stage
+- `mcp_agent_stage_in_flight`: spans currently running per stage
+- `mcp_agent_stage_errors_total`: failed spans per stage and exception type
+
+`render_metrics()` returns the Prometheus text format, served on /metrics by the Gradio app.
+If OpenTelemetry is installed, every span is mirrored as an OpenTelemetry span as well, so a
+configured SDK exports full traces.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # Optional dependency
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+# Attributes that child spans copy from their parent
+INHERITED_ATTRIBUTES = ("use_case_id", "document_id")
+FINISHED_SPANS_KEPT = 1000
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return f"{value:g}"
+
+
+def format_metric(name: str, kind: str, help_text: str, samples: List[Sample]) -> List[str]:
+    """Renders one metric family in the Prometheus text format."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples]
+    return lines
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of the per-stage metrics, plus collectors that contribute further metrics.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._bucket_counts: Dict[str, List[int]] = {}
+        self._sums: Dict[str, float] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._errors: Dict[Tuple[str, str], int] = {}
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            counts = self._bucket_counts.setdefault(stage, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+            counts[-1] += 1  # +Inf, i.e. the total count
+            self._sums[stage] = self._sums.get(stage, 0.0) + seconds
+
+    def add_in_flight(self, stage: str, delta: int):
+        with self._lock:
+            self._in_flight[stage] = self._in_flight.get(stage, 0) + delta
+
+    def count_error(self, stage: str, error: str):
+        with self._lock:
+            self._errors[(stage, error)] = self._errors.get((stage, error), 0) + 1
+
+    def register_collector(self, collector: Callable[[], List[str]]):
+        """Adds a callback returning extra metric lines (see `format_metric`) on every scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text format."""
+        with self._lock:
+            histogram = [
+                "# HELP mcp_agent_stage_duration_seconds Duration of pipeline stages.",
+                "# TYPE mcp_agent_stage_duration_seconds histogram",
+            ]
+            for stage, counts in sorted(self._bucket_counts.items()):
+                for bound, count in zip((*self.buckets, "+Inf"), counts):
+                    le = bound if isinstance(bound, str) else f"{bound:g}"
+                    labels = _format_labels({"stage": stage, "le": le})
+                    histogram.append(f"mcp_agent_stage_duration_seconds_bucket{labels} {count}")
+                labels = _format_labels({"stage": stage})
+                histogram.append(f"mcp_agent_stage_duration_seconds_sum{labels} {self._sums[stage]:g}")
+                histogram.append(f"mcp_agent_stage_duration_seconds_count{labels} {counts[-1]}")
+            lines = histogram
+            lines += format_metric(
+                "mcp_agent_stage_in_flight",
+                "gauge",
+                "Pipeline stages currently running.",
+                [({"stage": stage}, value) for stage, value in sorted(self._in_flight.items())],
+            )
+            lines += format_metric(
+                "mcp_agent_stage_errors_total",
+                "counter",
+                "Pipeline stages that raised an exception.",
+                [({"stage": stage, "error": error}, value) for (stage, error), value in sorted(self._errors.items())],
+            )
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                lines += collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector!r} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+class Span:
+    """One timed pipeline stage."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start", "end", "status")
+
+    def __init__(self, name: str, trace_id: int, span_id: int, parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.monotonic()
+        self.end: Optional[float] = None
+        self.status = "ok"
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.monotonic()) - self.start
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __repr__(self) -> str:
+        attributes = " ".join(f"{key}={value}" for key, value in self.attributes.items())
+        return f"<Span {self.name} {self.duration * 1000:.1f}ms {self.status} {attributes}>"
+
+
+registry = MetricsRegistry()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_ids = itertools.count(1)
+finished_spans: Deque[Span] = deque(maxlen=FINISHED_SPANS_KEPT)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def span(name: str, *, activate: bool = True, **attributes: Any) -> Iterator[Span]:
+    """
+    Times the enclosed block as a pipeline stage (works in sync code, coroutines and worker threads).
+
+    Args:
+        name: Stage name, also the `stage` label of the metrics, e.g. "llm.flowchart".
+        activate: Makes the span the current one inside the block, so nested spans become its
+            children. Pass False if the block yields (async generators), since the consumer runs in
+            the same context between iterations; the parent is still taken from the current span.
+        **attributes: Span attributes, e.g. `use_case_id=3`.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        attributes = {**{k: v for k, v in parent.attributes.items() if k in INHERITED_ATTRIBUTES}, **attributes}
+    span_id = next(_ids)
+    current = Span(
+        name, parent.trace_id if parent else span_id, span_id, parent.span_id if parent else None, attributes
+    )
+    token = _current_span.set(current) if activate else None
+    registry.add_in_flight(name, 1)
+    with contextlib.ExitStack() as stack:
+        if otel_trace is not None:
+            otel_attributes = {key: value for key, value in attributes.items() if isinstance(value, (str, int, float))}
+            tracer = otel_trace.get_tracer(__name__)
+            if activate:
+                stack.enter_context(tracer.start_as_current_span(name, attributes=otel_attributes))
+            else:
+                stack.callback(tracer.start_span(name, attributes=otel_attributes).end)
+        try:
+            yield current
+        except (asyncio.CancelledError, GeneratorExit):
+            current.status = "cancelled"
+            raise
+        except BaseException as e:
+            current.status = "error"
+            registry.count_error(name, type(e).__name__)
+            raise
+        finally:
+            current.end = time.monotonic()
+            registry.add_in_flight(name, -1)
+            registry.observe(name, current.duration)
+            finished_spans.append(current)
+            if token is not None:
+                with contextlib.suppress(ValueError):  # Ended in another context
+                    _current_span.reset(token)
+            logger.debug(f"trace={current.trace_id} parent={current.parent_id} {current!r}")
+
+
+def render_metrics() -> str:
+    """Returns all metrics in the Prometheus text format."""
+    return registry.render()
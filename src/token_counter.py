@@ -0,0 +1,104 @@
+"""
+Local token counting for prompt budgeting.
+
+Uses tiktoken with the model's encoding when it is installed and the encoding can be loaded;
+otherwise falls back to an estimate based on the same pre-tokenization pieces (words, numbers,
+punctuation runs, whitespace), which tends to err on the high side, so budgets still hold.
+
+tiktoken downloads an encoding's BPE file on first use, so the entry points load the counters of
+their models at startup with `load_token_counters()`, in a worker thread, instead of stalling the
+event loop on the first request.
+"""
+
+import asyncio
+import functools
+import logging
+import re
+from typing import Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+
+_token_counters: Dict[str, "TokenCounter"] = {}
+_fallback_warned = False
+
+# Mirrors the pre-tokenization of OpenAI's BPE encodings closely enough for estimates.
+_PIECE_RE = re.compile(r"""'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+""")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the token count of `text` without a tokenizer."""
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        stripped = piece.lstrip(" ")
+        if not stripped or stripped.isspace():
+            tokens += 1
+        elif stripped[0].isalpha():
+            # Common words are a single token; long or rare words split into several.
+            tokens += 1 + len(stripped) // 8
+        elif stripped[0].isdigit():
+            tokens += 1
+        else:
+            tokens += (len(stripped) + 1) // 2
+    return tokens
+
+
+class TokenCounter:
+    """
+    Counts tokens for a model with tiktoken, or estimates them if tiktoken is unavailable.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._encoding = None
+        try:
+            import tiktoken
+
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+        except Exception as e:  # Not installed, or the encoding file cannot be downloaded
+            global _fallback_warned
+            message = f"tiktoken unavailable for {model} ({type(e).__name__}: {e}), estimating token counts."
+            if not _fallback_warned:
+                _fallback_warned = True
+                logger.warning(message)
+            else:
+                logger.info(message)
+
+    @property
+    def name(self) -> str:
+        """The tokenizer in use, e.g. "o200k_base" or "estimate"."""
+        return self._encoding.name if self._encoding is not None else "estimate"
+
+    @functools.lru_cache(maxsize=32768)
+    def count(self, text: str) -> int:
+        """Returns the number of tokens of `text` (memoized, catalog lines repeat across prompts)."""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return estimate_tokens(text)
+
+
+def get_token_counter(model: str) -> TokenCounter:
+    """Returns the shared TokenCounter for a model, creating it (which may download its encoding) on first use."""
+    counter = _token_counters.get(model)
+    if counter is None:
+        counter = _token_counters.setdefault(model, TokenCounter(model))
+    return counter
+
+
+async def load_token_counter(model: str) -> TokenCounter:
+    """Like `get_token_counter`, but creates a missing counter in a worker thread, off the event loop."""
+    counter = _token_counters.get(model)
+    if counter is None:
+        counter = await asyncio.to_thread(get_token_counter, model)
+    return counter
+
+
+async def load_token_counters(models: Iterable[str]):
+    """Loads the counters of `models` at startup, so that no request waits for an encoding download."""
+    counters = await asyncio.gather(*(load_token_counter(model) for model in set(models)))
+    for counter in counters:
+        logger.info(f"Token counter for {counter.model}: {counter.name}")
@@ -7,12 +7,16 @@ It leverages OpenAI's JSON mode for structured output.
 """
 
 import logging
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
-from openai import OpenAI
-from pydantic import BaseModel
+from openai import AsyncOpenAI, OpenAI
+from pydantic import BaseModel, Field
 
-from src.config import configure_logging, get_llm_api_key
+from src.config import FUSED_GENERATION_ENABLED, configure_logging, get_llm_api_key
+from src.flowchart_generator import SYSTEM_PROMPT as FLOWCHART_SYSTEM_PROMPT
+from src.flowchart_generator import FlowchartResponse, is_valid_mermaid_flowchart
+from src.http_pool import LLM_TIMEOUT, get_http_client
+from src.llm_client import StreamUpdate, parse_structured, parse_structured_async, stream_structured_async
 
 # Configure logging if this module is run directly (for testing)
 if __name__ != "__main__":  # Only configure if not main, main.py will configure
@@ -45,10 +49,54 @@ class UseCaseResponse(BaseModel):
     reply: str
 
 
+class UseCaseWithFlowchart(UseCase):
+    """
+    A use case together with its Mermaid flowchart, as returned in fused mode.
+    """
+
+    flowchart_mermaid_code: str = Field(
+        ..., description="The Mermaid code (in a ```mermaid block) representing the flowchart for the use case."
+    )
+
+
+class FusedUseCaseResponse(BaseModel):
+    """
+    Represents the fused JSON structure from the LLM: all use cases with their flowcharts in one response.
+    """
+
+    use_cases: List[UseCaseWithFlowchart]
+    reply: str
+
+    def split(self) -> Tuple[UseCaseResponse, Dict[int, FlowchartResponse]]:
+        """
+        Splits the fused response into the regular use case response and the valid flowcharts by use case ID.
+        Use cases with a missing or invalid flowchart have no entry in the flowchart dict.
+        """
+        use_cases = [UseCase(id=uc.id, title=uc.title, description=uc.description) for uc in self.use_cases]
+        flowcharts = {
+            uc.id: FlowchartResponse(flowchart_mermaid_code=uc.flowchart_mermaid_code, reply="")
+            for uc in self.use_cases
+            if is_valid_mermaid_flowchart(uc.flowchart_mermaid_code)
+        }
+        return UseCaseResponse(use_cases=use_cases, reply=self.reply), flowcharts
+
+
 # --- UseCaseGenerator Class ---
 
 MODEL_NAME = "gpt-4.1"
 
+# This is a placeholder prompt. Significant prompt engineering will be needed.
+SYSTEM_PROMPT = (
+    "You are an expert product analyst. Your task is to identify and extract distinct "
+    "use cases from the provided product requirements. For each use case, provide a concise "
+    "title and a brief description."
+)
+
+FUSED_SYSTEM_PROMPT = f"""{SYSTEM_PROMPT}
+
+In addition, for every use case generate its Mermaid flowchart (flowchart_mermaid_code) following these instructions:
+{FLOWCHART_SYSTEM_PROMPT}"""
+
 
 class UseCaseGenerator:
     """
@@ -64,11 +112,42 @@ class UseCaseGenerator:
             logger.error("OpenAI API key not found. Please set it in the .env file.")
             # In a real application, this might raise an exception or have a clearer startup failure.
             self.client = None
+            self.async_client = None
         else:
-            self.client = OpenAI(api_key=self.api_key)
+            self.client = OpenAI(api_key=self.api_key, timeout=LLM_TIMEOUT, max_retries=0)
+            self.async_client = AsyncOpenAI(
+                api_key=self.api_key, http_client=get_http_client(), timeout=LLM_TIMEOUT, max_retries=0
+            )
         self.model_name = MODEL_NAME
         logger.info("UseCaseGenerator initialized.")
 
+    def _build_input(self, requirements_text: str) -> List[dict]:
+        """Builds the system and user messages for the use case generation request."""
+        user_prompt = f"Here are the product requirements:\n\n{requirements_text}"
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    @staticmethod
+    def _build_fused_input(requirements_text: str) -> List[dict]:
+        """Builds the system and user messages for the fused use case and flowchart request."""
+        user_prompt = f"Here are the product requirements:\n\n{requirements_text}"
+        return [
+            {"role": "system", "content": FUSED_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _can_generate(self, client, requirements_text: str) -> bool:
+        if not client:
+            logger.error("OpenAI client not initialized due to missing API key.")
+            return False
+
+        if not requirements_text.strip():
+            logger.warning("Requirements text is empty. Cannot generate use cases.")
+            return False
+        return True
+
     def generate_use_cases(self, requirements_text: str) -> Optional[UseCaseResponse]:
         """
         Generates use cases from the given requirements text using OpenAI's chat completions.
@@ -79,34 +158,18 @@ class UseCaseGenerator:
         Returns:
             A UseCaseResponse object containing the list of use cases, or None if an error occurs.
         """
-        if not self.client:
-            logger.error("OpenAI client not initialized due to missing API key.")
-            return None
-
-        if not requirements_text.strip():
-            logger.warning("Requirements text is empty. Cannot generate use cases.")
+        if not self._can_generate(self.client, requirements_text):
             return None
 
-        # This is a placeholder prompt. Significant prompt engineering will be needed.
-        system_prompt = (
-            "You are an expert product analyst. Your task is to identify and extract distinct "
-            "use cases from the provided product requirements. For each use case, provide a concise "
-            "title and a brief description."
-        )
-        user_prompt = f"Here are the product requirements:\n\n{requirements_text}"
-
         try:
             logger.info("Sending request to OpenAI API for use case generation...")
-            response = self.client.responses.parse(
+            parsed_response = parse_structured(
+                self.client,
                 model=self.model_name,
-                input=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
+                input=self._build_input(requirements_text),
                 text_format=UseCaseResponse,
+                stage="use_cases",
             )
-
-            parsed_response = response.output_parsed
             return parsed_response
 
         except Exception as e:
@@ -114,6 +177,143 @@ class UseCaseGenerator:
             response = UseCaseResponse(use_cases=[], reply="Sorry, I couldn't generate use cases for this.")
             return response
 
+    async def generate_use_cases_async(self, requirements_text: str) -> Optional[UseCaseResponse]:
+        """
+        Async version of `generate_use_cases` that does not block the event loop,
+        so several LLM requests can be in flight at once.
+
+        Args:
+            requirements_text: The cleaned product requirements text.
+
+        Returns:
+            A UseCaseResponse object containing the list of use cases, or None if an error occurs.
+        """
+        if not self._can_generate(self.async_client, requirements_text):
+            return None
+
+        try:
+            logger.info("Sending async request to OpenAI API for use case generation...")
+            return await parse_structured_async(
+                self.async_client,
+                model=self.model_name,
+                input=self._build_input(requirements_text),
+                text_format=UseCaseResponse,
+                stage="use_cases",
+            )
+
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while calling OpenAI API: {e}")
+            return UseCaseResponse(use_cases=[], reply="Sorry, I couldn't generate use cases for this.")
+
+    async def generate_use_cases_with_flowcharts_async(self, requirements_text: str) -> Optional[FusedUseCaseResponse]:
+        """
+        Generates the use cases and their Mermaid flowcharts in a single LLM call (fused mode).
+
+        Args:
+            requirements_text: The cleaned product requirements text.
+
+        Returns:
+            A FusedUseCaseResponse object, or None if the request failed (callers fall back to
+            `generate_use_cases_async` plus one flowchart call per use case).
+        """
+        if not self._can_generate(self.async_client, requirements_text):
+            return None
+
+        try:
+            logger.info("Sending async request to OpenAI API for fused use case and flowchart generation...")
+            return await parse_structured_async(
+                self.async_client,
+                model=self.model_name,
+                input=self._build_fused_input(requirements_text),
+                text_format=FusedUseCaseResponse,
+                stage="use_cases_fused",
+            )
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while calling OpenAI API in fused mode: {e}")
+            return None
+
+    async def stream_use_cases_async(self, requirements_text: str, fused: bool = False) -> AsyncIterator[StreamUpdate]:
+        """
+        Streaming version of `generate_use_cases_async` (or, if `fused`, of
+        `generate_use_cases_with_flowcharts_async`).
+
+        Args:
+            requirements_text: The cleaned product requirements text.
+            fused: Whether to request the flowcharts in the same call.
+
+        Yields:
+            Updates whose `partial` holds the use cases decoded so far (dicts, the last one possibly
+            incomplete). The final update's `parsed` is the response; if the request failed it is
+            None in fused mode and an apology UseCaseResponse otherwise, as in the non-streaming methods.
+        """
+        failed = (
+            None if fused else UseCaseResponse(use_cases=[], reply="Sorry, I couldn't generate use cases for this.")
+        )
+        if not self._can_generate(self.async_client, requirements_text):
+            yield StreamUpdate(None, None)
+            return
+
+        try:
+            logger.info(f"Streaming use case generation from OpenAI API{' (fused)' if fused else ''}...")
+            async for update in stream_structured_async(
+                self.async_client,
+                model=self.model_name,
+                input=self._build_fused_input(requirements_text) if fused else self._build_input(requirements_text),
+                text_format=FusedUseCaseResponse if fused else UseCaseResponse,
+                stage="use_cases_fused" if fused else "use_cases",
+            ):
+                yield update
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while streaming from OpenAI API: {e}")
+            yield StreamUpdate(None, failed)
+
+
+def split_use_case_response(
+    response: Union[UseCaseResponse, FusedUseCaseResponse],
+) -> Optional[Tuple[UseCaseResponse, Dict[int, FlowchartResponse]]]:
+    """
+    Returns the use cases and the flowcharts that came with them by use case ID (none outside fused
+    mode), or None if a fused response is unusable (no use cases or duplicate IDs).
+    """
+    if not isinstance(response, FusedUseCaseResponse):
+        return response, {}
+    ids = [uc.id for uc in response.use_cases]
+    if not ids or len(set(ids)) != len(ids):
+        logger.warning("Fused response is unusable: no use cases or duplicate use case IDs.")
+        return None
+    use_cases_response, flowcharts = response.split()
+    if len(flowcharts) < len(ids):
+        logger.warning(
+            f"Fused response is missing valid flowcharts for {len(ids) - len(flowcharts)} of {len(ids)} "
+            f"use cases; they will be generated separately."
+        )
+    return use_cases_response, flowcharts
+
+
+async def generate_use_cases_and_flowcharts(
+    use_case_generator: UseCaseGenerator, requirements_text: str, fused: Optional[bool] = None
+) -> Tuple[Optional[UseCaseResponse], Dict[int, FlowchartResponse]]:
+    """
+    Generates the use cases and, in fused mode, their flowcharts in the same LLM call.
+
+    Args:
+        use_case_generator: The generator to use.
+        requirements_text: The cleaned product requirements text.
+        fused: Whether to use fused mode; defaults to FUSED_GENERATION_ENABLED.
+
+    Returns:
+        The use case response and the flowcharts generated along with it by use case ID. Use cases
+        without an entry (all of them outside fused mode) need a separate flowchart call. If the
+        fused response is unusable, the regular use case generation is used instead.
+    """
+    if FUSED_GENERATION_ENABLED if fused is None else fused:
+        fused_response = await use_case_generator.generate_use_cases_with_flowcharts_async(requirements_text)
+        result = split_use_case_response(fused_response) if fused_response else None
+        if result is not None:
+            return result
+        logger.warning("Fused generation failed; falling back to separate use case and flowchart calls.")
+    return await use_case_generator.generate_use_cases_async(requirements_text), {}
+
 
 if __name__ == "__main__":
     # This is a basic test. Requires OPENAI_API_KEY in .env
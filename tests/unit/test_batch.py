@@ -0,0 +1,110 @@
+"""
+Unit tests for the MCP-Agent batch CLI.
+"""
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+from src.batch import BatchProcessor, load_checkpoint, parse_args, read_documents, run_batch
+from src.flowchart_generator import FlowchartResponse
+from src.search_engine.search_manager import SearchResponse, SourceResult
+from src.use_case_generator import UseCase, UseCaseResponse
+
+
+def _make_processor(calls, fail_on=(), source_status="ok"):
+    async def generate_use_cases_async(requirements_text):
+        calls.append(requirements_text)
+        if requirements_text in fail_on:
+            raise RuntimeError("LLM unavailable")
+        await asyncio.sleep(0.01)
+        return UseCaseResponse(
+            use_cases=[UseCase(id=1, title=f"UC {requirements_text}", description="Description")], reply="ok"
+        )
+
+    async def generate_flowchart_async(description):
+        return FlowchartResponse(flowchart_mermaid_code="graph TD\n A --> B", reply="chart")
+
+    async def search_detailed(query):
+        if source_status != "ok":
+            source = SourceResult(source_name="GitHub", status=source_status, elapsed_seconds=1.0, error="boom")
+            return SearchResponse(results=[], sources=[source])
+        results = [{"name": "server", "url": "https://github.com/a/b"}]
+        source = SourceResult(source_name="GitHub", status="ok", results=results, elapsed_seconds=0.1)
+        return SearchResponse(results=results, sources=[source])
+
+    use_case_generator = MagicMock(generate_use_cases_async=generate_use_cases_async)
+    flowchart_generator = MagicMock(generate_flowchart_async=generate_flowchart_async)
+    return BatchProcessor(use_case_generator, flowchart_generator, MagicMock(search_detailed=search_detailed))
+
+
+def _read_ndjson(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_read_documents_from_jsonl_and_directory(tmp_path):
+    jsonl = tmp_path / "docs.jsonl"
+    jsonl.write_text('{"id": "a", "text": "First"}\n\nnot json\n{"requirements": "Second"}\n', encoding="utf-8")
+    assert list(read_documents(str(jsonl))) == [("a", "First"), ("4", "Second")]
+
+    directory = tmp_path / "docs"
+    (directory / "sub").mkdir(parents=True)
+    (directory / "b.md").write_text("B", encoding="utf-8")
+    (directory / "sub" / "c.txt").write_text("C", encoding="utf-8")
+    (directory / "ignored.json").write_text("{}", encoding="utf-8")
+    assert list(read_documents(str(directory))) == [("b.md", "B"), ("sub/c.txt", "C")]
+
+
+def test_run_batch_writes_results_and_resumes_from_checkpoint(tmp_path):
+    output = tmp_path / "out" / "results.ndjson"
+    checkpoint = tmp_path / "out" / "results.ndjson.checkpoint"
+    documents = [(f"doc{i}", f"Requirements {i}") for i in range(5)]
+
+    calls = []
+    processor = _make_processor(calls, fail_on={"Requirements 3"})
+    counts = asyncio.run(run_batch(iter(documents), processor, str(output), str(checkpoint), document_concurrency=3))
+
+    assert counts == {"ok": 4, "partial": 0, "error": 1, "skipped": 0}
+    records = {record["id"]: record for record in _read_ndjson(output)}
+    assert records["doc3"]["status"] == "error" and "LLM unavailable" in records["doc3"]["error"]
+    assert records["doc0"]["status"] == "ok"
+    assert records["doc0"]["use_cases"][0]["flowchart"]["flowchart_mermaid_code"].startswith("graph TD")
+    assert records["doc0"]["use_cases"][0]["mcps"] == [{"name": "server", "url": "https://github.com/a/b"}]
+    # Failed documents are not checkpointed, so they are retried on the next run.
+    assert load_checkpoint(str(checkpoint)) == {"doc0", "doc1", "doc2", "doc4"}
+
+    calls.clear()
+    processor = _make_processor(calls)
+    counts = asyncio.run(run_batch(iter(documents), processor, str(output), str(checkpoint)))
+
+    assert counts == {"ok": 1, "partial": 0, "error": 0, "skipped": 4}
+    assert calls == ["Requirements 3"]
+    assert [record["status"] for record in _read_ndjson(output) if record["id"] == "doc3"] == ["error", "ok"]
+    assert len(load_checkpoint(str(checkpoint))) == 5
+
+
+def test_documents_whose_searches_all_failed_are_not_checkpointed(tmp_path):
+    output = tmp_path / "results.ndjson"
+    checkpoint = tmp_path / "results.ndjson.checkpoint"
+    documents = [("doc0", "Requirements 0")]
+
+    processor = _make_processor([], source_status="timeout")
+    counts = asyncio.run(run_batch(iter(documents), processor, str(output), str(checkpoint)))
+
+    assert counts == {"ok": 0, "partial": 0, "error": 1, "skipped": 0}
+    [record] = _read_ndjson(output)
+    assert record["status"] == "error" and "search failed" in record["error"]
+    assert record["use_cases"][0]["sources"] == [{"source_name": "GitHub", "status": "timeout", "error": "boom"}]
+    assert load_checkpoint(str(checkpoint)) == set()
+
+    # The next run retries the document.
+    counts = asyncio.run(run_batch(iter(documents), _make_processor([]), str(output), str(checkpoint)))
+    assert counts == {"ok": 1, "partial": 0, "error": 0, "skipped": 0}
+    assert load_checkpoint(str(checkpoint)) == {"doc0"}
+
+
+def test_parse_args_defaults_checkpoint_to_none():
+    args = parse_args(["--input", "docs.jsonl", "--output", "results.ndjson", "--llm-concurrency", "4"])
+    assert args.checkpoint is None
+    assert args.llm_concurrency == 4
@@ -0,0 +1,62 @@
+"""
+Unit tests for the BM25 shortlist over the MCP catalog.
+"""
+
+from src.search_engine.bm25_index import BM25Index, tokenize
+from src.search_engine.catalog import CatalogEntry, CatalogIndex
+
+
+def _catalog():
+    entries = [
+        CatalogEntry(
+            name="Slack",
+            url="https://github.com/a/slack",
+            description="Send and read Slack channel messages.",
+            category="Communication",
+            sources=["x/list"],
+        ),
+        CatalogEntry(
+            name="Postgres",
+            url="https://github.com/a/pg",
+            description="Read-only database access with schema inspection.",
+            category="Databases",
+            sources=["x/list"],
+        ),
+        CatalogEntry(
+            name="Weather",
+            url="https://github.com/a/weather",
+            description="Current weather forecasts.",
+            category="Location Services",
+            sources=["x/list"],
+        ),
+    ]
+    return CatalogIndex(entries, {"x/list": "hash"})
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("The MCP server sends Messages to databases") == ["send", "message", "database"]
+
+
+def test_top_k_ranks_matching_entries_first():
+    index = BM25Index.build(_catalog())
+
+    hits = index.top_k("Notify the team in a Slack channel when the database changes", k=2)
+
+    assert [doc_id for doc_id, _ in hits] == [0, 1]
+    assert hits[0][1] > hits[1][1] > 0
+    assert index.top_k("quantum chromodynamics", k=5) == []
+
+
+def test_load_or_build_rebuilds_for_new_catalog_version(tmp_path):
+    index_path = str(tmp_path / "bm25_index.json")
+    catalog = _catalog()
+    index = BM25Index.load_or_build(catalog, index_path)
+
+    loaded = BM25Index.load(index_path)
+    assert loaded is not None
+    assert loaded.top_k("weather forecast", k=1) == index.top_k("weather forecast", k=1)
+    assert not list(tmp_path.glob("*.tmp"))
+
+    catalog.readme_hashes = {"x/list": "new-hash"}
+    rebuilt = BM25Index.load_or_build(catalog, index_path)
+    assert rebuilt.catalog_fingerprint == catalog.fingerprint != index.catalog_fingerprint
@@ -0,0 +1,76 @@
+"""
+Unit tests for the MCP catalog ingestion and on-disk index.
+"""
+
+from src.search_engine.catalog import CatalogIndex, parse_catalog_entries
+
+SAMPLE_README = """
+# Awesome MCP Servers
+
+## Clients
+
+- [Some Client](https://github.com/example/client) - Not a server.
+
+## Server Implementations
+
+### 🗄️ <a name="databases"></a>Databases
+
+* [acme/pg-mcp](https://github.com/acme/pg-mcp) 🐍 🏠 - PostgreSQL access with schema inspection.
+* <img src="logo.png"/> **[SQLite](src/sqlite)** - Local SQLite database operations.
+* [Jump to top](#top)
+
+## Frameworks
+
+- [FastMCP](https://github.com/example/fastmcp) - A framework.
+"""
+
+
+def test_parse_catalog_entries_scopes_to_section_and_extracts_fields():
+    """
+    Only list items under the keyword section are parsed, with category, URL and description.
+    """
+    entries = parse_catalog_entries(SAMPLE_README, "owner/list", "Server Implementations")
+
+    assert [entry.name for entry in entries] == ["acme/pg-mcp", "SQLite"]
+    assert entries[0].url == "https://github.com/acme/pg-mcp"
+    assert entries[0].description == "PostgreSQL access with schema inspection."
+    assert entries[0].category == "Databases"
+    assert entries[0].sources == ["owner/list"]
+    # Relative links are resolved against the README's repository.
+    assert entries[1].url == "https://github.com/owner/list/tree/main/src/sqlite"
+
+
+def test_build_merges_servers_listed_in_several_readmes():
+    """
+    A server listed by two READMEs becomes a single entry with both sources.
+    """
+    other_readme = "# Servers\n\n- [PG](https://github.com/acme/pg-mcp/) - Postgres server.\n"
+    catalog = CatalogIndex.build({"owner/list": SAMPLE_README, "other/list": other_readme})
+
+    pg_entries = [entry for entry in catalog.entries if "pg-mcp" in entry.url]
+    assert len(pg_entries) == 1
+    assert pg_entries[0].sources == ["owner/list", "other/list"]
+    assert [entry.name for entry in catalog.entries_for_source("other/list")] == []
+
+
+def test_load_or_build_reuses_index_until_readme_changes(tmp_path):
+    """
+    The on-disk index is reused while README hashes match and rebuilt once a README changes.
+    """
+    readme_path = tmp_path / "readme.md"
+    readme_path.write_text("# Servers\n\n- [One](https://github.com/a/one) - First.\n", encoding="utf-8")
+    index_path = str(tmp_path / "index" / "catalog_index.json")
+    readme_paths = {"a/list": str(readme_path)}
+
+    first = CatalogIndex.load_or_build(readme_paths, index_path)
+    assert [entry.name for entry in first.entries] == ["One"]
+
+    loaded = CatalogIndex.load(index_path)
+    assert loaded is not None
+    assert loaded.readme_hashes == first.readme_hashes
+    assert not list((tmp_path / "index").glob("*.tmp"))
+
+    readme_path.write_text("# Servers\n\n- [Two](https://github.com/a/two) - Second.\n", encoding="utf-8")
+    rebuilt = CatalogIndex.load_or_build(readme_paths, index_path)
+    assert [entry.name for entry in rebuilt.entries] == ["Two"]
+    assert rebuilt.fingerprint != first.fingerprint
@@ -0,0 +1,43 @@
+"""
+Unit tests for the validation of configuration values.
+"""
+
+import importlib
+from unittest.mock import patch
+
+import pytest
+
+import src.config
+from src.search_engine.sources.github_source import GitHubSource
+
+
+@pytest.fixture
+def reload_config(monkeypatch):
+    """Reloads src.config with the given environment (without the local .env) and restores it afterwards."""
+
+    def reload(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        with patch("dotenv.load_dotenv"):
+            return importlib.reload(src.config)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(src.config)
+
+
+def test_invalid_retrieval_mode_falls_back_to_bm25_with_a_warning(reload_config, caplog):
+    config = reload_config(GITHUB_RETRIEVAL_MODE="bm-25", GITHUB_SHORTLIST_K="sixty")
+
+    assert config.GITHUB_RETRIEVAL_MODE == "bm25"
+    assert config.GITHUB_SHORTLIST_K == 60
+    assert "Invalid value for GITHUB_RETRIEVAL_MODE: 'bm-25'" in caplog.text
+
+
+def test_valid_retrieval_mode_is_normalized(reload_config):
+    assert reload_config(GITHUB_RETRIEVAL_MODE=" Dense ").GITHUB_RETRIEVAL_MODE == "dense"
+
+
+def test_github_source_rejects_an_unknown_retrieval_mode():
+    with pytest.raises(ValueError, match="Unknown retrieval mode 'bm-25'"):
+        GitHubSource(retrieval_mode="bm-25")
@@ -0,0 +1,67 @@
+"""
+Unit tests for the hashed n-gram dense index over the MCP catalog.
+"""
+
+import numpy as np
+
+from src.search_engine.catalog import CatalogEntry, CatalogIndex
+from src.search_engine.dense_index import DenseIndex
+
+
+def _catalog():
+    descriptions = {
+        "Google Sheets": "Read and write Google Sheets data.",
+        "Slack": "Send and read Slack channel messages.",
+        "Weather": "Current weather forecasts.",
+    }
+    entries = [
+        CatalogEntry(name=name, url=f"https://github.com/a/{i}", description=desc, category="", sources=["x/list"])
+        for i, (name, desc) in enumerate(descriptions.items())
+    ]
+    return CatalogIndex(entries, {"x/list": "hash"})
+
+
+def test_top_k_matches_paraphrases_through_character_ngrams():
+    index = DenseIndex.build(_catalog())
+
+    hits = index.top_k("update rows in a spreadsheet", k=1)
+
+    assert hits[0][0] == 0
+
+
+def test_saved_index_is_memory_mapped(tmp_path):
+    catalog = _catalog()
+    index = DenseIndex.build(catalog, dim=256)
+    index.save(str(tmp_path))
+
+    loaded = DenseIndex.load_or_build(catalog, str(tmp_path))
+
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert loaded.top_k("slack message", k=3) == index.top_k("slack message", k=3)
+
+
+def test_load_never_mixes_the_matrix_and_metadata_of_two_saves(tmp_path):
+    catalog = _catalog()
+    old = DenseIndex.build(catalog, dim=256)
+    old.save(str(tmp_path))
+    new = DenseIndex.build(CatalogIndex(catalog.entries[:2], {"x/list": "hash2"}), dim=256)
+
+    # A save interrupted after writing its matrix leaves the previous index intact.
+    np.save(tmp_path / f"dense_embeddings.{new.content_hash()}.npy", new.embeddings)
+    loaded = DenseIndex.load(str(tmp_path))
+    assert loaded.catalog_fingerprint == catalog.fingerprint
+    assert loaded.embeddings.shape == old.embeddings.shape
+
+    # A completed save publishes the new pair and removes the old matrices.
+    new.save(str(tmp_path))
+    loaded = DenseIndex.load(str(tmp_path))
+    assert loaded.embeddings.shape == new.embeddings.shape
+    assert sorted(p.name for p in tmp_path.glob("*.npy")) == [f"dense_embeddings.{new.content_hash()}.npy"]
+
+
+def test_load_rejects_a_matrix_that_does_not_match_its_metadata(tmp_path):
+    index = DenseIndex.build(_catalog(), dim=256)
+    index.save(str(tmp_path))
+    np.save(tmp_path / f"dense_embeddings.{index.content_hash()}.npy", index.embeddings[:1])
+
+    assert DenseIndex.load(str(tmp_path)) is None
@@ -0,0 +1,63 @@
+"""
+Unit tests for batched GitHub star enrichment.
+"""
+
+import asyncio
+import json
+
+import httpx
+
+from src.search_engine.github_stars import GitHubStarsClient, parse_github_repo_id
+
+
+def test_parse_github_repo_id():
+    assert parse_github_repo_id("https://github.com/x/y/tree/main/src/z") == "x/y"
+    assert parse_github_repo_id("https://www.github.com/x/y.git") == "x/y"
+    assert parse_github_repo_id("https://mcp.pipedream.com/app/slack") is None
+
+
+def _client(handler, token="token"):
+    http_client = httpx.AsyncClient(base_url="https://api.github.com", transport=httpx.MockTransport(handler))
+    return GitHubStarsClient(token, http_client=http_client)
+
+
+def test_get_stars_batches_into_one_graphql_query_and_caches():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        variables = json.loads(request.content)["variables"]
+        data = {"r0": {"stargazerCount": 10}, "r1": None}
+        assert variables == {"o0": "a", "n0": "one", "o1": "b", "n1": "missing"}
+        return httpx.Response(200, json={"data": data})
+
+    client = _client(handler)
+
+    async def run():
+        first = await client.get_stars(["a/one", "b/missing", "a/one"])
+        second = await client.get_stars(["a/one", "b/missing"])
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == {"a/one": 10, "b/missing": None}
+    assert second == first
+    assert len(requests) == 1
+    assert requests[0].url.path == "/graphql"
+
+
+def test_get_stars_falls_back_to_concurrent_rest_calls():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/graphql":
+            return httpx.Response(502)
+        if request.url.path == "/repos/a/one":
+            return httpx.Response(200, json={"stargazers_count": 5})
+        return httpx.Response(500)
+
+    client = _client(handler)
+    stars = asyncio.run(client.get_stars(["a/one", "a/flaky"]))
+
+    assert stars == {"a/one": 5, "a/flaky": None}
+    # The transient failure is not cached, the successful lookup is.
+    assert client.cache.get("a/flaky") == (False, None)
+    assert client.cache.get("a/one") == (True, 5)
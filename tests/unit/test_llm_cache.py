@@ -0,0 +1,74 @@
+"""
+Unit tests for the persistent LLM response cache.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from src.llm_cache import LLMResponseCache, make_cache_key
+from src.llm_client import parse_structured
+from src.use_case_generator import UseCase, UseCaseResponse
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "user"}]
+
+
+def test_cache_key_depends_on_prompts_schema_and_options():
+    key = make_cache_key("gpt-4.1", MESSAGES, UseCaseResponse)
+
+    assert key == make_cache_key("gpt-4.1", list(MESSAGES), UseCaseResponse)
+    assert key != make_cache_key("gpt-4.1-mini", MESSAGES, UseCaseResponse)
+    assert key != make_cache_key("gpt-4.1", MESSAGES, UseCase)
+    assert key != make_cache_key("gpt-4.1", MESSAGES, UseCaseResponse, temperature=0.0)
+
+
+def test_get_set_counts_hits_and_misses(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_entries=10)
+
+    assert cache.get("k") is None
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+@patch("src.llm_cache.time.time")
+def test_entries_expire_after_ttl(mock_time, tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_entries=10)
+    mock_time.return_value = 1000.0
+    cache.set("k", "v")
+
+    mock_time.return_value = 1061.0
+    assert cache.get("k") is None
+
+
+@patch("src.llm_cache.time.time")
+def test_least_recently_used_entries_are_evicted(mock_time, tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=3600, max_entries=2)
+    mock_time.return_value = 1.0
+    cache.set("a", "1")
+    mock_time.return_value = 2.0
+    cache.set("b", "2")
+    mock_time.return_value = 3.0
+    cache.get("a")  # "b" is now the least recently used entry
+    mock_time.return_value = 4.0
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_parse_structured_returns_cached_model_without_calling_openai(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_entries=10)
+    client = MagicMock()
+    client.responses.parse.return_value.output_parsed = UseCaseResponse(
+        use_cases=[UseCase(id=1, title="Login", description="Users log in.")], reply="ok"
+    )
+
+    with patch("src.llm_client.get_llm_cache", return_value=cache):
+        first = parse_structured(client, model="gpt-4.1", input=MESSAGES, text_format=UseCaseResponse)
+        second = parse_structured(client, model="gpt-4.1", input=MESSAGES, text_format=UseCaseResponse)
+
+    assert first == second
+    assert isinstance(second, UseCaseResponse)
+    client.responses.parse.assert_called_once()
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,151 @@
+"""
+Unit tests for the retry, hedging and streaming behavior of the shared LLM client helpers.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import openai
+import pytest
+
+from src.llm_client import (
+    RequestPolicy,
+    get_llm_stats,
+    get_stage_stats,
+    parse_structured_async,
+    set_stage_policy,
+    stream_structured_async,
+)
+from src.rate_limiter import AdaptiveRateLimiter
+from src.use_case_generator import UseCase, UseCaseResponse
+
+
+def _parse(client, stage):
+    with patch("src.llm_client.get_rate_limiter", return_value=AdaptiveRateLimiter()), patch(
+        "src.llm_client.get_llm_cache", return_value=None
+    ):
+        return asyncio.run(parse_structured_async(client, model="m", input=[], text_format=MagicMock(), stage=stage))
+
+
+def test_slow_request_is_hedged_and_the_loser_cancelled():
+    stage = "test_hedge"
+    set_stage_policy(stage, RequestPolicy(hedge=True, hedge_min_delay=0.0))
+    get_stage_stats(stage).latencies.extend([0.01] * 30)
+    cancelled = []
+
+    async def parse(**request):
+        if client.responses.parse.await_count == 1:
+            try:
+                await asyncio.sleep(5)  # The slow primary request
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return MagicMock(output_parsed="hedged")
+
+    client = MagicMock()
+    client.responses.parse = AsyncMock(side_effect=parse)
+
+    assert _parse(client, stage) == "hedged"
+    assert client.responses.parse.await_count == 2
+    assert cancelled == [True]
+    stats = get_llm_stats()[stage]
+    assert stats["hedges_fired"] == 1 and stats["hedges_won"] == 1
+
+
+def test_no_hedge_without_latency_samples():
+    stage = "test_no_samples"
+    set_stage_policy(stage, RequestPolicy(hedge=True, hedge_min_delay=0.0))
+    client = MagicMock()
+    client.responses.parse = AsyncMock(return_value=MagicMock(output_parsed="ok"))
+
+    assert _parse(client, stage) == "ok"
+    assert client.responses.parse.await_count == 1
+    assert get_llm_stats()[stage]["hedges_fired"] == 0
+
+
+def test_transient_errors_are_retried():
+    stage = "test_retry"
+    set_stage_policy(stage, RequestPolicy(max_retries=2, retry_base_delay=0.0))
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    client = MagicMock()
+    client.responses.parse = AsyncMock(
+        side_effect=[openai.APIConnectionError(request=request), MagicMock(output_parsed="ok")]
+    )
+
+    assert _parse(client, stage) == "ok"
+    stats = get_llm_stats()[stage]
+    assert stats["retries"] == 1 and stats["failures"] == 0
+
+
+def test_failure_after_the_last_retry_is_raised_and_counted():
+    stage = "test_give_up"
+    set_stage_policy(stage, RequestPolicy(max_retries=1, retry_base_delay=0.0))
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    client = MagicMock()
+    client.responses.parse = AsyncMock(side_effect=openai.APITimeoutError(request=request))
+
+    with pytest.raises(openai.APITimeoutError):
+        _parse(client, stage)
+    assert client.responses.parse.await_count == 2
+    assert get_llm_stats()[stage]["failures"] == 1
+
+
+class _FakeEvent:
+    type = "response.output_text.delta"
+
+    def __init__(self, delta):
+        self.delta = delta
+
+
+class _FakeStream:
+    def __init__(self, chunks, parsed):
+        self.chunks = chunks
+        self.parsed = parsed
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield _FakeEvent(chunk)
+
+    async def get_final_response(self):
+        return MagicMock(output_parsed=self.parsed, usage=None)
+
+
+def test_stream_yields_partial_json_then_the_parsed_response():
+    stage = "test_stream"
+    set_stage_policy(stage, RequestPolicy(max_retries=1, retry_base_delay=0.0))
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    parsed = UseCaseResponse(use_cases=[UseCase(id=1, title="Login", description="Log in.")], reply="ok")
+    chunks = ['{"use_cases": [{"id": 1, "ti', 'tle": "Log', 'in", "description": "Log in."}], "reply": "ok"}']
+    client = MagicMock()
+    client.responses.stream = MagicMock(
+        side_effect=[openai.APIConnectionError(request=request), _FakeStream(chunks, parsed)]
+    )
+
+    async def collect():
+        return [
+            update
+            async for update in stream_structured_async(
+                client, model="m", input=[], text_format=UseCaseResponse, stage=stage, min_interval=0
+            )
+        ]
+
+    with patch("src.llm_client.get_rate_limiter", return_value=AdaptiveRateLimiter()), patch(
+        "src.llm_client.get_llm_cache", return_value=None
+    ):
+        updates = asyncio.run(collect())
+
+    assert [update.partial for update in updates[:-1]] == [
+        {"use_cases": [{"id": 1}]},
+        {"use_cases": [{"id": 1, "title": "Log"}]},
+        parsed.model_dump(),
+    ]
+    assert all(update.parsed is None for update in updates[:-1])
+    assert updates[-1].parsed == parsed
+    assert get_llm_stats()[stage]["retries"] == 1
@@ -0,0 +1,93 @@
+"""
+Unit tests for the MCP-Agent CLI pipeline.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.flowchart_generator import FlowchartResponse
+from src.main import main, parse_args
+from src.search_engine.search_manager import SearchResponse
+from src.use_case_generator import UseCase, UseCaseResponse
+
+
+def test_parse_args_concurrency():
+    assert parse_args(["--concurrency", "3"]).concurrency == 3
+
+
+@patch("src.main.get_user_requirements", return_value="Users can register and log in.")
+@patch("src.main.load_token_counters", new_callable=AsyncMock)
+@patch("src.main.SearchManager")
+@patch("src.main.FlowchartGenerator")
+@patch("src.main.UseCaseGenerator")
+def test_main_processes_use_cases_concurrently_and_prints_in_order(
+    MockUseCaseGenerator, MockFlowchartGenerator, MockSearchManager, mock_load_token_counters, mock_input, capsys
+):
+    """
+    Later use cases may finish first, but results are still printed in use-case order,
+    and no more than `concurrency` use cases are in flight at once.
+    """
+    use_cases = [UseCase(id=i, title=f"Use case {i}", description=f"Description {i}") for i in range(1, 5)]
+
+    async def generate_use_cases_async(requirements_text):
+        return UseCaseResponse(use_cases=use_cases, reply="ok")
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def generate_flowchart_async(description):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # The first use case is the slowest one.
+        await asyncio.sleep(0.05 if description.endswith("1") else 0.01)
+        in_flight -= 1
+        return FlowchartResponse(flowchart_mermaid_code="graph TD\n A --> B", reply="chart")
+
+    async def search_detailed(query):
+        return SearchResponse(
+            results=[{"name": query.split(" Description")[0], "url": "https://github.com/a/b"}], sources=[]
+        )
+
+    MockUseCaseGenerator.return_value.generate_use_cases_async = generate_use_cases_async
+    MockFlowchartGenerator.return_value.generate_flowchart_async = generate_flowchart_async
+    MockSearchManager.return_value = MagicMock(search_detailed=search_detailed)
+
+    asyncio.run(main(concurrency=2))
+
+    output = capsys.readouterr().out
+    positions = [output.index(f"Name: Use case {i}") for i in range(1, 5)]
+    assert positions == sorted(positions)
+    assert max_in_flight == 2
+
+
+@patch("src.main.get_user_requirements", return_value="Users can register and log in.")
+@patch("src.main.load_token_counters", new_callable=AsyncMock)
+@patch("src.main.SearchManager")
+@patch("src.main.FlowchartGenerator")
+@patch("src.main.UseCaseGenerator")
+def test_main_reports_a_failed_use_case_and_prints_the_others(
+    MockUseCaseGenerator, MockFlowchartGenerator, MockSearchManager, mock_load_token_counters, mock_input, capsys
+):
+    use_cases = [UseCase(id=i, title=f"Use case {i}", description=f"Description {i}") for i in range(1, 4)]
+
+    async def search_detailed(query):
+        if query.startswith("Use case 2"):
+            raise RuntimeError("search backend down")
+        return SearchResponse(
+            results=[{"name": query.split(" Description")[0], "url": "https://github.com/a/b"}], sources=[]
+        )
+
+    MockUseCaseGenerator.return_value.generate_use_cases_async = AsyncMock(
+        return_value=UseCaseResponse(use_cases=use_cases, reply="ok")
+    )
+    MockFlowchartGenerator.return_value.generate_flowchart_async = AsyncMock(
+        return_value=FlowchartResponse(flowchart_mermaid_code="graph TD\n A --> B", reply="chart")
+    )
+    MockSearchManager.return_value = MagicMock(search_detailed=search_detailed)
+
+    asyncio.run(main(concurrency=2))
+
+    output = capsys.readouterr().out
+    assert "Use case 2 (ID: 2) failed: search backend down" in output
+    assert "Name: Use case 1" in output and "Name: Use case 3" in output
@@ -0,0 +1,59 @@
+"""
+Unit tests for the single-pass markdown section extraction.
+"""
+
+from src.search_engine.markdown_sections import (
+    MarkdownDocument,
+    clear_caches,
+    extract_section_with_keyword,
+    get_document,
+)
+
+SAMPLE_README = """
+# Model Context Protocol servers
+
+Intro text.
+
+## Reference Servers
+
+- Fetch
+
+### Details
+
+More text.
+
+## Frameworks
+
+- FastMCP
+"""
+
+
+def test_section_ends_at_heading_of_same_level_as_last_keyword_heading():
+    """
+    A nested keyword heading re-anchors the section level, as the original implementation did.
+    """
+    section = MarkdownDocument(SAMPLE_README).extract_section("servers")
+
+    assert section.startswith("Model Context Protocol servers")
+    assert "Intro text." in section
+    assert "Fetch" in section
+    assert "More text." in section
+    assert "FastMCP" not in section
+
+
+def test_missing_keyword_returns_empty_section():
+    assert MarkdownDocument(SAMPLE_README).extract_section("nonexistent") == ""
+
+
+def test_extraction_is_memoized_by_content():
+    """
+    The same content is parsed only once, and edited content is parsed again.
+    """
+    clear_caches()
+    first = get_document(SAMPLE_README)
+    assert get_document(SAMPLE_README) is first
+    assert extract_section_with_keyword(SAMPLE_README, "Frameworks").endswith("FastMCP")
+
+    edited = SAMPLE_README.replace("FastMCP", "OtherMCP")
+    assert get_document(edited) is not first
+    assert extract_section_with_keyword(edited, "Frameworks").endswith("OtherMCP")
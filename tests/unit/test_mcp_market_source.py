@@ -0,0 +1,134 @@
+"""
+Unit tests for the MCPMarket crawler, run against a local HTTP stub serving recorded listing pages.
+"""
+
+import asyncio
+import http.server
+import os
+import threading
+
+import pytest
+
+from src.http_pool import close_http_client
+from src.search_engine.sources.mcp_market_source import ListingPageParser, MCPMarketSource
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "mcpmarket")
+
+
+@pytest.fixture
+def listing_server():
+    """Serves page1.html/page2.html with ETags; `pages` maps page numbers to (file, etag) and can be edited."""
+    pages = {1: ("page1.html", '"p1-v1"'), 2: ("page2.html", '"p2-v1"')}
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            page = int(self.path.rsplit("page=", 1)[-1]) if "page=" in self.path else 1
+            requests.append((page, self.headers.get("If-None-Match")))
+            if page not in pages:
+                self.send_error(404)
+                return
+            file_name, etag = pages[page]
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            with open(os.path.join(FIXTURES_DIR, file_name), "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", pages, requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_listing_page_parser_handles_arbitrary_chunks():
+    with open(os.path.join(FIXTURES_DIR, "page1.html"), "rb") as f:
+        page = f.read()
+    parser = ListingPageParser("https://mcpmarket.com/server?page=1")
+    for i in range(0, len(page), 7):
+        parser.feed(page[i : i + 7])
+    entries = parser.close()
+
+    assert [(e.name, e.url) for e in entries] == [
+        ("PostgreSQL", "https://mcpmarket.com/server/postgres"),
+        ("Playwright", "https://mcpmarket.com/server/playwright"),
+    ]
+    assert entries[0].description.startswith("Read-only access to PostgreSQL databases")
+
+
+def test_crawl_stores_items_and_refetches_only_changed_pages(listing_server, tmp_path):
+    base_url, pages, requests = listing_server
+    source = MCPMarketSource(base_url=base_url, store_path=str(tmp_path / "store.sqlite3"), concurrency=2)
+
+    async def run():
+        try:
+            first = await source.search("run SQL queries against a database")
+            requests.clear()
+            assert await source.crawl() == 0
+            unchanged_requests = sorted(requests)
+            requests.clear()
+            pages[2] = ("page1.html", '"p2-v2"')
+            changed = await source.crawl()
+            return first, unchanged_requests, changed
+        finally:
+            await source.close()
+            await close_http_client()
+
+    first, unchanged_requests, changed = asyncio.run(run())
+
+    assert first[0]["name"] == "PostgreSQL"
+    assert (1, '"p1-v1"') in unchanged_requests and (2, '"p2-v1"') in unchanged_requests
+    assert changed == 1
+    assert (2, '"p2-v1"') in requests
+    # Page 2 now lists the servers of page 1, so Notion is gone from the store.
+    assert [entry.name for entry in source.catalog.entries] == ["PostgreSQL", "Playwright"]
+
+
+def test_crawl_reloads_the_catalog_when_the_listing_shrinks(listing_server, tmp_path):
+    base_url, pages, _requests = listing_server
+    source = MCPMarketSource(base_url=base_url, store_path=str(tmp_path / "store.sqlite3"))
+
+    async def run():
+        try:
+            await source.crawl()
+            del pages[2]
+            return await source.crawl()
+        finally:
+            await source.close()
+            await close_http_client()
+
+    # No page changed, but page 2 was dropped from the store: its servers must not be served anymore.
+    assert asyncio.run(run()) == 0
+    assert [entry.name for entry in source.catalog.entries] == ["PostgreSQL", "Playwright"]
+
+
+def test_search_is_answered_from_the_store(listing_server, tmp_path):
+    base_url, _pages, requests = listing_server
+    store_path = str(tmp_path / "store.sqlite3")
+
+    async def search(query):
+        source = MCPMarketSource(base_url=base_url, store_path=store_path)
+        try:
+            return await source.search(query)
+        finally:
+            await source.close()
+            await close_http_client()
+
+    asyncio.run(search("browser automation"))
+    requests.clear()
+    results = asyncio.run(search("update pages in a Notion workspace"))
+
+    assert requests == []
+    assert results[0]["name"] == "Notion"
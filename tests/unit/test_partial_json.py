@@ -0,0 +1,44 @@
+"""
+Unit tests for the incremental partial JSON parser.
+"""
+
+import json
+
+from src.partial_json import PartialJSONParser, parse_partial_json
+
+
+def test_truncated_documents_are_completed():
+    assert parse_partial_json('{"use_cases": [{"id": 1, "title": "User reg') == {
+        "use_cases": [{"id": 1, "title": "User reg"}]
+    }
+    assert parse_partial_json('{"a": 1, "b') == {"a": 1}  # Dangling key
+    assert parse_partial_json('{"a": 1, "b":') == {"a": 1}
+    assert parse_partial_json('{"a": tr') == {}  # Incomplete literal
+    assert parse_partial_json('{"a": 12') == {"a": 12}
+    assert parse_partial_json("[1, 2,") == [1, 2]
+    assert parse_partial_json('{"a": "x\\') == {"a": "x"}  # Incomplete escape
+    assert parse_partial_json('{"a": "\\u00') == {"a": ""}
+    assert parse_partial_json("") is None
+
+
+def test_every_prefix_decodes_and_the_full_document_matches():
+    document = {
+        "use_cases": [
+            {"id": 1, "title": 'Sign "up", log in', "description": "Línea\nuno \\ dos", "ok": True},
+            {"id": 2, "title": "Pay", "description": None, "score": -1.5e3},
+        ],
+        "reply": "Done.",
+    }
+    text = json.dumps(document)
+    parser = PartialJSONParser()
+    previous_use_cases = 0
+    for char in text:
+        parser.feed(char)
+        snapshot = parser.snapshot()
+        assert snapshot is not None
+        # Content only ever grows: use cases never disappear once seen.
+        use_cases = len(snapshot.get("use_cases", []))
+        assert use_cases >= previous_use_cases
+        previous_use_cases = use_cases
+    assert parser.complete
+    assert parser.snapshot() == document
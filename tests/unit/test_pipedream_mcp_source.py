@@ -0,0 +1,116 @@
+"""
+Unit tests for PipedreamMCPSource, run against a local HTTP stub serving recorded listing pages.
+"""
+
+import asyncio
+import http.server
+import os
+import threading
+
+import pytest
+
+from src.http_pool import close_http_client
+from src.search_engine.sources.pipedream_mcp_source import PipedreamMCPSource
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "pipedream")
+PAGES = {"/": "index.html", "/?page=2": "page2.html"}
+
+
+@pytest.fixture
+def listing_server():
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            page = PAGES.get(self.path)
+            if page is None:
+                self.send_error(404)
+                return
+            with open(os.path.join(FIXTURES_DIR, page), "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests
+    server.shutdown()
+    server.server_close()
+
+
+def _search(source, query):
+    async def run():
+        try:
+            return await source.search(query)
+        finally:
+            await source.close()
+            await close_http_client()
+
+    return asyncio.run(run())
+
+
+def test_search_scrapes_listing_once_and_answers_from_memory(listing_server, tmp_path):
+    base_url, requests = listing_server
+    source = PipedreamMCPSource(base_url=base_url, cache_path=str(tmp_path / "apps.json"), result_limit=2)
+
+    async def run():
+        try:
+            first = await source.search("Post a Slack message to a channel")
+            second = await source.search("Charge customers and send invoices")
+            return first, second
+        finally:
+            await source.close()
+            await close_http_client()
+
+    first, second = asyncio.run(run())
+
+    assert requests == ["/", "/?page=2"]
+    assert [entry.name for entry in source.catalog.entries] == ["Slack", "GitHub", "Google Sheets", "Stripe"]
+    assert first[0]["name"] == "Slack"
+    assert first[0]["description"].startswith("Slack is a channel-based messaging platform")
+    assert first[0]["url"] == f"{base_url}/app/slack"
+    assert second[0]["url"] == "https://mcp.pipedream.com/app/stripe"
+
+
+def test_cached_listing_is_served_without_scraping(listing_server, tmp_path):
+    base_url, requests = listing_server
+    cache_path = str(tmp_path / "apps.json")
+    _search(PipedreamMCPSource(base_url=base_url, cache_path=cache_path), "spreadsheet")
+    requests.clear()
+
+    results = _search(PipedreamMCPSource(base_url=base_url, cache_path=cache_path), "Create spreadsheets")
+
+    assert requests == []
+    assert results[0]["name"] == "Google Sheets"
+
+
+def test_stale_listing_is_refreshed_in_the_background(listing_server, tmp_path):
+    base_url, requests = listing_server
+    cache_path = str(tmp_path / "apps.json")
+    _search(PipedreamMCPSource(base_url=base_url, cache_path=cache_path), "github issues")
+    requests.clear()
+    source = PipedreamMCPSource(base_url=base_url, cache_path=cache_path, refresh_interval_seconds=0)
+    fetched_at = source.fetched_at
+
+    async def run():
+        try:
+            results = await source.search("github issues")
+            await source._refresh_task
+            return results
+        finally:
+            await source.close()
+            await close_http_client()
+
+    results = asyncio.run(run())
+
+    assert results[0]["name"] == "GitHub"
+    assert requests == ["/", "/?page=2"]
+    assert source.fetched_at > fetched_at
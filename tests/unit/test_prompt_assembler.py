@@ -0,0 +1,64 @@
+"""
+Unit tests for the token-budgeted prompt assembler.
+"""
+
+from src.search_engine.catalog import CatalogEntry
+from src.search_engine.prompt_assembler import CuratedList, PromptAssembler
+from src.token_counter import estimate_tokens
+
+
+class WordCounter:
+    name = "words"
+
+    def count(self, text):
+        return len(text.split())
+
+
+def _entry(name, category="Tools", source="a/list"):
+    return CatalogEntry(
+        name=name, url=f"https://github.com/x/{name}", description=f"{name} server", category=category, sources=[source]
+    )
+
+
+def _lists():
+    first = [_entry("alpha"), _entry("beta"), _entry("gamma", category="Data")]
+    second = [_entry("delta", source="b/list"), _entry("epsilon", source="b/list")]
+    return [CuratedList("a/list", "# List A", first), CuratedList("b/list", "# List B", second)]
+
+
+def test_unlimited_budget_keeps_everything_in_a_stable_layout():
+    prompt = PromptAssembler(WordCounter(), budget_tokens=0).assemble("Instructions.", _lists())
+
+    assert prompt.dropped_entries == 0
+    assert prompt.text.startswith("Instructions.\n\n# List A\n\n## Tools\n- [alpha]")
+    assert prompt.text.index("[gamma]") < prompt.text.index("# List B") < prompt.text.index("[epsilon]")
+    assert [section.name for section in prompt.sections] == ["instructions", "a/list", "b/list"]
+
+
+def test_budget_drops_lowest_priority_entries_but_keeps_catalog_order():
+    curated_lists = _lists()
+    alpha, beta, gamma = curated_lists[0].entries
+    delta, epsilon = curated_lists[1].entries
+    assembler = PromptAssembler(WordCounter(), budget_tokens=40)
+
+    prompt = assembler.assemble("Instructions.", curated_lists, priority=[epsilon, gamma, alpha, beta, delta])
+
+    assert prompt.total_tokens <= 40
+    assert 0 < prompt.dropped_entries < 5
+    assert "[epsilon]" in prompt.text and "[gamma]" in prompt.text
+    assert "[delta]" not in prompt.text
+    # Layout stays in catalog order, independent of the priority order.
+    assert prompt.text.index("[alpha]") < prompt.text.index("[gamma]") < prompt.text.index("[epsilon]")
+    assert prompt == assembler.assemble("Instructions.", curated_lists, priority=[epsilon, gamma, alpha, beta, delta])
+
+
+def test_default_priority_does_not_starve_later_lists():
+    prompt = PromptAssembler(WordCounter(), budget_tokens=26).assemble("Instructions.", _lists())
+
+    assert "[alpha]" in prompt.text and "[delta]" in prompt.text
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello world") == 2
+    assert estimate_tokens("- [name](https://github.com/x/y) - A server") > 8
@@ -0,0 +1,155 @@
+"""
+Unit tests for the adaptive LLM rate limiter.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import openai
+import pytest
+
+from src.llm_client import parse_structured, parse_structured_async
+from src.rate_limiter import AdaptiveRateLimiter, Permit, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_reservations_queue_up():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)  # 1 token per second, burst of 60
+
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(2) == pytest.approx(2.0)
+    assert bucket.reserve(1) == pytest.approx(3.0)
+
+    clock.now += 3
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    bucket.adjust(-5)  # Refund: the request used fewer tokens than estimated
+    assert bucket.reserve(1) == 0
+
+
+def test_aimd_halves_once_per_congestion_event_and_grows_back():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(max_concurrency=8, clock=clock)
+    before = Permit(0, started_at=clock.now)
+
+    clock.now += 1
+    assert limiter.on_rate_limited(Permit(0, started_at=clock.now), retry_after=2.0) == pytest.approx(2.0)
+    assert limiter.limit == 4
+    # A request sent before the decrease reports its 429 later: no second decrease.
+    limiter.on_rate_limited(before, retry_after=None)
+    assert limiter.limit == 4
+
+    # Additive increase only while the limit is actually the bottleneck.
+    limiter.on_success(Permit(0, clock.now))
+    assert limiter.limit == 4
+    limiter.in_flight = 4
+    for _ in range(4):
+        limiter.on_success(Permit(0, clock.now))
+    assert 4.9 < limiter.limit < 5.1
+
+
+def test_unbounded_limiter_sets_its_limit_from_the_first_429():
+    limiter = AdaptiveRateLimiter()
+    limiter.in_flight = 10
+    limiter.on_rate_limited(Permit(0, started_at=limiter.clock()), retry_after=0)
+    assert limiter.limit == 5
+
+
+def test_acquire_bounds_concurrency_and_is_fifo():
+    limiter = AdaptiveRateLimiter(max_concurrency=2)
+    in_flight = 0
+    max_in_flight = 0
+    order = []
+
+    async def request(i):
+        nonlocal in_flight, max_in_flight
+        async with limiter.acquire():
+            order.append(i)
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def run():
+        await asyncio.gather(*(request(i) for i in range(6)))
+
+    asyncio.run(run())
+    assert max_in_flight == 2
+    assert order == list(range(6))
+    assert limiter.in_flight == 0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(httpx.Headers({"retry-after-ms": "250"})) == 0.25
+    assert parse_retry_after(httpx.Headers({"retry-after": "3"})) == 3.0
+    assert parse_retry_after(httpx.Headers({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"})) is None
+    assert parse_retry_after(None) is None
+
+
+def _rate_limit_error(code="rate_limit_exceeded"):
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    response = httpx.Response(429, headers={"retry-after-ms": "0"}, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body={"code": code})
+
+
+def test_parse_structured_async_retries_429_and_lowers_the_limit():
+    limiter = AdaptiveRateLimiter(max_concurrency=8)
+    client = MagicMock()
+    client.responses.parse = AsyncMock(
+        side_effect=[_rate_limit_error(), MagicMock(output_parsed="parsed", usage=MagicMock(total_tokens=10))]
+    )
+
+    with patch("src.llm_client.get_rate_limiter", return_value=limiter), patch(
+        "src.llm_client.get_llm_cache", return_value=None
+    ):
+        result = asyncio.run(parse_structured_async(client, model="m", input=[], text_format=MagicMock()))
+
+    assert result == "parsed"
+    assert client.responses.parse.await_count == 2
+    assert limiter.limit == 4
+    assert limiter.rate_limited_count == 1
+
+
+def test_parse_structured_async_does_not_retry_insufficient_quota():
+    limiter = AdaptiveRateLimiter()
+    client = MagicMock()
+    client.responses.parse = AsyncMock(side_effect=_rate_limit_error("insufficient_quota"))
+
+    with patch("src.llm_client.get_rate_limiter", return_value=limiter), patch(
+        "src.llm_client.get_llm_cache", return_value=None
+    ):
+        with pytest.raises(openai.RateLimitError):
+            asyncio.run(parse_structured_async(client, model="m", input=[], text_format=MagicMock()))
+
+    assert client.responses.parse.await_count == 1
+
+
+def test_sync_parse_structured_draws_on_the_shared_rate_budget():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(requests_per_minute=60, tokens_per_minute=6000, clock=clock)
+    client = MagicMock()
+    client.responses.parse.side_effect = [
+        MagicMock(output_parsed="parsed", usage=MagicMock(total_tokens=100)),
+        _rate_limit_error(),
+    ]
+
+    with patch("src.llm_client.get_rate_limiter", return_value=limiter), patch(
+        "src.llm_client.get_llm_cache", return_value=None
+    ), patch("src.llm_client.estimate_request_tokens", return_value=1000):
+        assert parse_structured(client, model="m", input=[], text_format=MagicMock()) == "parsed"
+        with pytest.raises(openai.RateLimitError):
+            parse_structured(client, model="m", input=[], text_format=MagicMock())
+
+    # Two requests and the reported usage (100 tokens, then the 1000 estimated) were taken from the buckets.
+    assert limiter.request_bucket.tokens == pytest.approx(58)
+    assert limiter.token_bucket.tokens == pytest.approx(6000 - 100 - 1000)
+    # The sync 429 is recorded by the shared limiter, so async traffic backs off too.
+    assert limiter.rate_limited_count == 1
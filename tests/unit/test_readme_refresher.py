@@ -0,0 +1,88 @@
+"""
+Unit tests for the background README refresher.
+"""
+
+import asyncio
+import json
+
+import httpx
+
+from src.search_engine.readme_refresher import ReadmeRefresher
+
+
+def _refresher(tmp_path, handler, on_refresh=None):
+    readme_path = tmp_path / "readme.md"
+    readme_path.write_text("old", encoding="utf-8")
+    http_client = httpx.AsyncClient(base_url="https://api.github.com", transport=httpx.MockTransport(handler))
+    return ReadmeRefresher(
+        {"a/list": str(readme_path)},
+        "token",
+        interval_seconds=60,
+        on_refresh=on_refresh,
+        http_client=http_client,
+        etags_path=str(tmp_path / "etags.json"),
+    )
+
+
+def test_refresh_writes_changed_readme_and_revalidates_with_etag(tmp_path):
+    seen_etags = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/repos/a/list/readme"
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v2"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="new", headers={"ETag": '"v2"'})
+
+    refreshed = []
+
+    async def on_refresh():
+        refreshed.append(True)
+
+    refresher = _refresher(tmp_path, handler, on_refresh)
+
+    async def run():
+        first = await refresher.refresh_once()
+        second = await refresher.refresh_once()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == ["a/list"]
+    assert second == []
+    assert seen_etags == [None, '"v2"']
+    assert (tmp_path / "readme.md").read_text(encoding="utf-8") == "new"
+    assert json.loads((tmp_path / "etags.json").read_text(encoding="utf-8")) == {"a/list": '"v2"'}
+    assert len(refreshed) == 2
+    # Only the README and the lock/ETag files are left behind, no temporary files.
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_failed_refresh_keeps_the_cached_readme(tmp_path):
+    refresher = _refresher(tmp_path, lambda request: httpx.Response(502))
+
+    assert asyncio.run(refresher.refresh_once()) == []
+    assert (tmp_path / "readme.md").read_text(encoding="utf-8") == "old"
+
+
+def test_unchanged_content_only_seeds_the_etag(tmp_path):
+    refresher = _refresher(tmp_path, lambda request: httpx.Response(200, text="old", headers={"ETag": '"v1"'}))
+    mtime = (tmp_path / "readme.md").stat().st_mtime_ns
+
+    assert asyncio.run(refresher.refresh_once()) == []
+    assert (tmp_path / "readme.md").stat().st_mtime_ns == mtime
+    assert json.loads((tmp_path / "etags.json").read_text(encoding="utf-8")) == {"a/list": '"v1"'}
+
+
+def test_first_refresh_waits_for_the_interval(tmp_path):
+    requests = []
+    refresher = _refresher(tmp_path, lambda request: requests.append(request) or httpx.Response(304))
+
+    async def run():
+        refresher.start()
+        await asyncio.sleep(0.05)
+        await refresher.stop()
+
+    asyncio.run(run())
+
+    assert requests == []
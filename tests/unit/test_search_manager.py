@@ -0,0 +1,144 @@
+"""
+Unit tests for merging search results across sources.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.search_engine.search_manager import SearchManager, canonicalize_url, merge_results
+from src.search_engine.sources.base_source import BaseSourceHandler
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("https://www.github.com/X/y.git") == "x/y"
+    assert canonicalize_url("github.com/x/y/") == "x/y"
+    assert canonicalize_url("https://github.com/x/y/tree/main/src/z") == "x/y/src/z"
+    assert canonicalize_url("https://github.com/x/y/blob/dev/src/z/") == "x/y/src/z"
+    assert canonicalize_url("https://www.mcp.pipedream.com/app/slack/") == "mcp.pipedream.com/app/slack"
+
+
+def test_merge_results_deduplicates_and_fuses_ranks():
+    github = [
+        {"name": "A", "url": "https://github.com/a/a", "corresponding_functions": ["read"], "stars": None},
+        {"name": "B", "url": "https://github.com/b/b", "corresponding_functions": []},
+    ]
+    pipedream = [
+        {"name": "B (Pipedream)", "url": "https://www.github.com/b/b/", "corresponding_functions": ["write"]},
+        {"name": "A dup", "url": "github.com/a/a.git", "corresponding_functions": ["read", "list"], "stars": 7},
+        {"name": "C", "url": "https://mcp.pipedream.com/app/c"},
+    ]
+
+    merged = merge_results([("GitHub", github), ("Pipedream", pipedream)], limit=10)
+
+    assert [r["name"] for r in merged] == ["A", "B (Pipedream)", "C"]
+    assert merged[0]["sources"] == ["GitHub", "Pipedream"]
+    assert merged[0]["corresponding_functions"] == ["read", "list"]
+    assert merged[0]["stars"] == 7
+    assert merged[1]["corresponding_functions"] == ["write"]
+    assert merged[2]["sources"] == ["Pipedream"]
+
+
+def test_merge_results_applies_limit():
+    results = [{"name": str(i), "url": f"https://github.com/o/r{i}"} for i in range(100)]
+
+    merged = merge_results([("GitHub", results)], limit=5)
+
+    assert [r["name"] for r in merged] == ["0", "1", "2", "3", "4"]
+
+
+def test_search_skips_failing_sources():
+    good = MagicMock(source_name="GitHub", search=AsyncMock(return_value=[{"name": "A", "url": "github.com/a/a"}]))
+    bad = MagicMock(source_name="Broken", search=AsyncMock(side_effect=RuntimeError("down")))
+
+    results = asyncio.run(SearchManager([good, bad], total_result_limit=3).search("use case"))
+
+    assert [r["name"] for r in results] == ["A"]
+
+
+def _source(name, delay, results=None, error=None):
+    async def search(use_case_description):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return results
+
+    return MagicMock(source_name=name, search=search)
+
+
+def test_search_stream_yields_fast_sources_first_and_reports_timeouts():
+    manager = SearchManager(
+        [
+            _source("Slow", 5, []),
+            _source("Fast", 0, [{"name": "A", "url": "github.com/a/a"}]),
+            _source("Broken", 0, error=RuntimeError("down")),
+        ],
+        source_timeout_seconds=0.05,
+    )
+
+    async def run():
+        return [result async for result in manager.search_stream("use case")]
+
+    statuses = {result.source_name: result for result in asyncio.run(run())}
+
+    assert statuses["Fast"].status == "ok"
+    assert statuses["Fast"].results == [{"name": "A", "url": "github.com/a/a"}]
+    assert statuses["Broken"].status == "error"
+    assert "down" in statuses["Broken"].error
+    assert statuses["Slow"].status == "timeout"
+
+
+def test_search_detailed_respects_overall_deadline():
+    manager = SearchManager(
+        [_source("Fast", 0, [{"name": "A", "url": "github.com/a/a"}]), _source("Slow", 5, [])],
+        source_timeout_seconds=10,
+        deadline_seconds=0.05,
+    )
+
+    response = asyncio.run(manager.search_detailed("use case"))
+
+    assert [r["name"] for r in response.results] == ["A"]
+    assert [(s.source_name, s.status) for s in response.sources] == [("Fast", "ok"), ("Slow", "timeout")]
+
+
+class _LifecycleSource(BaseSourceHandler):
+    def __init__(self, fail_warmup=False):
+        super().__init__(source_name="Lifecycle", http_client=MagicMock())
+        self.events = []
+        self.fail_warmup = fail_warmup
+
+    async def search(self, use_case_description):
+        self.events.append("search")
+        return []
+
+    async def start(self):
+        self.events.append("start")
+
+    async def warmup(self):
+        self.events.append("warmup")
+        if self.fail_warmup:
+            raise RuntimeError("listing unavailable")
+
+    async def close(self):
+        self.events.append("close")
+
+
+def test_search_manager_owns_handler_lifecycle():
+    first, second = _LifecycleSource(), _LifecycleSource(fail_warmup=True)
+
+    async def run():
+        async with SearchManager([first, second]) as manager:
+            await manager.start()  # Idempotent
+            await manager.search("use case")
+
+    asyncio.run(run())
+
+    assert first.events == ["start", "warmup", "search", "close"]
+    assert second.events == ["start", "warmup", "search", "close"]
+
+
+def test_search_starts_handlers_lazily_without_warmup():
+    source = _LifecycleSource()
+
+    asyncio.run(SearchManager([source]).search("use case"))
+
+    assert source.events == ["start", "search"]
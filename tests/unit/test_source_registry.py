@@ -0,0 +1,78 @@
+"""
+Unit tests for the search source registry and the lazy creation of the configured sources.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.search_engine.search_manager import SearchManager
+from src.search_engine.sources import registry
+from src.search_engine.sources.base_source import BaseSourceHandler
+
+
+class FakeSource(BaseSourceHandler):
+    def __init__(self):
+        super().__init__("Fake", http_client=MagicMock())
+
+    async def search(self, use_case_description):
+        return [{"name": "Fake MCP", "url": "https://github.com/fake/mcp"}]
+
+
+class BrokenSource(FakeSource):
+    def __init__(self):
+        raise RuntimeError("missing credentials")
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    monkeypatch.setattr(registry, "_source_handlers", dict(registry._source_handlers))
+
+
+def test_string_handlers_are_imported_on_first_use(handlers):
+    registry.register_source("Fake", f"{__name__}:FakeSource")
+
+    assert registry._source_handlers["fake"] == f"{__name__}:FakeSource"
+    assert registry.get_source_class("fake") is FakeSource
+    assert registry._source_handlers["fake"] is FakeSource
+
+
+def test_create_sources_skips_unknown_and_failing_sources(handlers):
+    registry.register_source("fake", FakeSource)
+    registry.register_source("broken", BrokenSource)
+
+    sources = registry.create_sources(["broken", "nope", " FAKE "])
+
+    assert [type(source) for source in sources] == [FakeSource]
+    with pytest.raises(ValueError, match="Unknown search source 'nope'"):
+        registry.get_source_class("nope")
+
+
+def test_search_manager_creates_the_configured_sources_on_start():
+    source = MagicMock(source_name="Fake", search=AsyncMock(return_value=[{"name": "A", "url": "github.com/a/a"}]))
+    source.start = source.warmup = source.close = AsyncMock()
+
+    with patch("src.search_engine.search_manager.create_sources", return_value=[source]) as create_sources:
+        manager = SearchManager()
+        create_sources.assert_not_called()
+        results = asyncio.run(manager.search("use case"))
+
+    create_sources.assert_called_once_with()
+    assert [r["name"] for r in results] == ["A"]
+
+
+def test_search_without_any_loadable_source_reports_it_instead_of_failing(handlers):
+    registry.register_source("missing", "src.search_engine.sources.does_not_exist:MissingSource")
+
+    async def run():
+        with patch("src.search_engine.sources.registry.SEARCH_SOURCES_ENABLED", ["missing"]):
+            async with SearchManager() as manager:
+                return await manager.search_detailed("use case"), await manager.search("use case")
+
+    detailed, results = asyncio.run(run())
+
+    assert detailed.results == [] and results == []
+    assert [(source.status, source.error) for source in detailed.sources] == [
+        ("error", "No search source is available")
+    ]
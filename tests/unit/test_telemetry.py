@@ -0,0 +1,102 @@
+"""
+Unit tests for the tracing spans and the Prometheus metrics rendering.
+"""
+
+import asyncio
+
+import pytest
+
+from src.telemetry import MetricsRegistry, current_span, finished_spans, format_metric, registry, span
+
+
+def _metric_value(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not rendered")
+
+
+def test_child_spans_inherit_the_use_case_id():
+    async def use_case(uc_id):
+        with span("test.use_case", use_case_id=uc_id) as parent:
+            await asyncio.sleep(0)
+            with span("test.llm", model="m") as child:
+                await asyncio.sleep(0)
+            return parent, child
+
+    async def run():
+        return await asyncio.gather(use_case(1), use_case(2))
+
+    (parent_1, child_1), (parent_2, child_2) = asyncio.run(run())
+
+    assert child_1.attributes == {"use_case_id": 1, "model": "m"}
+    assert child_2.attributes == {"use_case_id": 2, "model": "m"}
+    assert child_1.parent_id == parent_1.span_id and child_1.trace_id == parent_1.trace_id
+    assert parent_1.trace_id != parent_2.trace_id
+    assert current_span() is None
+    assert finished_spans[-1].end is not None
+
+
+def test_failed_spans_are_counted_per_error_type():
+    with pytest.raises(ValueError):
+        with span("test.failing"):
+            raise ValueError("boom")
+
+    text = registry.render()
+    assert _metric_value(text, 'mcp_agent_stage_errors_total{stage="test.failing",error="ValueError"}') == 1
+    assert _metric_value(text, 'mcp_agent_stage_duration_seconds_count{stage="test.failing"}') == 1
+    assert _metric_value(text, 'mcp_agent_stage_in_flight{stage="test.failing"}') == 0
+
+
+def test_cancelled_spans_are_not_errors():
+    async def run():
+        async def slow():
+            with span("test.cancelled"):
+                await asyncio.sleep(5)
+
+        task = asyncio.create_task(slow())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert finished_spans[-1].status == "cancelled"
+    assert 'stage="test.cancelled",error=' not in registry.render()
+
+
+def test_spans_across_generator_yields_do_not_leak_into_the_consumer():
+    async def stream():
+        with span("test.stream", activate=False) as stream_span:
+            yield stream_span
+            yield stream_span
+
+    async def run():
+        with span("test.handler", use_case_id=7) as handler:
+            async for stream_span in stream():
+                # Between iterations the consumer still sees its own span as the current one
+                assert current_span() is handler
+                with span("test.render") as render:
+                    pass
+        return handler, stream_span, render
+
+    handler, stream_span, render = asyncio.run(run())
+
+    assert stream_span.parent_id == handler.span_id and stream_span.attributes == {"use_case_id": 7}
+    assert render.parent_id == handler.span_id
+    assert stream_span.end is not None and current_span() is None
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics.observe("stage", 0.05)
+    metrics.observe("stage", 0.5)
+    metrics.observe("stage", 5.0)
+    metrics.register_collector(lambda: format_metric("extra", "gauge", "Extra.", [({"a": 'x"y'}, float("inf"))]))
+
+    text = metrics.render()
+    assert _metric_value(text, 'mcp_agent_stage_duration_seconds_bucket{stage="stage",le="0.1"}') == 1
+    assert _metric_value(text, 'mcp_agent_stage_duration_seconds_bucket{stage="stage",le="1"}') == 2
+    assert _metric_value(text, 'mcp_agent_stage_duration_seconds_bucket{stage="stage",le="+Inf"}') == 3
+    assert _metric_value(text, 'mcp_agent_stage_duration_seconds_sum{stage="stage"}') == pytest.approx(5.55)
+    assert 'extra{a="x\\"y"} +Inf' in text
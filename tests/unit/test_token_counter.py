@@ -0,0 +1,44 @@
+"""
+Unit tests for the token counter's tiktoken loading and estimator fallback.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+from src import token_counter
+from src.token_counter import TokenCounter, estimate_tokens, get_token_counter, load_token_counters
+
+
+def test_encodings_are_loaded_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(token_counter, "_token_counters", {})
+    loaded_in = []
+
+    def encoding_for_model(model):
+        loaded_in.append(threading.current_thread())
+        return MagicMock(encode=lambda text, disallowed_special: text.split())
+
+    async def run():
+        await load_token_counters(["model-a", "model-a"])
+        return threading.current_thread()
+
+    with patch.dict(sys.modules, {"tiktoken": MagicMock(encoding_for_model=encoding_for_model)}):
+        loop_thread = asyncio.run(run())
+
+    assert len(loaded_in) == 1 and loaded_in[0] is not loop_thread
+    assert get_token_counter("model-a").count("three small words") == 3
+
+
+def test_fallback_to_the_estimate_warns_once(monkeypatch, caplog):
+    monkeypatch.setattr(token_counter, "_fallback_warned", False)
+    tiktoken = MagicMock()
+    tiktoken.encoding_for_model.side_effect = ConnectionError("offline")
+
+    with patch.dict(sys.modules, {"tiktoken": tiktoken}), caplog.at_level(logging.INFO, logger="src.token_counter"):
+        counters = [TokenCounter("model-a"), TokenCounter("model-b")]
+
+    assert [counter.name for counter in counters] == ["estimate", "estimate"]
+    assert [record.levelno for record in caplog.records] == [logging.WARNING, logging.INFO]
+    assert counters[0].count("hello world") == estimate_tokens("hello world")
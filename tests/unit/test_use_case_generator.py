@@ -2,13 +2,22 @@
 Unit tests for the UseCaseGenerator module.
 """
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 # Temporarily disable logging for tests to keep output clean,
 # or configure it to a test-specific level/handler.
 # For simplicity here, disabling all logging from the module during tests.
 # logging.disable(logging.CRITICAL)
-from src.use_case_generator import UseCase, UseCaseGenerator, UseCaseResponse
+from src.flowchart_generator import is_valid_mermaid_flowchart
+from src.use_case_generator import (
+    FusedUseCaseResponse,
+    UseCase,
+    UseCaseGenerator,
+    UseCaseResponse,
+    UseCaseWithFlowchart,
+    generate_use_cases_and_flowcharts,
+)
 
 # Ensure that if this test file is run directly, logging is configured.
 # However, typically pytest or unittest runner handles this.
@@ -105,3 +114,97 @@ def test_generate_use_cases_pydantic_validation_error(MockOpenAI, mock_get_llm_a
     assert isinstance(result, UseCaseResponse)
     assert result.use_cases == []
     assert "couldn't generate use cases" in result.reply
+
+
+@patch("src.use_case_generator.get_llm_api_key")
+@patch("src.use_case_generator.AsyncOpenAI")
+@patch("src.use_case_generator.OpenAI")
+def test_generate_use_cases_async_success(MockOpenAI, MockAsyncOpenAI, mock_get_llm_api_key):
+    """
+    Test that the async variant awaits the AsyncOpenAI client and leaves the sync client unused.
+    """
+    mock_get_llm_api_key.return_value = "fake_api_key"
+    mock_response = MagicMock()
+    mock_response.output_parsed = UseCaseResponse(
+        use_cases=[UseCase(id=1, title="User Login", description="Registered users should be able to log in.")],
+        reply="Here are the use cases.",
+    )
+    MockAsyncOpenAI.return_value.responses.parse = AsyncMock(return_value=mock_response)
+
+    generator = UseCaseGenerator()
+    result = asyncio.run(generator.generate_use_cases_async("User login functionality."))
+
+    assert result is not None
+    assert result.use_cases[0].title == "User Login"
+    MockAsyncOpenAI.return_value.responses.parse.assert_awaited_once()
+    assert not MockOpenAI.return_value.responses.parse.called
+
+
+VALID_FLOWCHART = "```mermaid\nflowchart TD\n    A[User] --> B[Logs in]\n```"
+
+
+def test_is_valid_mermaid_flowchart():
+    assert is_valid_mermaid_flowchart(VALID_FLOWCHART)
+    assert is_valid_mermaid_flowchart("graph TD\n A --> B")
+    assert not is_valid_mermaid_flowchart("")
+    assert not is_valid_mermaid_flowchart("```mermaid\nflowchart TD\n A --> B")  # Unterminated fence
+    assert not is_valid_mermaid_flowchart("sequenceDiagram\n A->>B: hi")
+    assert not is_valid_mermaid_flowchart("flowchart TD")
+
+
+def test_fused_mode_returns_valid_flowcharts_and_leaves_invalid_ones_to_the_fallback():
+    generator = MagicMock()
+    generator.generate_use_cases_with_flowcharts_async = AsyncMock(
+        return_value=FusedUseCaseResponse(
+            use_cases=[
+                UseCaseWithFlowchart(
+                    id=1, title="Login", description="Log in.", flowchart_mermaid_code=VALID_FLOWCHART
+                ),
+                UseCaseWithFlowchart(id=2, title="Logout", description="Log out.", flowchart_mermaid_code="n/a"),
+            ],
+            reply="Here you go.",
+        )
+    )
+
+    use_cases_response, flowcharts = asyncio.run(generate_use_cases_and_flowcharts(generator, "reqs", fused=True))
+
+    assert [uc.title for uc in use_cases_response.use_cases] == ["Login", "Logout"]
+    assert use_cases_response.reply == "Here you go."
+    assert list(flowcharts) == [1]
+    assert flowcharts[1].flowchart_mermaid_code == VALID_FLOWCHART
+    generator.generate_use_cases_async.assert_not_called()
+
+
+def test_fused_mode_falls_back_to_separate_calls_when_the_response_is_unusable():
+    generator = MagicMock()
+    generator.generate_use_cases_with_flowcharts_async = AsyncMock(return_value=None)
+    fallback = UseCaseResponse(use_cases=[UseCase(id=1, title="Login", description="Log in.")], reply="ok")
+    generator.generate_use_cases_async = AsyncMock(return_value=fallback)
+
+    assert asyncio.run(generate_use_cases_and_flowcharts(generator, "reqs", fused=True)) == (fallback, {})
+    generator.generate_use_cases_async.assert_awaited_once_with("reqs")
+
+
+@patch("src.flowchart_generator.OPENAI_API_KEY", "fake_api_key")
+@patch("src.use_case_generator.get_llm_api_key", return_value="fake_api_key")
+def test_async_clients_use_the_llm_timeout_not_the_http_pool_default(mock_get_llm_api_key):
+    """The shared pool's 30s read timeout must not cut off long structured LLM calls."""
+    from src.config import LLM_REQUEST_TIMEOUT_SECONDS
+    from src.flowchart_generator import FlowchartGenerator
+    from src.http_pool import HTTP_TIMEOUT
+
+    for client in (UseCaseGenerator().async_client, FlowchartGenerator().async_client):
+        assert client.timeout.read == LLM_REQUEST_TIMEOUT_SECONDS
+        assert client.timeout.read > HTTP_TIMEOUT.read
+
+
+@patch("src.flowchart_generator.OPENAI_API_KEY", "fake_api_key")
+@patch("src.use_case_generator.get_llm_api_key", return_value="fake_api_key")
+def test_sync_clients_leave_retries_to_the_rate_limiter(mock_get_llm_api_key):
+    """SDK-level retries would back off on 429s without the shared rate limiter ever seeing them."""
+    from src.config import LLM_REQUEST_TIMEOUT_SECONDS
+    from src.flowchart_generator import FlowchartGenerator
+
+    for client in (UseCaseGenerator().client, FlowchartGenerator().client):
+        assert client.max_retries == 0
+        assert client.timeout.read == LLM_REQUEST_TIMEOUT_SECONDS